@@ -1,5 +1,7 @@
 import ast
 import logging
+import os
+from functools import partial
 from typing import Iterable, Mapping, Optional
 
 from pandas import isnull
@@ -10,7 +12,9 @@ from etlrules.exceptions import (
     MissingColumnError,
     UnsupportedTypeError,
 )
+from etlrules.backends.common.substitution import subst_string
 from etlrules.backends.common.types import SUPPORTED_TYPES
+from etlrules.data import state_commits
 from etlrules.rule import UnaryOpBaseRule
 
 perf_logger = logging.getLogger("etlrules.perf")
@@ -57,6 +61,21 @@ class AggregateRule(UnaryOpBaseRule):
         aggregation_types: An optional mapping of {column_name: column_type} which converts the respective output
             column to the given type. The supported types are: int8, int16, int32, int64, uint8, uint16,
             uint32, uint64, float32, float64, string, boolean, datetime and timedelta.
+        state_file: An optional path to a parquet file where the partial aggregation state is persisted between runs.
+            When set, the input dataframe is aggregated into a partial state (e.g. sums and counts for mean) which
+            is merged into the state persisted by the previous runs, then the result is produced from the merged state
+            and the merged state is saved back once the run succeeded (or straight away when the rule is applied outside
+            of a RuleEngine run). This allows the rule to update the aggregates incrementally
+            as new data arrives (e.g. new files), rather than re-aggregating all the history.
+            The env and context substitutions are supported. Only the aggregations are supported with a state_file,
+            the aggregation_expressions can't be merged.
+        grouping_sets: An optional mapping {named_output: group_by_columns} to also aggregate the input at coarser levels
+            in the same pass (e.g. a rollup by region+country and region when the group_by is region+country+city).
+            The group_by_columns of each level must be a non-empty subset of the group_by columns and each level is
+            produced as a separate named output, in addition to the main result (aggregated by group_by).
+            When all the aggregations are decomposable (min, max, sum, count, countNoNA and mean), the input is
+            aggregated once at the finest level (group_by) and the coarser levels are derived from its partial state
+            rather than rescanning the input. Otherwise, each level is aggregated from the input.
 
         named_input: Which dataframe to use as the input. Optional.  
             When not set, the input is taken from the main output.  
@@ -86,10 +105,33 @@ class AggregateRule(UnaryOpBaseRule):
 
     Note:
         Any columns not in the group_by list and not present in either aggregations or aggregation_expressions will be dropped from the result.
+
+    Note:
+        The aggregations can also be computed chunk by chunk over a stream of dataframes (e.g. batches or files
+        read one at a time) using aggregate_batches, or partial_aggregate and finalize to control the state
+        directly, without the whole data being in memory at once. The partial states are merged in the order
+        of the chunks, so first and last are the first and last values in the stream.
     """
 
     AGGREGATIONS = {}
 
+    # {aggregation: ((state suffix, aggregation of the input, aggregation merging the states), ...)}
+    PARTIAL_AGGREGATIONS = {
+        "min": (("min", "min", "min"),),
+        "max": (("max", "max", "max"),),
+        "sum": (("sum", "sum", "sum"),),
+        "count": (("count", "count", "sum"),),
+        "countNoNA": (("count", "countNoNA", "sum"),),
+        "mean": (("sum", "sum", "sum"), ("count", "countNoNA", "sum")),
+        "first": (("first", "first", "first"),),
+        "last": (("last", "last", "last"),),
+        "list": (("list", "list", "concat"),),
+        "csv": (("list", "list", "concat"),),
+    }
+
+    # the aggregations which can be derived from the partial state of a finer level, irrespective of the row order
+    DECOMPOSABLE_AGGREGATIONS = ("min", "max", "sum", "count", "countNoNA", "mean")
+
     EXCLUDE_FROM_COMPARE = ("_aggs",)
 
     def __init__(
@@ -98,6 +140,8 @@ class AggregateRule(UnaryOpBaseRule):
         aggregations: Optional[Mapping[str, str]] = None,
         aggregation_expressions: Optional[Mapping[str, str]] = None,
         aggregation_types: Optional[Mapping[str, str]] = None,
+        state_file: Optional[str] = None,
+        grouping_sets: Optional[Mapping[str, Iterable[str]]] = None,
         named_input: Optional[str] = None,
         named_output: Optional[str] = None,
         name: Optional[str] = None,
@@ -159,13 +203,154 @@ class AggregateRule(UnaryOpBaseRule):
                 self.aggregation_types[col] = col_type
         else:
             self.aggregation_types = None
+        self.state_file = state_file
+        if self.state_file is not None and aggregation_expressions:
+            raise ValueError("The aggregation_expressions cannot be aggregated incrementally, only the aggregations are supported with a state_file.")
+        if grouping_sets is not None:
+            self.grouping_sets = {}
+            for level_output, level_group_by in grouping_sets.items():
+                if not level_output or not isinstance(level_output, str) or level_output == self.named_output:
+                    raise ValueError(f"Invalid named output '{level_output}' in grouping_sets. It must be a non-empty string different from the named_output.")
+                level_group_by = [col for col in level_group_by]
+                if not level_group_by or not set(level_group_by) <= set(self.group_by):
+                    raise ValueError(f"The grouping set '{level_output}' must be a non-empty subset of the group_by columns: {level_group_by}.")
+                self.grouping_sets[level_output] = level_group_by
+            if self.state_file is not None and not self._is_decomposable():
+                raise ValueError(f"The grouping_sets can only be used with a state_file when all the aggregations are decomposable: {self.DECOMPOSABLE_AGGREGATIONS}.")
+        else:
+            self.grouping_sets = None
 
-    def do_aggregate(self, df, aggs):
+    def get_all_named_outputs(self):
+        yield self.named_output
+        if self.grouping_sets:
+            yield from self.grouping_sets
+
+    def _is_decomposable(self) -> bool:
+        return not getattr(self, "aggregation_expressions", None) and all(
+            agg_func in self.DECOMPOSABLE_AGGREGATIONS for agg_func in self.aggregations.values()
+        )
+
+    def do_aggregate(self, df, aggs, group_by):
         raise NotImplementedError("Have you imported the rules from etlrules.backends.<your_backend> and not common?")
 
+    def do_aggregate_states(self, df, group_by, state_aggs):
+        """ Groups df by the group_by columns and aggregates it using state_aggs: {output column: (input column, aggregation)}. """
+        raise NotImplementedError("Have you imported the rules from etlrules.backends.<your_backend> and not common?")
+
+    def do_concat_states(self, state, batch_state):
+        raise NotImplementedError("Have you imported the rules from etlrules.backends.<your_backend> and not common?")
+
+    def do_finalize(self, state, group_by, aggregations):
+        raise NotImplementedError("Have you imported the rules from etlrules.backends.<your_backend> and not common?")
+
+    def do_load_state(self, state_file: str):
+        raise NotImplementedError("Have you imported the rules from etlrules.backends.<your_backend> and not common?")
+
+    def do_save_state(self, state, state_file: str) -> None:
+        raise NotImplementedError("Have you imported the rules from etlrules.backends.<your_backend> and not common?")
+
+    def _get_state_column(self, col: str, suffix: str) -> str:
+        return f"{col}__{suffix}"
+
+    def _get_state_aggs(self, aggregations: Mapping[str, str], merge: bool) -> dict:
+        state_aggs = {}
+        for col, agg_func in aggregations.items():
+            for suffix, partial_agg, merge_agg in self.PARTIAL_AGGREGATIONS[agg_func]:
+                state_col = self._get_state_column(col, suffix)
+                state_aggs[state_col] = (state_col, merge_agg) if merge else (col, partial_agg)
+        return state_aggs
+
+    def _get_aggregations(self, df) -> dict:
+        if getattr(self, "aggregation_expressions", None):
+            raise ValueError("The aggregation_expressions cannot be aggregated incrementally, only the aggregations are supported.")
+        df_columns_set = set(df.columns)
+        if not set(self.aggregations) <= df_columns_set:
+            if self.strict:
+                raise MissingColumnError(f"Missimg columns to aggregate by: {set(self.aggregations) - df_columns_set}.")
+            return {col: agg for col, agg in self.aggregations.items() if col in df_columns_set}
+        return self.aggregations
+
+    def partial_aggregate(self, df, state=None):
+        """ Aggregates df into a partial aggregation state and merges it into state (the partial state of the previous data).
+
+        Args:
+            df: The dataframe to aggregate.
+            state: The partial state returned by a previous call to partial_aggregate. Optional.
+                When not set, the partial state of df is returned.
+
+        Returns:
+            The partial aggregation state. Use finalize to compute the aggregations from the state.
+        """
+        aggregations = self._get_aggregations(df)
+        batch_state = self.do_aggregate_states(df, self.group_by, self._get_state_aggs(aggregations, merge=False))
+        if state is None:
+            return batch_state
+        return self.do_aggregate_states(self.do_concat_states(state, batch_state), self.group_by, self._get_state_aggs(aggregations, merge=True))
+
+    def _get_state_aggregations(self, state) -> dict:
+        state_columns = set(state.columns)
+        return {
+            col: agg_func for col, agg_func in self.aggregations.items()
+            if all(self._get_state_column(col, suffix) in state_columns for suffix, _, _ in self.PARTIAL_AGGREGATIONS[agg_func])
+        }
+
+    def finalize(self, state):
+        """ Computes the aggregations from a partial aggregation state (see partial_aggregate). """
+        return self.do_finalize(state, self.group_by, self._get_state_aggregations(state))
+
+    def _finalize_grouping_set(self, state, group_by):
+        aggregations = self._get_state_aggregations(state)
+        level_state = self.do_aggregate_states(state, group_by, self._get_state_aggs(aggregations, merge=True))
+        return self.do_finalize(level_state, group_by, aggregations)
+
+    def aggregate_batches(self, batches):
+        """ Aggregates a stream of dataframes (e.g. batches or files) chunk by chunk and returns the result.
+
+        Only the partial aggregation state is kept in memory between the chunks, rather than all the data.
+        """
+        state = None
+        for batch in batches:
+            state = self.partial_aggregate(batch, state)
+        if state is None:
+            raise ValueError("No batches to aggregate.")
+        return self.finalize(state)
+
+    def _load_state(self, state_file: str):
+        if not os.path.exists(state_file):
+            return None
+        state = self.do_load_state(state_file)
+        state_columns = set(state.columns)
+        matches = set(self.group_by) <= state_columns and state_columns - set(self.group_by) <= set(self._get_state_aggs(self.aggregations, merge=True))
+        for col, agg_func in self.aggregations.items():
+            present = {self._get_state_column(col, suffix) in state_columns for suffix, _, _ in self.PARTIAL_AGGREGATIONS[agg_func]}
+            matches = matches and len(present) == 1
+        if not matches:
+            raise ValueError(f"The aggregation state in {state_file} doesn't match the group_by/aggregations of the rule.")
+        return state
+
+    def _save_state(self, state, state_file: str) -> None:
+        state_dir = os.path.dirname(state_file)
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+        tmp_file = state_file + ".tmp"
+        self.do_save_state(state, tmp_file)
+        os.replace(tmp_file, state_file)
+
     def apply(self, data):
         super().apply(data)
         df = self._get_input_df(data)
+        if self.state_file is not None or (self.grouping_sets and self._is_decomposable()):
+            if self.state_file is not None:
+                state_file = subst_string(self.state_file)
+                state = self.partial_aggregate(df, self._load_state(state_file))
+                # the state is only saved once the whole run succeeded, so a failed run doesn't aggregate the data twice
+                state_commits.add(partial(self._save_state, state, state_file))
+            else:
+                state = self.partial_aggregate(df)
+            self._set_output_df(data, self.finalize(state))
+            for level_output, level_group_by in (self.grouping_sets or {}).items():
+                data.set_named_output(level_output, self._finalize_grouping_set(state, level_group_by))
+            return
         df_columns_set = set(df.columns)
         if not set(self._aggs) <= df_columns_set:
             if self.strict:
@@ -175,5 +360,8 @@ class AggregateRule(UnaryOpBaseRule):
             }
         else:
             aggs = self._aggs
-        df = self.do_aggregate(df, aggs)
-        self._set_output_df(data, df)
+        self._set_output_df(data, self.do_aggregate(df, aggs, self.group_by))
+        if self.grouping_sets:
+            perf_logger.warning("The aggregations in AggregateRule are not decomposable, each grouping set is aggregated from the input.")
+            for level_output, level_group_by in self.grouping_sets.items():
+                data.set_named_output(level_output, self.do_aggregate(df, aggs, level_group_by))
@@ -1,6 +1,9 @@
-from typing import Optional
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Generator, Optional
 
-from etlrules.data import RuleData
+from etlrules.data import RuleData, context
 from etlrules.rule import ColumnsInOutMixin, UnaryOpBaseRule
 
 
@@ -21,3 +24,20 @@ class BaseAssignColumnRule(UnaryOpBaseRule, ColumnsInOutMixin):
         input_column, output_column = self.validate_in_out_columns(df.columns, self.input_column, self.output_column, self.strict)
         df = self.assign_do_apply(df, input_column, output_column)
         self._set_output_df(data, df)
+
+
+class SpillMixin:
+    """ Helps the rules which spill intermediate data to disk to limit the memory they use. """
+
+    @contextmanager
+    def _spill_dir(self, prefix: str) -> Generator[str, None, None]:
+        """ Creates a temporary directory in the etlrules temporary directory, removing it when done. """
+        try:
+            temp_dir = context.etlrules_tempdir
+        except (KeyError, RuntimeError):
+            temp_dir = None
+        spill_dir = tempfile.mkdtemp(prefix=prefix, dir=temp_dir)
+        try:
+            yield spill_dir
+        finally:
+            shutil.rmtree(spill_dir, ignore_errors=True)
@@ -1,13 +1,13 @@
-from typing import Literal, Iterable, Mapping, Optional, Sequence, Union
+from typing import Literal, Iterable, Mapping, NoReturn, Optional, Sequence, Union
 
 from etlrules.data import RuleData
 from etlrules.rule import BaseRule, UnaryOpBaseRule, ColumnsInOutMixin
 from etlrules.exceptions import MissingColumnError, UnsupportedTypeError
-from etlrules.backends.common.base import BaseAssignColumnRule
+from etlrules.backends.common.base import BaseAssignColumnRule, SpillMixin
 from etlrules.backends.common.types import SUPPORTED_TYPES
 
 
-class DedupeRule(UnaryOpBaseRule):
+class DedupeRule(UnaryOpBaseRule, SpillMixin):
     """ De-duplicates by dropping duplicates using a set of columns to determine the duplicates.
 
     It has logic to keep the first, last or none of the duplicate in a set of duplicates.
@@ -19,6 +19,18 @@ class DedupeRule(UnaryOpBaseRule):
             first: keeps the first row in the duplicate set
             last: keeps the last row in the duplicate set
             none: drops all the duplicates
+        sorted_input: When True, the input dataframe is declared to be sorted by the columns (each column ascending
+            or descending, with the nulls first or last), ie the duplicates are adjacent rows, and they are removed
+            with a linear scan. Default: False.
+            In strict mode, the rule verifies that the input is sorted with a linear scan and raises a ValueError
+            otherwise. In non-strict mode, an input grouped by the columns without being sorted is also de-duplicated.
+            Only used by the pandas and polars backends.
+        spill_partitions: When set, the input dataframe is split into this number of partitions by the hash of the
+            columns, which are spilled to disk (in the etlrules temporary directory) a chunk of rows at a time and
+            de-duplicated one partition at a time. Optional.
+            It limits the memory used by the hashing and the de-duplication to a chunk or a partition, the input and
+            the result dataframes are still held in memory.
+            Only used by the pandas and polars backends (the dask backend is already partitioned).
 
         named_input: Which dataframe to use as the input. Optional.
             When not set, the input is taken from the main output.
@@ -34,6 +46,7 @@ class DedupeRule(UnaryOpBaseRule):
 
     Raises:
         MissingColumnError: raised when a column specified to deduplicate on doesn't exist in the input data frame.
+        ValueError: raised in strict mode when sorted_input is True but the duplicates are not adjacent rows.
 
     Note:
         MissingColumnError is raised in both strict and non-strict modes. This is because the rule cannot operate reliably without a correct set of columns.
@@ -44,8 +57,13 @@ class DedupeRule(UnaryOpBaseRule):
     KEEP_NONE = 'none'
 
     ALL_KEEPS = (KEEP_FIRST, KEEP_LAST, KEEP_NONE)
+
+    # the number of rows hashed and spilled at a time when spill_partitions is set
+    SPILL_CHUNK_ROWS = 1_000_000
  
-    def __init__(self, columns: Iterable[str], keep: Literal[KEEP_FIRST, KEEP_LAST, KEEP_NONE]=KEEP_FIRST, named_input: Optional[str]=None, named_output: Optional[str]=None, name: Optional[str]=None, description: Optional[str]=None, strict: bool=True):
+    def __init__(self, columns: Iterable[str], keep: Literal[KEEP_FIRST, KEEP_LAST, KEEP_NONE]=KEEP_FIRST, sorted_input: bool=False,
+                 spill_partitions: Optional[int]=None, named_input: Optional[str]=None, named_output: Optional[str]=None,
+                 name: Optional[str]=None, description: Optional[str]=None, strict: bool=True):
         super().__init__(named_input=named_input, named_output=named_output, name=name, description=description, strict=strict)
         self.columns = [col for col in columns]
         assert all(
@@ -53,6 +71,12 @@ class DedupeRule(UnaryOpBaseRule):
         ), "DedupeRule: columns must be strings"
         assert keep in self.ALL_KEEPS, f"DedupeRule: keep must be one of: {self.ALL_KEEPS}"
         self.keep = keep
+        self.sorted_input = sorted_input
+        assert spill_partitions is None or (isinstance(spill_partitions, int) and spill_partitions > 0), "DedupeRule: spill_partitions must be a positive integer"
+        self.spill_partitions = spill_partitions
+
+    def _raise_not_sorted(self) -> NoReturn:
+        raise ValueError(f"The input dataframe is not sorted by the columns to dedupe on: {self.columns}.")
 
     def do_dedupe(self, df):
         raise NotImplementedError("Have you imported the rules from etlrules.backends.<your_backend> and not common?")
@@ -183,6 +207,10 @@ class ReplaceRule(BaseAssignColumnRule):
         rule = ReplaceRule("col_I", values=[1, 2], new_values=[3, 4])
         rule.apply(data)
 
+        # replaces the "St." and "Rd." substrings anywhere in the values of col_A, e.g. "1 Main St." becomes "1 Main Street"
+        rule = ReplaceRule("col_A", values=["St.", "Rd."], new_values=["Street", "Road"], substring=True)
+        rule.apply(data)
+
     Args:
         input_column (str): A column with the input values.
         values: A sequence of values to replace. Regular expressions can be used to match values more widely,
@@ -193,10 +221,19 @@ class ReplaceRule(BaseAssignColumnRule):
             New values can be any supported types but they should match the type of the columns.
         regex: True if all the values and new_values are to be interpreted as regular expressions. Default: False.
             regex=True is only applicable to string columns.
+            All the regular expressions are matched in a single pass over each value: at each position, the first
+            regular expression (in the order of values) which matches is replaced and the replaced text is not
+            matched again by the other regular expressions. The polars backend matches multiple regular expressions
+            with python's re module, as its native regular expressions cannot pick the replacement by the regular
+            expression which matched.
         output_column (Optional[str]): An optional column to hold the result with the new values.
             Optional. If provided, if must have the same length as the columns sequence.
             The existing columns are unchanged, and new columns are created with the upper case values.
             If not provided, the result is updated in place.
+        substring: True to replace the values wherever they appear in the strings (as substrings), rather than
+            only replacing the values which are equal to one of the values. Default: False.
+            substring=True is only applicable to string columns and it cannot be used together with regex=True.
+            When the values overlap (e.g. a value is a prefix of another value), the shorter value is replaced.
 
         named_input (Optional[str]): Which dataframe to use as the input. Optional.
             When not set, the input is taken from the main output.
@@ -218,7 +255,7 @@ class ReplaceRule(BaseAssignColumnRule):
         In non-strict mode, overwriting existing columns is ignored.
     """
 
-    def __init__(self, input_column: str, values: Iterable[Union[int,float,str]], new_values: Iterable[Union[int,float,str]], regex=False, output_column:Optional[str]=None, named_input: Optional[str]=None, named_output: Optional[str]=None, name: Optional[str]=None, description: Optional[str]=None, strict: bool=True):
+    def __init__(self, input_column: str, values: Iterable[Union[int,float,str]], new_values: Iterable[Union[int,float,str]], regex=False, output_column:Optional[str]=None, substring: bool=False, named_input: Optional[str]=None, named_output: Optional[str]=None, name: Optional[str]=None, description: Optional[str]=None, strict: bool=True):
         super().__init__(input_column=input_column, output_column=output_column, named_input=named_input, named_output=named_output, 
                          name=name, description=description, strict=strict)
         self.values = [val for val in values]
@@ -226,20 +263,31 @@ class ReplaceRule(BaseAssignColumnRule):
         assert len(self.values) == len(self.new_values), "values and new_values must be of the same length."
         assert self.values, "values must not be empty."
         self.regex = regex
-        if self.regex:
+        self.substring = substring
+        assert not (self.regex and self.substring), "regex and substring cannot be both set."
+        if self.regex or self.substring:
             assert all(isinstance(val, str) for val in self.values)
             assert all(isinstance(val, str) for val in self.new_values)
+        if self.substring:
+            assert all(self.values), "The substring values must not be empty."
 
     def do_apply(self, df, col):
         raise NotImplementedError("Have you imported the rules from etlrules.backends.<your_backend> and not common?")
 
 
-class SortRule(UnaryOpBaseRule):
+class SortRule(UnaryOpBaseRule, SpillMixin):
     """ Sort the input dataframe by the given columns, either ascending or descending.
 
     Args:
         sort_by: Either a single column speified as a string or a list or tuple of columns to sort by
         ascending: Whether to sort ascending or descending. Boolean. Default: True
+        max_memory_mb: A memory budget (in MB) for the working set of the sort. Optional.
+            When the input dataframe is larger than the budget, it is sorted externally: the dataframe is split into
+            runs which fit in the budget, each run is sorted and spilled to disk (in the etlrules temporary directory)
+            and the sorted runs are then merged in batches into the result.
+            The budget only limits the memory used by the sorting and the merging (the copies of the run being sorted
+            and of the batches being merged), the input and the sorted result dataframes are still held in memory.
+            When not set, the dataframe is sorted in memory. Only used by the pandas and polars backends.
 
         named_input: Which dataframe to use as the input. Optional.
             When not set, the input is taken from the main output.
@@ -261,7 +309,10 @@ class SortRule(UnaryOpBaseRule):
         For any rows that have the same value in the first column, the second column is used to decide the sort order within that group and so on.
     """
 
-    def __init__(self, sort_by: Iterable[str], ascending: Union[bool,Iterable[bool]]=True, named_input: Optional[str]=None, named_output: Optional[str]=None, name: Optional[str]=None, description: Optional[str]=None, strict: bool=True):
+    RUN_COLUMN = "__etlrules_sort_run__"
+
+    def __init__(self, sort_by: Iterable[str], ascending: Union[bool,Iterable[bool]]=True, max_memory_mb: Optional[float]=None,
+                 named_input: Optional[str]=None, named_output: Optional[str]=None, name: Optional[str]=None, description: Optional[str]=None, strict: bool=True):
         super().__init__(named_input=named_input, named_output=named_output, name=name, description=description, strict=strict)
         if isinstance(sort_by, str):
             self.sort_by = [sort_by]
@@ -269,6 +320,15 @@ class SortRule(UnaryOpBaseRule):
             self.sort_by = [s for s in sort_by]
         assert isinstance(ascending, bool) or (isinstance(ascending, (list, tuple)) and all(isinstance(val, bool) for val in ascending) and len(ascending) == len(self.sort_by)), "ascending must be a bool or a list of bool of the same len as sort_by"
         self.ascending = ascending
+        assert max_memory_mb is None or (isinstance(max_memory_mb, (int, float)) and max_memory_mb > 0), "max_memory_mb must be a positive number"
+        self.max_memory_mb = max_memory_mb
+
+    def _get_run_rows(self, num_rows: int, size: int) -> Optional[int]:
+        """ Returns the number of rows in a run for an external sort or None when the dataframe fits in the memory budget. """
+        budget = self.max_memory_mb * 1024 * 1024 if self.max_memory_mb is not None else None
+        if budget is None or size <= budget or num_rows <= 1:
+            return None
+        return max(1, int(num_rows * budget / size))
 
     def do_sort(self, df):
         raise NotImplementedError("Have you imported the rules from etlrules.backends.<your_backend> and not common?")
@@ -282,6 +342,83 @@ class SortRule(UnaryOpBaseRule):
         self._set_output_df(data, df)
 
 
+class TopNRule(UnaryOpBaseRule):
+    """ Keeps the top n rows according to a sort order, optionally for each group of rows.
+
+    It produces the same rows as sorting the dataframe and keeping its first n rows (or the first n rows of each group)
+    without sorting the whole dataframe, by selecting the top rows directly (partial selection).
+
+    Basic usage::
+
+        # keeps the 10 rows with the largest values in column A
+        rule = TopNRule(10, "A")
+        rule.apply(data)
+
+        # keeps the latest row (by column Timestamp) for each Id
+        rule = TopNRule(1, "Timestamp", group_by=["Id"])
+        rule.apply(data)
+
+    Args:
+        n: The number of rows to keep (for each group when group_by is specified).
+        sort_by: Either a single column specified as a string or a list or tuple of columns which determine the top rows.
+        ascending: When False, the top rows are the ones with the largest values in the sort_by columns.
+            When True, the top rows are the ones with the smallest values. A bool or a list of bool of the same
+            length as sort_by (one for each column). Default: False
+        group_by: A list of columns to group by. When specified, the top n rows are kept for each group. Optional.
+
+        named_input: Which dataframe to use as the input. Optional.
+            When not set, the input is taken from the main output.
+            Set it to a string value, the name of an output dataframe of a previous rule.
+        named_output: Give the output of this rule a name so it can be used by another rule as a named input. Optional.
+            When not set, the result of this rule will be available as the main output.
+            When set to a name (string), the result will be available as that named output.
+        name: Give the rule a name. Optional.
+            Named rules are more descriptive as to what they're trying to do/the intent.
+        description: Describe in detail what the rules does, how it does it. Optional.
+            Together with the name, the description acts as the documentation of the rule.
+        strict: When set to True, the rule does a stricter valiation. Default: True
+
+    Raises:
+        MissingColumnError: raised when a column in the sort_by or group_by doesn't exist in the input dataframe.
+
+    Note:
+        The result is sorted by the sort_by columns. Rows with the same values in the sort_by columns can be kept
+        or dropped in any order when they are at the boundary of the top n rows.
+        The null values are ordered as in the SortRule of the backend (first for polars, last for pandas and dask).
+        The pandas and dask backends sort the whole dataframe (each partition for dask) when the rows are grouped
+        by a group_by and sorted by multiple columns, as there's no partial selection for that case.
+    """
+
+    def __init__(self, n: int, sort_by: Union[str, Iterable[str]], ascending: Union[bool, Iterable[bool]]=False, group_by: Optional[Iterable[str]]=None,
+                 named_input: Optional[str]=None, named_output: Optional[str]=None, name: Optional[str]=None, description: Optional[str]=None, strict: bool=True):
+        super().__init__(named_input=named_input, named_output=named_output, name=name, description=description, strict=strict)
+        assert isinstance(n, int) and n > 0, "n must be a positive integer"
+        self.n = n
+        if isinstance(sort_by, str):
+            self.sort_by = [sort_by]
+        else:
+            self.sort_by = [s for s in sort_by]
+        assert self.sort_by, "sort_by must have at least one column"
+        assert isinstance(ascending, bool) or (isinstance(ascending, (list, tuple)) and all(isinstance(val, bool) for val in ascending) and len(ascending) == len(self.sort_by)), "ascending must be a bool or a list of bool of the same len as sort_by"
+        self.ascending = ascending
+        self.group_by = [col for col in group_by] if group_by else None
+
+    def _get_ascending(self) -> list[bool]:
+        return [self.ascending] * len(self.sort_by) if isinstance(self.ascending, bool) else list(self.ascending)
+
+    def do_top_n(self, df):
+        raise NotImplementedError("Have you imported the rules from etlrules.backends.<your_backend> and not common?")
+
+    def apply(self, data):
+        super().apply(data)
+        df = self._get_input_df(data)
+        columns = set(self.sort_by) | set(self.group_by or ())
+        if not columns <= set(df.columns):
+            raise MissingColumnError(f"Column(s) {columns - set(df.columns)} are missing from the input dataframe.")
+        df = self.do_top_n(df)
+        self._set_output_df(data, df)
+
+
 class RulesBlock(UnaryOpBaseRule):
     """ Groups rules into encapsulated blocks or units of rules that achieve one thing.
     Blocks are reusable and encapsulated to reduce complexity.
@@ -1,37 +1,139 @@
+import hashlib
 import os, re
-from typing import List, NoReturn, Optional, Sequence, Tuple, Union
+from typing import List, Mapping, NoReturn, Optional, Sequence, Tuple, Union
 
+from etlrules.data import context, dynamic_filters, state_commits
+from etlrules.exceptions import UnsupportedTypeError
 from etlrules.rule import BaseRule, UnaryOpBaseRule
+from etlrules.backends.common.io.http_cache import HTTPDownloadCache
+from etlrules.backends.common.io.parsed_cache import ParsedFileCache
+from etlrules.backends.common.io.state import load_json_state, save_json_state
 from etlrules.backends.common.substitution import subst_string
+from etlrules.backends.common.types import SUPPORTED_TYPES
+
+
+class ProcessedFilesManifest:
+    """ Keeps track of the files processed by a reader rule in a json state file.
+
+    For each file, the manifest records the size, the modified time and optionally a checksum
+    of the contents, which are used to determine whether a file is new or it has changed since
+    it was last processed.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, state_file: str, checksum: bool=False):
+        self.state_file = state_file
+        self.checksum = checksum
+        self.files = load_json_state(state_file).get("files", {})
+        self.modified = False
+
+    def _get_checksum(self, file_path: str) -> str:
+        hsh = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b""):
+                hsh.update(chunk)
+        return hsh.hexdigest()
+
+    def get_file_info(self, file_path: str) -> dict:
+        stat = os.stat(file_path)
+        return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+    def is_changed(self, file_path: str, file_info: dict) -> bool:
+        """ Returns True if the file is new or changed since it was last processed.
+
+        The file_info is updated with the checksum if one was calculated, such that it can be
+        recorded in the manifest without recalculating.
+        """
+        previous_info = self.files.get(file_path)
+        if previous_info is None:
+            return True
+        if previous_info["size"] == file_info["size"] and previous_info["mtime"] == file_info["mtime"]:
+            return False
+        if self.checksum and previous_info.get("checksum") is not None:
+            file_info["checksum"] = self._get_checksum(file_path)
+            if file_info["checksum"] == previous_info["checksum"]:
+                # same contents, record the new size/mtime to avoid recalculating the checksum next time
+                self.files[file_path] = file_info
+                self.modified = True
+                return False
+        return True
+
+    def add_file(self, file_path: str, file_info: dict) -> None:
+        if self.checksum and "checksum" not in file_info:
+            file_info["checksum"] = self._get_checksum(file_path)
+        self.files[file_path] = file_info
+        self.modified = True
+
+    def get_last_processed_file(self) -> Optional[str]:
+        existing = [(info["mtime"], file_path) for file_path, info in self.files.items() if os.path.exists(file_path)]
+        return max(existing)[1] if existing else None
+
+    def save(self) -> None:
+        if self.modified:
+            save_json_state(self.state_file, {"files": self.files})
 
 
 class BaseReadFileRule(BaseRule):
-    def __init__(self, file_name: str, file_dir: Optional[str]=None, regex: bool=False, named_output: Optional[str]=None, name: Optional[str]=None, description: Optional[str]=None, strict: bool=True):
+
+    HTTP_CACHE_DIR = "http_cache_dir"
+    HTTP_CACHE_MAX_SIZE_MB = "http_cache_max_size_mb"
+    # the number of rows read to infer the schema of the files with no schema (e.g. csv) for an empty result
+    EMPTY_RESULT_SAMPLE_ROWS = 1000
+    DEFAULT_HTTP_CACHE_MAX_SIZE_MB = 1024
+
+    def __init__(self, file_name: str, file_dir: Optional[str]=None, regex: bool=False,
+                 incremental_state_file: Optional[str]=None, incremental_checksum: bool=False, incremental_empty_result: bool=False,
+                 named_output: Optional[str]=None, name: Optional[str]=None, description: Optional[str]=None, strict: bool=True):
         super().__init__(named_output=named_output, name=name, description=description, strict=strict)
         self.file_name = file_name
         self.file_dir = file_dir
         self.regex = bool(regex)
         if self._is_uri() and self.regex:
             raise ValueError("Regex read not supported for URIs.")
+        self.incremental_state_file = incremental_state_file
+        self.incremental_checksum = bool(incremental_checksum)
+        self.incremental_empty_result = bool(incremental_empty_result)
+        if self._is_uri() and self.incremental_state_file:
+            raise ValueError("Incremental read not supported for URIs.")
 
     def _is_uri(self):
         file_name = self.file_name.lower()
         return file_name.startswith("http://") or file_name.startswith("https://")
 
+    def _is_local_path(self, file_path: str) -> bool:
+        """ Returns True when the file path is a local file (including a URI downloaded by the http cache). """
+        file_path = file_path.lower()
+        return not (file_path.startswith("http://") or file_path.startswith("https://"))
+
     def has_input(self):
         return False
 
+    def _get_http_cache(self) -> Optional[HTTPDownloadCache]:
+        try:
+            cache_dir = context[self.HTTP_CACHE_DIR]
+        except (KeyError, RuntimeError):
+            return None
+        if not cache_dir:
+            return None
+        try:
+            max_size_mb = context[self.HTTP_CACHE_MAX_SIZE_MB]
+        except KeyError:
+            max_size_mb = self.DEFAULT_HTTP_CACHE_MAX_SIZE_MB
+        return HTTPDownloadCache(subst_string(cache_dir), int(max_size_mb * 1024 * 1024))
+
     def _get_full_file_paths(self):
         file_name = subst_string(self.file_name)
         file_dir = subst_string(self.file_dir or "")
         if self.regex:
             pattern = re.compile(file_name)
-            for fn in os.listdir(file_dir):
+            for fn in sorted(os.listdir(file_dir)):
                 if pattern.match(fn):
                     yield os.path.join(file_dir, fn)
         else:
             if self._is_uri():
-                yield file_name
+                http_cache = self._get_http_cache()
+                yield http_cache.get(file_name) if http_cache is not None else file_name
             else:
                 yield os.path.join(file_dir, file_name)
 
@@ -41,16 +143,52 @@ class BaseReadFileRule(BaseRule):
     def do_concat(self, left_df, right_df):
         raise NotImplementedError("Have you imported the rules from etlrules.backends.<your_backend> and not common?")
 
-    def apply(self, data):
-        super().apply(data)
+    def do_empty(self, df):
+        raise NotImplementedError("Have you imported the rules from etlrules.backends.<your_backend> and not common?")
 
+    def do_read_empty(self, file_path: str):
+        """ Returns an empty dataframe with the schema of the file. The backends override it to avoid reading all the data. """
+        return self.do_empty(self._read_file(file_path))
+
+    def _read_file(self, file_path: str):
+        return self.do_read(file_path)
+
+    def _read_files(self, file_paths):
         result = None
-        for file_path in self._get_full_file_paths():
-            df = self.do_read(file_path)
+        for file_path in file_paths:
+            df = self._read_file(file_path)
             if result is None:
                 result = df
             else:
                 result = self.do_concat(result, df)
+        return result
+
+    def _apply_incremental(self):
+        manifest = ProcessedFilesManifest(subst_string(self.incremental_state_file), checksum=self.incremental_checksum)
+        changed_files = []
+        for file_path in self._get_full_file_paths():
+            file_info = manifest.get_file_info(file_path)
+            if manifest.is_changed(file_path, file_info):
+                changed_files.append((file_path, file_info))
+        result = None
+        if changed_files:
+            result = self._read_files(file_path for file_path, _ in changed_files)
+            for file_path, file_info in changed_files:
+                manifest.add_file(file_path, file_info)
+        elif self.incremental_empty_result:
+            last_file = manifest.get_last_processed_file()
+            if last_file is not None:
+                result = self.do_read_empty(last_file)
+        # the manifest is only saved once the whole run succeeded, so the files are read again by a failed run
+        state_commits.add(manifest.save)
+        return result
+
+    def apply(self, data):
+        super().apply(data)
+        if self.incremental_state_file:
+            result = self._apply_incremental()
+        else:
+            result = self._read_files(self._get_full_file_paths())
         self._set_output_df(data, result)
 
 
@@ -73,21 +211,45 @@ class ReadCSVFileRule(BaseReadFileRule):
         rule = ReadCSVFileRule("data[0-9]{4}.csv", "/home/myuser/", regex=True, named_output="input_data")
         rule.apply(data)
 
+        # same as above, but only reads the files which are new or changed since the last run
+        rule = ReadCSVFileRule("data[0-9]{4}.csv", "/home/myuser/", regex=True, incremental_state_file="/home/myuser/state/data.json", named_output="input_data")
+        rule.apply(data)
+
     Args:
         file_name: The name of the csv file to load. The format will be inferred from the extension of the file.
             A simple text csv file will be inferred from the .csv extension. The extensions like .zip, .gz, .bz2, .xz
             will extract a single compressed csv file from the given input compressed file.
+            The polars backend also supports zstd compressed csv files with the .zst extension. It decompresses the
+            local files (including the URIs downloaded by the http cache) in chunks into a temporary file.
             file_name can also be a regular expression (specify regex=True in that case).
             The reader will find all the files in the file_dir directory that match the regular expression and extract
             all those csv file and concatenate them into a single dataframe.
             For example, file_name=".*\.csv", file_dir=".", regex=True will extract all the files with the .csv extension
             from the current directory.
             It can also be an URI (e.g. https://example.com/mycsv.csv)
+            URIs can be cached locally by setting http_cache_dir in the plan context to a directory where the
+            downloaded files will be stored. Subsequent reads of the same URI only download the file again if it
+            changed on the server (using the ETag/Last-Modified headers). The size of the cache can be limited by
+            setting http_cache_max_size_mb in the plan context (default 1024), with the least recently used files
+            being evicted when the cache exceeds that size.
         file_dir: The file directory where the file_name is located. When file_name is a regular expression and 
             the regex parameter is True, file_dir is the directory that is inspected for any files that match the
             regular expression. Optional.
             For files it defaults to . (ie the current directory). Ignored for URIs.
         regex: When True, the file_name is interpreted as a regular expression. Defaults to False.
+        incremental_state_file: A path to a json state file which records the files already read (ie a manifest).
+            When set, the rule runs in incremental mode, only reading the files which are new or have changed since
+            the previous run (according to the manifest) and recording them in the manifest once the run succeeded
+            (or straight away when the rule is applied outside of a RuleEngine run). Optional.
+            Files are considered changed when their size or modified time differ from the manifest.
+            The env and context substitutions are supported (e.g. {context.STATE_DIR}/my_state.json).
+        incremental_checksum: When True, a checksum of the contents of the files is also recorded in the manifest and
+            files with a different size or modified time but with the same checksum are not considered changed.
+            Only used in incremental mode. Defaults to False.
+        incremental_empty_result: When True, an empty dataframe with the schema of the last file read is produced
+            when there are no new or changed files. When False, the result is None in that case.
+            The schema is inferred from the first rows of the last file read.
+            Only used in incremental mode. Defaults to False.
         separator: The single character to be used as separator in the csv file. Defaults to , (comma).
         header: When True, the first line is interpreted as the header and the column names are extracted from it.
             When False, the first line is part of the data and the columns will have names like 0, 1, 2, etc.
@@ -105,16 +267,80 @@ class ReadCSVFileRule(BaseReadFileRule):
 
     Raises:
         IOError: raised when the file is not found.
+
+    Note:
+        Parsing csv files is expensive. When the same csv files are read repeatedly, the parsed dataframes can be
+        cached by setting csv_cache_dir in the plan context to a directory where the parsed dataframes are stored in
+        a columnar format (arrow ipc or parquet). Later reads load the cached copy instead of parsing the csv file again,
+        as long as the file (ie its path, size and modified time) and the read options are the same.
+        The size of the cache can be limited by setting csv_cache_max_size_mb (default 10240) in the plan context,
+        with the least recently used entries being evicted first. Entries not used for more than
+        csv_cache_max_age_hours (no limit by default) are also evicted.
     """
 
+    CSV_CACHE_DIR = "csv_cache_dir"
+    CSV_CACHE_MAX_SIZE_MB = "csv_cache_max_size_mb"
+    CSV_CACHE_MAX_AGE_HOURS = "csv_cache_max_age_hours"
+    DEFAULT_CSV_CACHE_MAX_SIZE_MB = 10240
+
+    CACHE_EXT = ".arrow"
+
     def __init__(self, file_name: str, file_dir: Optional[str]=None, regex: bool=False, separator: str=",",
                  header: bool=True, skip_header_rows: Optional[int]=None,
+                 incremental_state_file: Optional[str]=None, incremental_checksum: bool=False, incremental_empty_result: bool=False,
                  named_output: Optional[str]=None, name: Optional[str]=None, description: Optional[str]=None, strict: bool=True):
-        super().__init__(file_name=file_name, file_dir=file_dir, regex=regex, named_output=named_output, name=name, description=description, strict=strict)
+        super().__init__(
+            file_name=file_name, file_dir=file_dir, regex=regex, incremental_state_file=incremental_state_file,
+            incremental_checksum=incremental_checksum, incremental_empty_result=incremental_empty_result,
+            named_output=named_output, name=name, description=description, strict=strict)
         self.separator = separator
         self.header = header
         self.skip_header_rows = skip_header_rows
 
+    def _get_parsed_cache(self) -> Optional[ParsedFileCache]:
+        try:
+            cache_dir = context[self.CSV_CACHE_DIR]
+        except (KeyError, RuntimeError):
+            return None
+        if not cache_dir:
+            return None
+        try:
+            max_size_mb = context[self.CSV_CACHE_MAX_SIZE_MB]
+        except KeyError:
+            max_size_mb = self.DEFAULT_CSV_CACHE_MAX_SIZE_MB
+        try:
+            max_age_hours = context[self.CSV_CACHE_MAX_AGE_HOURS]
+        except KeyError:
+            max_age_hours = None
+        return ParsedFileCache(
+            subst_string(cache_dir), int(max_size_mb * 1024 * 1024),
+            max_age_hours * 3600 if max_age_hours is not None else None
+        )
+
+    def _get_parse_options(self) -> dict:
+        # the backend is part of the options as each backend infers the types differently
+        return {
+            "backend": self.__class__.__module__,
+            "separator": self.separator,
+            "header": self.header,
+            "skip_header_rows": self.skip_header_rows,
+        }
+
+    def _read_file(self, file_path: str):
+        cache = self._get_parsed_cache()
+        if cache is None or not os.path.isfile(file_path):
+            return self.do_read(file_path)
+        return cache.get(
+            file_path, self._get_parse_options(), self.CACHE_EXT,
+            parse=self.do_read, load=self.do_cache_load, store=self.do_cache_store
+        )
+
+    def do_cache_load(self, cache_path: str):
+        raise NotImplementedError("Have you imported the rules from etlrules.backends.<your_backend> and not common?")
+
+    def do_cache_store(self, df, cache_path: str) -> None:
+        raise NotImplementedError("Have you imported the rules from etlrules.backends.<your_backend> and not common?")
+
 
 class ReadParquetFileRule(BaseReadFileRule):
     r""" Reads one or multiple parquet files from a directory and persists it as a dataframe for subsequent rules to operate on.
@@ -155,6 +381,19 @@ class ReadParquetFileRule(BaseReadFileRule):
             regular expression.
             Defaults to . (ie the current directory).
         regex: When True, the file_name is interpreted as a regular expression. Defaults to False.
+        incremental_state_file: A path to a json state file which records the files already read (ie a manifest).
+            When set, the rule runs in incremental mode, only reading the files which are new or have changed since
+            the previous run (according to the manifest) and recording them in the manifest once the run succeeded
+            (or straight away when the rule is applied outside of a RuleEngine run). Optional.
+            Files are considered changed when their size or modified time differ from the manifest.
+            The env and context substitutions are supported (e.g. {context.STATE_DIR}/my_state.json).
+        incremental_checksum: When True, a checksum of the contents of the files is also recorded in the manifest and
+            files with a different size or modified time but with the same checksum are not considered changed.
+            Only used in incremental mode. Defaults to False.
+        incremental_empty_result: When True, an empty dataframe with the schema of the last file read is produced
+            when there are no new or changed files. When False, the result is None in that case.
+            The schema is read from the parquet metadata of the last file read.
+            Only used in incremental mode. Defaults to False.
         columns: A subset of the columns in the parquet file to load.
         filters: A list of filters to apply to filter the rows returned. Rows which do not match the filter conditions
             will be removed from scanned data.
@@ -165,6 +404,8 @@ class ReadParquetFileRule(BaseReadFileRule):
             Column is the name of a column in the input dataframe.
             Operation is one of: "==", "=", ">", ">=", "<", "<=", "!=", "in", "not in".
             Value is a scalar value, int, float, string, etc. When the operation is in or not in, the value must be a list, tuple or set of values.
+            When the plan runs in graph mode with dynamic_filters enabled, the engine can add filters on the join keys
+            at run time (see RuleEngine).
 
         named_output (Optional[str]): Give the output of this rule a name so it can be used by another rule as a named input. Optional.
             When not set, the result of this rule will be available as the main output.
@@ -186,11 +427,15 @@ class ReadParquetFileRule(BaseReadFileRule):
     """
 
     SUPPORTED_FILTERS_OPS = {"==", "=", ">", ">=", "<", "<=", "!=", "in", "not in"}
+    SUPPORTS_DYNAMIC_FILTERS = True
 
-    def __init__(self, file_name: str, file_dir: str=".", columns: Optional[Sequence[str]]=None, filters:Optional[Union[List[Tuple], List[List[Tuple]]]]=None, regex: bool=False, named_output: Optional[str]=None, name: Optional[str]=None, description: Optional[str]=None, strict: bool=True):
+    def __init__(self, file_name: str, file_dir: str=".", columns: Optional[Sequence[str]]=None, filters:Optional[Union[List[Tuple], List[List[Tuple]]]]=None, regex: bool=False,
+                 incremental_state_file: Optional[str]=None, incremental_checksum: bool=False, incremental_empty_result: bool=False,
+                 named_output: Optional[str]=None, name: Optional[str]=None, description: Optional[str]=None, strict: bool=True):
         super().__init__(
-            file_name=file_name, file_dir=file_dir, regex=regex, named_output=named_output,
-            name=name, description=description, strict=strict)
+            file_name=file_name, file_dir=file_dir, regex=regex, incremental_state_file=incremental_state_file,
+            incremental_checksum=incremental_checksum, incremental_empty_result=incremental_empty_result,
+            named_output=named_output, name=name, description=description, strict=strict)
         self.columns = columns
         self.filters = self._get_filters(filters) if filters is not None else None
 
@@ -237,6 +482,102 @@ class ReadParquetFileRule(BaseReadFileRule):
            self._raise_filters_invalid(f"Top level expected a list/tuple, got: {filters}")
         return lst
 
+    def _get_read_filters(self):
+        """ Returns the filters to read the parquet file with: the rule's filters and the dynamic filters set by the engine. """
+        filters = dynamic_filters.get()
+        if not filters:
+            return self.filters
+        filters = [self._validate_tuple(flt) for flt in filters]
+        if not self.filters:
+            return filters
+        if isinstance(self.filters[0], list):
+            # List[List[Tuple]] form: the dynamic filters must apply to each alternative
+            return [filters2 + filters for filters2 in self.filters]
+        return self.filters + filters
+
+
+class ReadJSONLinesFileRule(BaseReadFileRule):
+    r""" Reads one or multiple JSON lines (NDJSON) files from a directory and persists it as a dataframe for subsequent rules to operate on.
+
+    Each line in the file is a JSON object representing a row, with the keys being the column names.
+
+    Basic usage::
+
+        # reads a file data.jsonl and persists it as the main output of the rule
+        rule = ReadJSONLinesFileRule("data.jsonl", "/home/myuser/")
+        rule.apply(data)
+
+        # reads all the files with the .jsonl extension from the home dir of myuser and
+        # concatenates them into a single dataframe, forcing the types of columns A and B
+        rule = ReadJSONLinesFileRule(".*\.jsonl", "/home/myuser/", regex=True, column_types={"A": "int64", "B": "string"}, named_output="input_data")
+        rule.apply(data)
+
+    Args:
+        file_name: The name of the JSON lines file to load.
+            file_name can also be a regular expression (specify regex=True in that case).
+            The reader will find all the files in the file_dir directory that match the regular expression and extract
+            all those files and concatenate them into a single dataframe.
+            For example, file_name=".*\.jsonl", file_dir=".", regex=True will extract all the files with the .jsonl extension
+            from the current directory.
+            It can also be an URI (e.g. https://example.com/data.jsonl)
+        file_dir: The file directory where the file_name is located. When file_name is a regular expression and 
+            the regex parameter is True, file_dir is the directory that is inspected for any files that match the
+            regular expression. Optional.
+            For files it defaults to . (ie the current directory). Ignored for URIs.
+        regex: When True, the file_name is interpreted as a regular expression. Defaults to False.
+        column_types: A mapping of column names and their types. Optional.
+            The types of the columns not specified in the mapping are inferred from the data.
+            The supported types are: int8, int16, int32, int64, uint8, uint16, uint32, uint64, float32, float64, string and boolean.
+        block_size: The size in bytes of the blocks in which the files are parsed. Optional.
+            Larger files are parsed incrementally in blocks of this size rather than all at once.
+            The dask backend creates a partition for each block (when not set, it creates a partition per file).
+            The polars backend ignores it, its reader parses the files in parallel in chunks of its own.
+        incremental_state_file: A path to a json state file which records the files already read (ie a manifest).
+            When set, the rule runs in incremental mode, only reading the files which are new or have changed since
+            the previous run (according to the manifest) and recording them in the manifest once the run succeeded
+            (or straight away when the rule is applied outside of a RuleEngine run). Optional.
+            Files are considered changed when their size or modified time differ from the manifest.
+            The env and context substitutions are supported (e.g. {context.STATE_DIR}/my_state.json).
+        incremental_checksum: When True, a checksum of the contents of the files is also recorded in the manifest and
+            files with a different size or modified time but with the same checksum are not considered changed.
+            Only used in incremental mode. Defaults to False.
+        incremental_empty_result: When True, an empty dataframe with the schema of the last file read is produced
+            when there are no new or changed files. When False, the result is None in that case.
+            The schema is inferred from the first rows of the last file read.
+            Only used in incremental mode. Defaults to False.
+
+        named_output (Optional[str]): Give the output of this rule a name so it can be used by another rule as a named input. Optional.
+            When not set, the result of this rule will be available as the main output.
+            When set to a name (string), the result will be available as that named output.
+        name (Optional[str]): Give the rule a name. Optional.
+            Named rules are more descriptive as to what they're trying to do/the intent.
+        description (Optional[str]): Describe in detail what the rules does, how it does it. Optional.
+            Together with the name, the description acts as the documentation of the rule.
+        strict (bool): When set to True, the rule does a stricter valiation. Default: True
+
+    Raises:
+        IOError: raised when the file is not found.
+        UnsupportedTypeError: raised if column_types are specified and any of them are not supported.
+    """
+
+    def __init__(self, file_name: str, file_dir: Optional[str]=None, regex: bool=False,
+                 column_types: Optional[Mapping[str, str]]=None, block_size: Optional[int]=None,
+                 incremental_state_file: Optional[str]=None, incremental_checksum: bool=False, incremental_empty_result: bool=False,
+                 named_output: Optional[str]=None, name: Optional[str]=None, description: Optional[str]=None, strict: bool=True):
+        super().__init__(
+            file_name=file_name, file_dir=file_dir, regex=regex, incremental_state_file=incremental_state_file,
+            incremental_checksum=incremental_checksum, incremental_empty_result=incremental_empty_result,
+            named_output=named_output, name=name, description=description, strict=strict)
+        self.column_types = column_types
+        self._validate_column_types()
+        self.block_size = block_size
+
+    def _validate_column_types(self):
+        if self.column_types is not None:
+            for column, column_type in self.column_types.items():
+                if column_type not in SUPPORTED_TYPES:
+                    raise UnsupportedTypeError(f"Type '{column_type}' for column '{column}' is not supported.")
+
 
 class BaseWriteFileRule(UnaryOpBaseRule):
 
@@ -290,6 +631,7 @@ class WriteCSVFileRule(BaseWriteFileRule):
             gzip - file_name must end with .gz (e.g. output.csv.gz), will produced a gzipped csv file
             bz2 - file_name must end with .bz2 (e.g. output.csv.bz2), will produced a bzipped csv 
             xz - file_name must end with .xz (e.g. output.csv.xz), will produced a xz-compressed csv file
+            zstd - file_name must end with .zst (e.g. output.csv.zst), will produce a zstd-compressed csv file (polars only)
 
         named_input (Optional[str]): Select by name the dataframe to write from the input data.
             Optional. When not specified, the main output of the previous rule will be written.
@@ -360,3 +702,46 @@ class WriteParquetFileRule(BaseWriteFileRule):
         assert compression is None or compression in self.COMPRESSIONS, f"Unsupported compression '{compression}'. It must be one of: {self.COMPRESSIONS}."
         self.compression = compression
 
+
+
+class WriteJSONLinesFileRule(BaseWriteFileRule):
+    """ Writes an existing dataframe to a JSON lines (NDJSON) file on disk.
+
+    Each row is written as a JSON object on its own line, with the keys being the column names.
+    The rows are serialized and written in chunks, so the whole file is never materialized in memory.
+
+    The rule is a final rule, which means it produces no additional outputs, it takes any of the existing outputs and writes it to disk.
+
+    Basic usage::
+
+        # writes a file data.jsonl and persists the main output of the previous rule to it
+        rule = WriteJSONLinesFileRule("data.jsonl", "/home/myuser/")
+        rule.apply(data)
+
+        # writes a file test_data.jsonl and persists the dataframe named input_data into it
+        rule = WriteJSONLinesFileRule("test_data.jsonl", "/home/myuser/", named_input="input_data")
+        rule.apply(data)
+
+    Args:
+        file_name: The name of the JSON lines file to write to disk. It will be written in the directory
+            specified by the file_dir parameter.
+        file_dir: The file directory where the file_name should be written.
+            Defaults to . (ie the current directory).
+        chunk_size: The number of rows to serialize and write at a time. Defaults to 100000.
+            The dask backend writes a partition at a time.
+
+        named_input (Optional[str]): Select by name the dataframe to write from the input data.
+            Optional. When not specified, the main output of the previous rule will be written.
+        name (Optional[str]): Give the rule a name. Optional.
+            Named rules are more descriptive as to what they're trying to do/the intent.
+        description (Optional[str]): Describe in detail what the rules does, how it does it. Optional.
+            Together with the name, the description acts as the documentation of the rule.
+        strict (bool): When set to True, the rule does a stricter valiation. Default: True.
+    """
+
+    def __init__(self, file_name: str, file_dir: str=".", chunk_size: int=100_000, named_input: Optional[str]=None, name: Optional[str]=None, description: Optional[str]=None, strict: bool=True):
+        super().__init__(
+            file_name=file_name, file_dir=file_dir, named_input=named_input, 
+            name=name, description=description, strict=strict)
+        assert isinstance(chunk_size, int) and chunk_size > 0, "The chunk_size must be a positive integer."
+        self.chunk_size = chunk_size
@@ -0,0 +1,99 @@
+import hashlib
+import os
+import shutil
+import threading
+import urllib.error
+import urllib.request
+from typing import Optional
+from urllib.parse import urlparse
+
+from etlrules.backends.common.io.state import load_json_state, save_json_state
+
+
+class HTTPDownloadCache:
+    """ A local on-disk cache for files downloaded via http(s).
+
+    The downloaded files are stored in the cache directory, keyed by the url. When a url is
+    requested again, a conditional request is sent using the ETag/Last-Modified headers of the
+    cached copy and the file is only downloaded again if it changed on the server.
+
+    When the size of the files in the cache exceeds max_size (in bytes), the least recently
+    used files are evicted.
+    """
+
+    METADATA_EXT = ".meta.json"
+    TEMP_EXT = ".tmp"
+    CHUNK_SIZE = 1024 * 1024
+
+    _LOCK = threading.Lock()
+    _URL_LOCKS = {}
+
+    def __init__(self, cache_dir: str, max_size: int):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+    @classmethod
+    def _get_url_lock(cls, url: str) -> threading.Lock:
+        with cls._LOCK:
+            return cls._URL_LOCKS.setdefault(url, threading.Lock())
+
+    def get_paths(self, url: str) -> tuple[str, str]:
+        """ Returns the path of the cached file and the path of its metadata for a url. """
+        key = hashlib.sha256(url.encode()).hexdigest()
+        _, ext = os.path.splitext(urlparse(url).path)
+        return os.path.join(self.cache_dir, key + ext), os.path.join(self.cache_dir, key + self.METADATA_EXT)
+
+    def _download(self, response, data_path: str) -> None:
+        tmp_path = data_path + self.TEMP_EXT
+        with open(tmp_path, "wb") as f:
+            shutil.copyfileobj(response, f, self.CHUNK_SIZE)
+        os.replace(tmp_path, data_path)
+
+    def get(self, url: str) -> str:
+        """ Returns the local path of the file at url, downloading it if not cached or changed on the server. """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data_path, metadata_path = self.get_paths(url)
+        with self._get_url_lock(url):
+            metadata = load_json_state(metadata_path) if os.path.exists(data_path) else {}
+            headers = {}
+            if metadata.get("etag"):
+                headers["If-None-Match"] = metadata["etag"]
+            if metadata.get("last_modified"):
+                headers["If-Modified-Since"] = metadata["last_modified"]
+            try:
+                with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as response:
+                    self._download(response, data_path)
+                    save_json_state(metadata_path, {
+                        "url": url,
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                    })
+            except urllib.error.HTTPError as exc:
+                if exc.code != 304 or not metadata:
+                    raise
+                # not modified, mark it as recently used
+                os.utime(data_path)
+        self.evict(keep=data_path)
+        return data_path
+
+    def evict(self, keep: Optional[str]=None) -> None:
+        """ Evicts the least recently used files until the cache size is below max_size. """
+        with self._LOCK:
+            files = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file() and not entry.name.endswith((self.METADATA_EXT, self.TEMP_EXT)):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+            total_size = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total_size <= self.max_size:
+                    break
+                if path == keep:
+                    continue
+                # the key (a sha256 hex digest) is the file name up to the extension of the url
+                key = os.path.basename(path).split(".", 1)[0]
+                metadata_path = os.path.join(self.cache_dir, key + self.METADATA_EXT)
+                os.remove(path)
+                if os.path.exists(metadata_path):
+                    os.remove(metadata_path)
+                total_size -= size
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Any, Callable, Mapping, Optional
+
+
+class ParsedFileCache:
+    """ A local on-disk cache for the dataframes parsed from source files (e.g. csv files).
+
+    The parsed dataframes are stored in a columnar format (e.g. parquet or arrow ipc) which is much
+    faster to load than parsing the source file again. The entries are keyed by the path, size and
+    modified time of the source file and the options used to parse it, so changing the file or the
+    options results in a different entry.
+
+    Entries not used for longer than max_age seconds are evicted. When the size of the cache exceeds
+    max_size (in bytes), the least recently used entries are evicted.
+    """
+
+    TEMP_EXT = ".tmp"
+
+    _LOCK = threading.Lock()
+
+    def __init__(self, cache_dir: str, max_size: int, max_age: Optional[float]=None):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.max_age = max_age
+
+    def get_path(self, file_path: str, options: Mapping[str, Any], ext: str) -> str:
+        """ Returns the path of the cache entry for the file parsed with the given options. """
+        stat = os.stat(file_path)
+        key = json.dumps({
+            "path": os.path.abspath(file_path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "options": options,
+        }, sort_keys=True, default=str)
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode()).hexdigest() + ext)
+
+    def get(self, file_path: str, options: Mapping[str, Any], ext: str, parse: Callable[[str], Any],
+            load: Callable[[str], Any], store: Callable[[Any, str], None]) -> Any:
+        """ Returns the dataframe parsed from file_path, loading it from the cache when possible.
+
+        Args:
+            parse: A callable which parses the source file into a dataframe.
+            load: A callable which loads a dataframe from a cache entry.
+            store: A callable which stores a dataframe into a cache entry.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry_path = self.get_path(file_path, options, ext)
+        if os.path.exists(entry_path) and not self._is_expired(os.stat(entry_path).st_mtime):
+            # mark it as recently used
+            os.utime(entry_path)
+            return load(entry_path)
+        df = parse(file_path)
+        tmp_path = f"{entry_path}.{uuid.uuid4().hex[:8]}{self.TEMP_EXT}"
+        try:
+            store(df, tmp_path)
+            self._remove(entry_path)
+            os.replace(tmp_path, entry_path)
+        finally:
+            self._remove(tmp_path)
+        self.evict(keep=entry_path)
+        return load(entry_path)
+
+    def _is_expired(self, mtime: float) -> bool:
+        return self.max_age is not None and time.time() - mtime > self.max_age
+
+    def _get_size(self, path: str) -> int:
+        if os.path.isdir(path):
+            return sum(
+                os.path.getsize(os.path.join(dir_path, file_name))
+                for dir_path, _, file_names in os.walk(path) for file_name in file_names
+            )
+        return os.path.getsize(path)
+
+    def _remove(self, path: str) -> None:
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def evict(self, keep: Optional[str]=None) -> None:
+        """ Evicts the expired entries and the least recently used entries until the cache size is below max_size. """
+        with self._LOCK:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(self.TEMP_EXT):
+                    continue
+                mtime = entry.stat().st_mtime
+                if entry.path != keep and self._is_expired(mtime):
+                    self._remove(entry.path)
+                else:
+                    entries.append((mtime, self._get_size(entry.path), entry.path))
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total_size <= self.max_size:
+                    break
+                if path == keep:
+                    continue
+                self._remove(path)
+                total_size -= size
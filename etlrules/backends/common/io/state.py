@@ -0,0 +1,25 @@
+import json
+import os
+
+
+def load_json_state(state_file: str) -> dict:
+    """ Loads the state persisted by a rule in a json file. Returns an empty dict if the file doesn't exist. """
+    if not os.path.exists(state_file):
+        return {}
+    with open(state_file, "rt") as f:
+        return json.load(f)
+
+
+def save_json_state(state_file: str, state: dict) -> None:
+    """ Saves the state of a rule in a json file.
+
+    The state is written in a temporary file first which then replaces the state file to
+    avoid leaving a partially written state file behind if the process is interrupted.
+    """
+    state_dir = os.path.dirname(state_file)
+    if state_dir:
+        os.makedirs(state_dir, exist_ok=True)
+    tmp_file = state_file + ".tmp"
+    with open(tmp_file, "wt") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_file, state_file)
@@ -1,24 +1,135 @@
-from typing import Iterable, Optional
+import logging
+import threading
+import weakref
+from typing import Any, Iterable, Literal, NoReturn, Optional, Sequence, Union
 
 from etlrules.exceptions import MissingColumnError
-from etlrules.rule import BinaryOpBaseRule
+from etlrules.rule import BinaryOpBaseRule, UnaryOpBaseRule
 
 
-class BaseJoinRule(BinaryOpBaseRule):
+perf_logger = logging.getLogger("etlrules.perf")
+
+
+class JoinIndexes:
+    """ Keeps the join indexes built by the BuildJoinIndexRule so they can be reused by the join rules.
+
+    The indexes are keyed by the identity of the indexed dataframe and the key columns. An index is
+    dropped when its dataframe is garbage collected.
+    """
+
+    _INDEXES = {}
+    _LOCK = threading.Lock()
+
+    @classmethod
+    def register(cls, df, key_columns: Sequence[str], index: Any) -> None:
+        with cls._LOCK:
+            df_id = id(df)
+            if df_id not in cls._INDEXES:
+                cls._INDEXES[df_id] = {}
+                weakref.finalize(df, cls._drop, df_id)
+            cls._INDEXES[df_id][tuple(key_columns)] = index
+
+    @classmethod
+    def get(cls, df, key_columns: Sequence[str]) -> Optional[Any]:
+        with cls._LOCK:
+            return cls._INDEXES.get(id(df), {}).get(tuple(key_columns))
+
+    @classmethod
+    def _drop(cls, df_id: int) -> None:
+        with cls._LOCK:
+            cls._INDEXES.pop(df_id, None)
+
+
+class DynamicFiltersMixin:
+    """ Computes the filters on the join keys which can be pushed into the rule reading one of the join inputs.
+
+    The keys of the other input (once available) are turned into an in filter when there are at most
+    DYNAMIC_FILTERS_MAX_VALUES distinct values or a range filter (>= min and <= max) otherwise.
+    The filters never match the null keys, so no filter is pushed on a key which has nulls in the other input
+    when the join matches the null keys (NULL_KEYS_MATCH).
+    """
+
+    # the sides of the join which can be filtered by the keys of the other side, by join type
+    DYNAMIC_FILTERS_SIDES = {
+        "inner": ("left", "right"),
+        "semi": ("left", "right"),
+        "anti": ("right", ),
+    }
+    DYNAMIC_FILTERS_MAX_VALUES = 1000
+    # whether the join matches the null keys of one side with the null keys of the other side
+    NULL_KEYS_MATCH = False
+
+    def get_dynamic_filters_source(self, named_input: str) -> Optional[str]:
+        """ Returns the named input whose keys can filter the named_input dataframe or None if it cannot be filtered. """
+        sides = self.DYNAMIC_FILTERS_SIDES.get(self.JOIN_TYPE, ())
+        if named_input is None or self.named_input_left == self.named_input_right:
+            return None
+        if named_input == self.named_input_left and "left" in sides:
+            return self.named_input_right
+        if named_input == self.named_input_right and "right" in sides:
+            return self.named_input_left
+        return None
+
+    def get_dynamic_filters(self, data, named_input: str) -> list[tuple[str, str, Any]]:
+        """ Returns the (column, op, value) filters for reading the named_input dataframe, based on the keys of the other input. """
+        source = self.get_dynamic_filters_source(named_input)
+        assert source is not None
+        left_on, right_on = self._get_key_columns()
+        source_keys, keys = (left_on, right_on) if source == self.named_input_left else (right_on, left_on)
+        source_df = data.get_named_output(source)
+        filters = []
+        for source_key, key in zip(source_keys, keys):
+            if self.NULL_KEYS_MATCH and self._has_null_keys(source_df, source_key):
+                continue
+            values = self._get_key_values(source_df, source_key)
+            if len(values) <= self.DYNAMIC_FILTERS_MAX_VALUES:
+                filters.append((key, "in", values))
+            else:
+                filters.extend([(key, ">=", min(values)), (key, "<=", max(values))])
+        return filters
+
+    def _get_key_values(self, df, column: str) -> list:
+        """ Returns the distinct non-null values in the column. """
+        raise NotImplementedError("Have you imported the rules from etlrules.backends.<your_backend> and not common?")
+
+    def _has_null_keys(self, df, column: str) -> bool:
+        """ Returns True when the column has null values. """
+        raise NotImplementedError("Have you imported the rules from etlrules.backends.<your_backend> and not common?")
+
+
+class BaseJoinRule(DynamicFiltersMixin, BinaryOpBaseRule):
 
     JOIN_TYPE = None
 
-    def __init__(self, named_input_left: Optional[str], named_input_right: Optional[str], key_columns_left: Iterable[str], key_columns_right: Optional[Iterable[str]]=None, suffixes: Iterable[Optional[str]]=(None, "_r"), named_output: Optional[str]=None, name: Optional[str]=None, description: Optional[str]=None, strict: bool=True):
+    STRATEGY_HASH = "hash"
+    STRATEGY_MERGE = "merge"
+    STRATEGY_INDEX = "index"
+    STRATEGY_BROADCAST = "broadcast"
+
+    STRATEGIES = (STRATEGY_HASH, STRATEGY_MERGE, STRATEGY_INDEX, STRATEGY_BROADCAST)
+
+    def __init__(self, named_input_left: Optional[str], named_input_right: Optional[str], key_columns_left: Iterable[str], key_columns_right: Optional[Iterable[str]]=None, suffixes: Iterable[Optional[str]]=(None, "_r"), sorted_input: bool=False,
+                 strategy: Optional[Literal[STRATEGY_HASH, STRATEGY_MERGE, STRATEGY_INDEX, STRATEGY_BROADCAST]]=None, named_output: Optional[str]=None, name: Optional[str]=None, description: Optional[str]=None, strict: bool=True):
         super().__init__(named_input_left=named_input_left, named_input_right=named_input_right, named_output=named_output, name=name, description=description, strict=strict)
         assert isinstance(key_columns_left, (list, tuple)) and key_columns_left and all(isinstance(col, str) for col in key_columns_left), "JoinRule: key_columns_left must a non-empty list of tuple with str column names"
         self.key_columns_left = [col for col in key_columns_left]
         self.key_columns_right = [col for col in key_columns_right] if key_columns_right is not None else None
         assert isinstance(suffixes, (list, tuple)) and len(suffixes) == 2 and all(s is None or isinstance(s, str) for s in suffixes), "The suffixes must be a list or tuple of 2 elements"
         self.suffixes = suffixes
+        self.sorted_input = sorted_input
+        assert strategy is None or strategy in self.STRATEGIES, f"JoinRule: strategy must be one of {self.STRATEGIES}"
+        self.strategy = strategy
 
     def _get_key_columns(self):
         return self.key_columns_left, self.key_columns_right or self.key_columns_left
 
+    def _log_strategy(self, strategy: str) -> None:
+        perf_logger.info("%s: %s join on %s using the %s strategy.", self.get_name() or type(self).__name__, self.JOIN_TYPE, self.key_columns_left, strategy)
+
+    def _raise_not_sorted(self) -> NoReturn:
+        left_on, right_on = self._get_key_columns()
+        raise ValueError(f"The input dataframes are not sorted by the join keys (or the keys contain nulls): {left_on} and {right_on}.")
+
     def do_apply(self, left_df, right_df):
         raise NotImplementedError("Have you imported the rules from etlrules.backends.<your_backend> and not common?")
 
@@ -84,6 +195,18 @@ class LeftJoinRule(BaseJoinRule):
             If not set or set to None, the key_columns_left is used on the right dataframe too.
         suffixes (Iterable[Optional[str]]): A list or tuple of two values which will be set as suffixes for the columns in the
             result data frame for those columns that have the same name (and are not key columns).
+        sorted_input (bool): When True, both dataframes are declared to be sorted ascending by the key columns, without nulls
+            in the keys, and a merge join is used instead of building a hash table. Default: False.
+            Only single key column joins use a merge join, multiple key columns always use a hash join.
+            In strict mode, the pandas and polars backends raise a ValueError when the inputs are not sorted,
+            otherwise they fall back to a hash join. The dask backend trusts the declaration.
+        strategy (Optional[str]): Forces the join strategy, one of: hash, merge, index or broadcast. Optional.
+            When not set, the strategy is chosen based on the inputs: index when the right dataframe has a join index built by
+            BuildJoinIndexRule (pandas left and inner joins), merge when sorted_input is True, broadcast when the build side
+            is small (dask: its memory size, known for the dataframes created from pandas or read from parquet files, is at
+            most 100MB, otherwise it has much fewer partitions than the other side) and hash otherwise.
+            The broadcast strategy sends the build side to every partition of the other side instead of shuffling both (dask).
+            The strategies not supported by a backend or join fall back to hash. The chosen strategy is logged to the etlrules.perf logger.
 
         named_output (Optional[str]): Give the output of this rule a name so it can be used by another rule as a named input. Optional.
             When not set, the result of this rule will be available as the main output.
@@ -96,6 +219,7 @@ class LeftJoinRule(BaseJoinRule):
 
     Raises:
         MissingColumnError: raised if any columns (keys) are missing from any of the two input data frames.
+        ValueError: raised in strict mode when sorted_input is True but the inputs are not sorted by the key columns.
     """
 
     JOIN_TYPE = "left"
@@ -147,6 +271,18 @@ class InnerJoinRule(BaseJoinRule):
             If not set or set to None, the key_columns_left is used on the right dataframe too.
         suffixes (Iterable[Optional[str]]): A list or tuple of two values which will be set as suffixes for the columns in the
             result data frame for those columns that have the same name (and are not key columns).
+        sorted_input (bool): When True, both dataframes are declared to be sorted ascending by the key columns, without nulls
+            in the keys, and a merge join is used instead of building a hash table. Default: False.
+            Only single key column joins use a merge join, multiple key columns always use a hash join.
+            In strict mode, the pandas and polars backends raise a ValueError when the inputs are not sorted,
+            otherwise they fall back to a hash join. The dask backend trusts the declaration.
+        strategy (Optional[str]): Forces the join strategy, one of: hash, merge, index or broadcast. Optional.
+            When not set, the strategy is chosen based on the inputs: index when the right dataframe has a join index built by
+            BuildJoinIndexRule (pandas left and inner joins), merge when sorted_input is True, broadcast when the build side
+            is small (dask: its memory size, known for the dataframes created from pandas or read from parquet files, is at
+            most 100MB, otherwise it has much fewer partitions than the other side) and hash otherwise.
+            The broadcast strategy sends the build side to every partition of the other side instead of shuffling both (dask).
+            The strategies not supported by a backend or join fall back to hash. The chosen strategy is logged to the etlrules.perf logger.
 
         named_output (Optional[str]): Give the output of this rule a name so it can be used by another rule as a named input. Optional.
             When not set, the result of this rule will be available as the main output.
@@ -159,6 +295,7 @@ class InnerJoinRule(BaseJoinRule):
 
     Raises:
         MissingColumnError: raised if any columns (keys) are missing from any of the two input data frames.
+        ValueError: raised in strict mode when sorted_input is True but the inputs are not sorted by the key columns.
     """
 
     JOIN_TYPE = "inner"
@@ -213,6 +350,18 @@ class OuterJoinRule(BaseJoinRule):
             If not set or set to None, the key_columns_left is used on the right dataframe too.
         suffixes (Iterable[Optional[str]]): A list or tuple of two values which will be set as suffixes for the columns in the
             result data frame for those columns that have the same name (and are not key columns).
+        sorted_input (bool): When True, both dataframes are declared to be sorted ascending by the key columns, without nulls
+            in the keys, and a merge join is used instead of building a hash table. Default: False.
+            Only single key column joins use a merge join, multiple key columns always use a hash join.
+            In strict mode, the pandas and polars backends raise a ValueError when the inputs are not sorted,
+            otherwise they fall back to a hash join. The dask backend trusts the declaration.
+        strategy (Optional[str]): Forces the join strategy, one of: hash, merge, index or broadcast. Optional.
+            When not set, the strategy is chosen based on the inputs: index when the right dataframe has a join index built by
+            BuildJoinIndexRule (pandas left and inner joins), merge when sorted_input is True, broadcast when the build side
+            is small (dask: its memory size, known for the dataframes created from pandas or read from parquet files, is at
+            most 100MB, otherwise it has much fewer partitions than the other side) and hash otherwise.
+            The broadcast strategy sends the build side to every partition of the other side instead of shuffling both (dask).
+            The strategies not supported by a backend or join fall back to hash. The chosen strategy is logged to the etlrules.perf logger.
 
         named_output (Optional[str]): Give the output of this rule a name so it can be used by another rule as a named input. Optional.
             When not set, the result of this rule will be available as the main output.
@@ -225,6 +374,7 @@ class OuterJoinRule(BaseJoinRule):
 
     Raises:
         MissingColumnError: raised if any columns (keys) are missing from any of the two input data frames.
+        ValueError: raised in strict mode when sorted_input is True but the inputs are not sorted by the key columns.
     """
 
     JOIN_TYPE = "outer"
@@ -285,6 +435,18 @@ class RightJoinRule(BaseJoinRule):
             If not set or set to None, the key_columns_left is used on the right dataframe too.
         suffixes (Iterable[Optional[str]]): A list or tuple of two values which will be set as suffixes for the columns in the
             result data frame for those columns that have the same name (and are not key columns).
+        sorted_input (bool): When True, both dataframes are declared to be sorted ascending by the key columns, without nulls
+            in the keys, and a merge join is used instead of building a hash table. Default: False.
+            Only single key column joins use a merge join, multiple key columns always use a hash join.
+            In strict mode, the pandas and polars backends raise a ValueError when the inputs are not sorted,
+            otherwise they fall back to a hash join. The dask backend trusts the declaration.
+        strategy (Optional[str]): Forces the join strategy, one of: hash, merge, index or broadcast. Optional.
+            When not set, the strategy is chosen based on the inputs: index when the right dataframe has a join index built by
+            BuildJoinIndexRule (pandas left and inner joins), merge when sorted_input is True, broadcast when the build side
+            is small (dask: its memory size, known for the dataframes created from pandas or read from parquet files, is at
+            most 100MB, otherwise it has much fewer partitions than the other side) and hash otherwise.
+            The broadcast strategy sends the build side to every partition of the other side instead of shuffling both (dask).
+            The strategies not supported by a backend or join fall back to hash. The chosen strategy is logged to the etlrules.perf logger.
 
         named_output (Optional[str]): Give the output of this rule a name so it can be used by another rule as a named input. Optional.
             When not set, the result of this rule will be available as the main output.
@@ -297,6 +459,337 @@ class RightJoinRule(BaseJoinRule):
 
     Raises:
         MissingColumnError: raised if any columns (keys) are missing from any of the two input data frames.
+        ValueError: raised in strict mode when sorted_input is True but the inputs are not sorted by the key columns.
     """
 
     JOIN_TYPE = "right"
+
+
+class BuildJoinIndexRule(UnaryOpBaseRule):
+    """ Builds a join index on the key columns of a dataframe to be reused by the join rules which use it as their right side.
+
+    Joining the same dataframe (e.g. a dimension table) into multiple dataframes normally rebuilds the
+    hash table on its key columns on every join. Building the index once allows all the subsequent left
+    and inner joins which use the output of this rule as their right dataframe (with the same key columns)
+    to look up the rows by key directly.
+
+    The output of this rule is the same dataframe as the input and can be used in any other rule.
+
+    Example::
+
+        BuildJoinIndexRule(["A"], named_input="dim", named_output="dim_indexed")
+        LeftJoinRule(named_input_left="facts1", named_input_right="dim_indexed", key_columns_left=["A"])
+        LeftJoinRule(named_input_left="facts2", named_input_right="dim_indexed", key_columns_left=["A"])
+
+    Args:
+        key_columns (Iterable[str]): A list or tuple of column names to build the index on. The joins which use
+            the index must have the same key_columns_right (or key_columns_left if key_columns_right is not set).
+
+        named_input (Optional[str]): Which dataframe to use as the input. Optional.
+            When not set, the input is taken from the main output.
+            Set it to a string value, the name of an output dataframe of a previous rule.
+        named_output (Optional[str]): Give the output of this rule a name so it can be used by another rule as a named input. Optional.
+            When not set, the result of this rule will be available as the main output.
+            When set to a name (string), the result will be available as that named output.
+        name (Optional[str]): Give the rule a name. Optional.
+            Named rules are more descriptive as to what they're trying to do/the intent.
+        description (Optional[str]): Describe in detail what the rules does, how it does it. Optional.
+            Together with the name, the description acts as the documentation of the rule.
+        strict (bool): When set to True, the rule does a stricter valiation. Default: True
+
+    Raises:
+        MissingColumnError: raised if any key columns are missing from the input dataframe.
+
+    Note:
+        The pandas backend builds a hash index of the keys to the row positions, used by the left and inner joins.
+        The index is only built when the keys are unique.
+        The polars backend doesn't expose reusable hash tables so the dataframe is only rechunked into contiguous memory.
+        The dask backend persists the dataframe so it's only computed once for all the joins which use it.
+    """
+
+    def __init__(self, key_columns: Iterable[str], named_input: Optional[str]=None, named_output: Optional[str]=None, name: Optional[str]=None, description: Optional[str]=None, strict: bool=True):
+        super().__init__(named_input=named_input, named_output=named_output, name=name, description=description, strict=strict)
+        assert isinstance(key_columns, (list, tuple)) and key_columns and all(isinstance(col, str) for col in key_columns), "BuildJoinIndexRule: key_columns must a non-empty list of tuple with str column names"
+        self.key_columns = [col for col in key_columns]
+
+    def do_build_index(self, df):
+        raise NotImplementedError("Have you imported the rules from etlrules.backends.<your_backend> and not common?")
+
+    def apply(self, data):
+        super().apply(data)
+        df = self._get_input_df(data)
+        if not set(self.key_columns) <= set(df.columns):
+            raise MissingColumnError(f"Missing columns in join index: {set(self.key_columns) - set(df.columns)}")
+        df = self.do_build_index(df)
+        self._set_output_df(data, df)
+
+
+class AsOfJoinRule(BinaryOpBaseRule):
+    """ Performs an as-of join on two data frames, matching each row on the left with the nearest row on the right by a key column.
+
+    An as-of join is similar to a left join, except that the rows are matched on the nearest key value rather than
+    the equal one. It is typically used with time-series data, for example to match each trade with the latest quote
+    at the time of the trade.
+
+    Example:
+
+    left dataframe::
+
+        | T  | S  | B  |
+        | 1  | x  | a  |
+        | 5  | x  | b  |
+        | 7  | y  | c  |
+
+    right dataframe::
+
+        | T  | S  | C  |
+        | 0  | x  | c  |
+        | 4  | x  | d  |
+        | 8  | y  | e  |
+
+    result (key column="T", by columns=["S"], direction="backward")::
+
+        | T  | S  | B  | C  |
+        | 1  | x  | a  | c  |
+        | 5  | x  | b  | d  |
+        | 7  | y  | c  | NA |
+
+    Args:
+        named_input_left (Optional[str]): Which dataframe to use as the input on the left side of the join.
+            When set to None, the input is taken from the main output of the previous rule.
+            Set it to a string value, the name of an output dataframe of a previous rule.
+        named_input_right (Optional[str]): Which dataframe to use as the input on the right side of the join.
+            When set to None, the input is taken from the main output of the previous rule.
+            Set it to a string value, the name of an output dataframe of a previous rule.
+        key_column_left (str): The column to match on by the nearest value (column in the left data frame).
+            It is usually a datetime column but it can be any numeric column.
+        key_column_right (Optional[str]): The column to match on by the nearest value (column in the right data frame).
+            If not set or set to None, the key_column_left is used on the right dataframe too.
+        by_columns_left (Optional[Iterable[str]]): A list or tuple of column names (columns in the left data frame)
+            to match on by equal values before matching on the key column. Optional.
+        by_columns_right (Optional[Iterable[str]]): A list or tuple of column names (columns in the right data frame)
+            to match on by equal values before matching on the key column.
+            If not set or set to None, the by_columns_left is used on the right dataframe too.
+        direction (str): Which right row to match: backward matches the last row with a key less than or equal to the left key,
+            forward matches the first row with a key greater than or equal to the left key and nearest matches the
+            row with the closest key in either direction. Default: backward.
+        tolerance (Optional[Union[int, float, str]]): The maximum distance between the left and the right keys to match. Optional.
+            A number for numeric keys or a duration string (e.g. "5s", "1h", "2d") for datetime keys.
+            When not set, the rows are matched irrespective of the distance between the keys.
+        sorted_input (bool): When True, both dataframes are declared to be sorted ascending by the key columns.
+            When False, the dataframes are sorted by the key columns before the join. Default: False.
+        suffixes (Iterable[Optional[str]]): A list or tuple of two values which will be set as suffixes for the columns in the
+            result data frame for those columns that have the same name (and are not key or by columns).
+
+        named_output (Optional[str]): Give the output of this rule a name so it can be used by another rule as a named input. Optional.
+            When not set, the result of this rule will be available as the main output.
+            When set to a name (string), the result will be available as that named output.
+        name (Optional[str]): Give the rule a name. Optional.
+            Named rules are more descriptive as to what they're trying to do/the intent.
+        description (Optional[str]): Describe in detail what the rules does, how it does it. Optional.
+            Together with the name, the description acts as the documentation of the rule.
+        strict (bool): When set to True, the rule does a stricter valiation. Default: True
+
+    Raises:
+        MissingColumnError: raised if any columns (keys) are missing from any of the two input data frames.
+
+    Note:
+        The result is sorted by the key column. The key columns must not contain nulls.
+    """
+
+    DIRECTION_BACKWARD = "backward"
+    DIRECTION_FORWARD = "forward"
+    DIRECTION_NEAREST = "nearest"
+
+    DIRECTIONS = (DIRECTION_BACKWARD, DIRECTION_FORWARD, DIRECTION_NEAREST)
+
+    def __init__(self, named_input_left: Optional[str], named_input_right: Optional[str], key_column_left: str, key_column_right: Optional[str]=None,
+                 by_columns_left: Optional[Iterable[str]]=None, by_columns_right: Optional[Iterable[str]]=None,
+                 direction: Literal[DIRECTION_BACKWARD, DIRECTION_FORWARD, DIRECTION_NEAREST]=DIRECTION_BACKWARD,
+                 tolerance: Optional[Union[int, float, str]]=None, sorted_input: bool=False, suffixes: Iterable[Optional[str]]=(None, "_r"),
+                 named_output: Optional[str]=None, name: Optional[str]=None, description: Optional[str]=None, strict: bool=True):
+        super().__init__(named_input_left=named_input_left, named_input_right=named_input_right, named_output=named_output, name=name, description=description, strict=strict)
+        assert isinstance(key_column_left, str) and key_column_left, "AsOfJoinRule: key_column_left must be a non-empty str column name"
+        self.key_column_left = key_column_left
+        self.key_column_right = key_column_right
+        assert by_columns_left is None or isinstance(by_columns_left, (list, tuple)) and all(isinstance(col, str) for col in by_columns_left), "AsOfJoinRule: by_columns_left must a list of tuple with str column names"
+        self.by_columns_left = [col for col in by_columns_left] if by_columns_left is not None else None
+        self.by_columns_right = [col for col in by_columns_right] if by_columns_right is not None else None
+        assert direction in self.DIRECTIONS, f"AsOfJoinRule: direction must be one of {self.DIRECTIONS}"
+        self.direction = direction
+        self.tolerance = tolerance
+        self.sorted_input = sorted_input
+        assert isinstance(suffixes, (list, tuple)) and len(suffixes) == 2 and all(s is None or isinstance(s, str) for s in suffixes), "The suffixes must be a list or tuple of 2 elements"
+        self.suffixes = suffixes
+
+    def _get_key_columns(self):
+        return self.key_column_left, self.key_column_right or self.key_column_left
+
+    def _get_by_columns(self):
+        by_left = self.by_columns_left or None
+        return by_left, (self.by_columns_right or by_left) if by_left else None
+
+    def do_apply(self, left_df, right_df):
+        raise NotImplementedError("Have you imported the rules from etlrules.backends.<your_backend> and not common?")
+
+    def apply(self, data):
+        super().apply(data)
+        left_df = self._get_input_df_left(data)
+        right_df = self._get_input_df_right(data)
+        left_on, right_on = self._get_key_columns()
+        by_left, by_right = self._get_by_columns()
+        left_columns = {left_on, *(by_left or ())}
+        right_columns = {right_on, *(by_right or ())}
+        if not left_columns <= set(left_df.columns):
+            raise MissingColumnError(f"Missing columns in join in the left dataframe: {left_columns - set(left_df.columns)}")
+        if not right_columns <= set(right_df.columns):
+            raise MissingColumnError(f"Missing columns in join in the right dataframe: {right_columns - set(right_df.columns)}")
+        df = self.do_apply(left_df, right_df)
+        self._set_output_df(data, df)
+
+
+class BaseSemiJoinRule(DynamicFiltersMixin, BinaryOpBaseRule):
+
+    JOIN_TYPE = None
+
+    def __init__(self, named_input_left: Optional[str], named_input_right: Optional[str], key_columns_left: Iterable[str], key_columns_right: Optional[Iterable[str]]=None, bloom_filter: bool=False, named_output: Optional[str]=None, name: Optional[str]=None, description: Optional[str]=None, strict: bool=True):
+        super().__init__(named_input_left=named_input_left, named_input_right=named_input_right, named_output=named_output, name=name, description=description, strict=strict)
+        assert isinstance(key_columns_left, (list, tuple)) and key_columns_left and all(isinstance(col, str) for col in key_columns_left), "JoinRule: key_columns_left must a non-empty list of tuple with str column names"
+        self.key_columns_left = [col for col in key_columns_left]
+        self.key_columns_right = [col for col in key_columns_right] if key_columns_right is not None else None
+        self.bloom_filter = bloom_filter
+
+    def _get_key_columns(self):
+        return self.key_columns_left, self.key_columns_right or self.key_columns_left
+
+    def do_apply(self, left_df, right_df):
+        raise NotImplementedError("Have you imported the rules from etlrules.backends.<your_backend> and not common?")
+
+    def apply(self, data):
+        assert self.JOIN_TYPE in {"semi", "anti"}
+        super().apply(data)
+        left_df = self._get_input_df_left(data)
+        right_df = self._get_input_df_right(data)
+        left_on, right_on = self._get_key_columns()
+        if not set(left_on) <= set(left_df.columns):
+            raise MissingColumnError(f"Missing columns in join in the left dataframe: {set(left_on) - set(left_df.columns)}")
+        if not set(right_on) <= set(right_df.columns):
+            raise MissingColumnError(f"Missing columns in join in the right dataframe: {set(right_on) - set(right_df.columns)}")
+        df = self.do_apply(left_df, right_df)
+        self._set_output_df(data, df)
+
+
+class SemiJoinRule(BaseSemiJoinRule):
+    """ Keeps the rows in the left dataframe which have a corresponding row with the same values in the key columns in the right dataframe.
+
+    Unlike an inner join, the result only has the columns of the left dataframe and each left row is kept
+    at most once, irrespective of how many rows match it in the right dataframe.
+
+    Example:
+
+    left dataframe::
+
+        | A  | B  |
+        | 1  | a  |
+        | 2  | b  |
+
+    right dataframe::
+
+        | A  | C  |
+        | 1  | c  |
+        | 1  | d  |
+        | 3  | e  |
+
+    result (key columns=["A"])::
+
+        | A  | B  |
+        | 1  | a  |
+
+    Args:
+        named_input_left (Optional[str]): Which dataframe to use as the input on the left side of the join.
+            When set to None, the input is taken from the main output of the previous rule.
+            Set it to a string value, the name of an output dataframe of a previous rule.
+        named_input_right (Optional[str]): Which dataframe to use as the input on the right side of the join.
+            When set to None, the input is taken from the main output of the previous rule.
+            Set it to a string value, the name of an output dataframe of a previous rule.
+        key_columns_left (Iterable[str]): A list or tuple of column names to join on (columns in the left data frame)
+        key_columns_right (Optional[Iterable[str]]): A list or tuple of column names to join on (columns in the right data frame).
+            If not set or set to None, the key_columns_left is used on the right dataframe too.
+        bloom_filter (bool): When True, a bloom filter is built from the keys of the dataframe with fewer partitions
+            and used to discard the rows of the other dataframe which cannot match before the join shuffles the data.
+            Only used by the dask backend. Default: False.
+
+        named_output (Optional[str]): Give the output of this rule a name so it can be used by another rule as a named input. Optional.
+            When not set, the result of this rule will be available as the main output.
+            When set to a name (string), the result will be available as that named output.
+        name (Optional[str]): Give the rule a name. Optional.
+            Named rules are more descriptive as to what they're trying to do/the intent.
+        description (Optional[str]): Describe in detail what the rules does, how it does it. Optional.
+            Together with the name, the description acts as the documentation of the rule.
+        strict (bool): When set to True, the rule does a stricter valiation. Default: True
+
+    Raises:
+        MissingColumnError: raised if any columns (keys) are missing from any of the two input data frames.
+
+    Note:
+        Null values in the key columns never match, ie the left rows with nulls in their keys are never kept.
+    """
+
+    JOIN_TYPE = "semi"
+
+
+class AntiJoinRule(BaseSemiJoinRule):
+    """ Keeps the rows in the left dataframe which don't have a corresponding row with the same values in the key columns in the right dataframe.
+
+    The result only has the columns of the left dataframe.
+
+    Example:
+
+    left dataframe::
+
+        | A  | B  |
+        | 1  | a  |
+        | 2  | b  |
+
+    right dataframe::
+
+        | A  | C  |
+        | 1  | c  |
+        | 3  | d  |
+
+    result (key columns=["A"])::
+
+        | A  | B  |
+        | 2  | b  |
+
+    Args:
+        named_input_left (Optional[str]): Which dataframe to use as the input on the left side of the join.
+            When set to None, the input is taken from the main output of the previous rule.
+            Set it to a string value, the name of an output dataframe of a previous rule.
+        named_input_right (Optional[str]): Which dataframe to use as the input on the right side of the join.
+            When set to None, the input is taken from the main output of the previous rule.
+            Set it to a string value, the name of an output dataframe of a previous rule.
+        key_columns_left (Iterable[str]): A list or tuple of column names to join on (columns in the left data frame)
+        key_columns_right (Optional[Iterable[str]]): A list or tuple of column names to join on (columns in the right data frame).
+            If not set or set to None, the key_columns_left is used on the right dataframe too.
+        bloom_filter (bool): When True, a bloom filter is built from the keys of the dataframe with fewer partitions
+            and used to set aside the rows of the other dataframe which cannot match before the join shuffles the data.
+            Only used by the dask backend. Default: False.
+
+        named_output (Optional[str]): Give the output of this rule a name so it can be used by another rule as a named input. Optional.
+            When not set, the result of this rule will be available as the main output.
+            When set to a name (string), the result will be available as that named output.
+        name (Optional[str]): Give the rule a name. Optional.
+            Named rules are more descriptive as to what they're trying to do/the intent.
+        description (Optional[str]): Describe in detail what the rules does, how it does it. Optional.
+            Together with the name, the description acts as the documentation of the rule.
+        strict (bool): When set to True, the rule does a stricter valiation. Default: True
+
+    Raises:
+        MissingColumnError: raised if any columns (keys) are missing from any of the two input data frames.
+
+    Note:
+        Null values in the key columns never match, ie the left rows with nulls in their keys are always kept.
+    """
+
+    JOIN_TYPE = "anti"
@@ -0,0 +1,161 @@
+from typing import Any, Iterable, Mapping, Optional
+
+from etlrules.exceptions import ColumnAlreadyExistsError, MissingColumnError
+from etlrules.rule import UnaryOpBaseRule
+
+
+class WindowRule(UnaryOpBaseRule):
+    """ Adds new columns computed by window functions, ie over the rows in the same partition, in a given order.
+
+    Example::
+
+        Given df:
+        | Region | Day | Sales |
+        | EU     | 1   | 10    |
+        | US     | 1   | 5     |
+        | EU     | 2   | 20    |
+        | US     | 2   | 7     |
+        | EU     | 3   | 30    |
+
+    > WindowRule({
+        "Total": {"function": "cumsum", "column": "Sales"},
+        "Previous": {"function": "lag", "column": "Sales"},
+      }, partition_by=["Region"], order_by=["Day"]).apply(df)
+
+    Result::
+
+        | Region | Day | Sales | Total | Previous |
+        | EU     | 1   | 10    | 10    | NA       |
+        | US     | 1   | 5     | 5     | NA       |
+        | EU     | 2   | 20    | 30    | 10       |
+        | US     | 2   | 7     | 12    | 5        |
+        | EU     | 3   | 30    | 60    | 20       |
+
+    Args:
+        windows: A mapping {output_column: window} of the new columns to add, where each window is a mapping with
+            the function and its parameters. The supported functions are::
+
+                cumsum: The cumulative sum of the column, ie the running total. E.g. {"function": "cumsum", "column": "A"}
+                cummin: The cumulative minimum of the column.
+                cummax: The cumulative maximum of the column.
+                cumcount: The position of the row in its partition, starting from 0. E.g. {"function": "cumcount"}
+                rank: The rank of the value in the column within its partition (irrespective of the order_by).
+                    The method (average, min, max, dense or first) decides the rank of the equal values. Default: average.
+                    Set descending to True to rank the largest value first.
+                    E.g. {"function": "rank", "column": "A", "method": "dense", "descending": True}
+                lag: The value of the column offset rows before the current row (default offset: 1), or NA.
+                    E.g. {"function": "lag", "column": "A", "offset": 2}
+                lead: The value of the column offset rows after the current row (default offset: 1), or NA.
+                rolling_sum: The sum of the column over a sliding window ending with the current row.
+                    The window is either a number of rows or a duration (e.g. "7d", "12h") when the rows are ordered by a
+                    single datetime column, in which case the window contains the rows with order_by values in
+                    (current value - duration, current value], which requires ascending to be True. The rows with the same
+                    order_by value (peers) are all in the window, so they have the same result. The min_periods is the
+                    minimum number of (non-NA) values in the window to produce a value, otherwise NA. Default: 1.
+                    E.g. {"function": "rolling_sum", "column": "A", "window": 3}
+                rolling_mean: The mean of the column over a sliding window ending with the current row. Same parameters as rolling_sum.
+
+        partition_by: The columns to partition the rows by. Optional. The window functions are computed separately for
+            the rows with the same values in the partition_by columns. When not set, all the rows are in one partition.
+        order_by: The columns to order the rows by in each partition. Optional.
+            When not set, the rows are processed in the order of the input dataframe.
+        ascending: Whether the order_by is ascending or descending. Default: True
+
+        named_input: Which dataframe to use as the input. Optional.
+            When not set, the input is taken from the main output.
+            Set it to a string value, the name of an output dataframe of a previous rule.
+        named_output: Give the output of this rule a name so it can be used by another rule as a named input. Optional.
+            When not set, the result of this rule will be available as the main output.
+            When set to a name (string), the result will be available as that named output.
+        name: Give the rule a name. Optional.
+            Named rules are more descriptive as to what they're trying to do/the intent.
+        description: Describe in detail what the rules does, how it does it. Optional.
+            Together with the name, the description acts as the documentation of the rule.
+        strict: When set to True, the rule does a stricter valiation. Default: True
+
+    Raises:
+        ColumnAlreadyExistsError: raised in strict mode only if an output column already exists in the dataframe.
+        MissingColumnError: raised if a column in the windows, partition_by or order_by doesn't exist in the input dataframe.
+        ValueError: raised if a window function is not supported or its parameters are invalid.
+
+    Note:
+        The output preserves the order of the rows in the input dataframe for the pandas and polars backends.
+        The dask backend moves the rows with the same partition_by values in the same partition, which changes the order of the rows.
+    """
+
+    FUNCTIONS = ("cumsum", "cummin", "cummax", "cumcount", "rank", "lag", "lead", "rolling_sum", "rolling_mean")
+    RANK_METHODS = ("average", "min", "max", "dense", "first")
+    PARAMS = {
+        "cumsum": ("column", ),
+        "cummin": ("column", ),
+        "cummax": ("column", ),
+        "cumcount": (),
+        "rank": ("column", "method", "descending"),
+        "lag": ("column", "offset"),
+        "lead": ("column", "offset"),
+        "rolling_sum": ("column", "window", "min_periods"),
+        "rolling_mean": ("column", "window", "min_periods"),
+    }
+
+    def __init__(self, windows: Mapping[str, Mapping[str, Any]], partition_by: Optional[Iterable[str]]=None, order_by: Optional[Iterable[str]]=None,
+                 ascending: bool=True, named_input: Optional[str]=None, named_output: Optional[str]=None, name: Optional[str]=None,
+                 description: Optional[str]=None, strict: bool=True):
+        super().__init__(named_input=named_input, named_output=named_output, name=name, description=description, strict=strict)
+        if not windows:
+            raise ValueError("The windows parameter must be a non-empty mapping of output columns to window functions.")
+        self.partition_by = [col for col in partition_by] if partition_by else None
+        self.order_by = [col for col in order_by] if order_by else None
+        self.ascending = ascending
+        self.windows = {}
+        for output_column, window in windows.items():
+            self.windows[output_column] = self._validate_window(output_column, dict(window))
+
+    def _validate_window(self, output_column: str, window: dict) -> dict:
+        function = window.get("function")
+        if function not in self.FUNCTIONS:
+            raise ValueError(f"Unsupported window function '{function}' for column '{output_column}'. It must be one of: {self.FUNCTIONS}")
+        unknown = set(window) - {"function"} - set(self.PARAMS[function])
+        if unknown:
+            raise ValueError(f"Unsupported parameters for the {function} window function of column '{output_column}': {unknown}")
+        if "column" in self.PARAMS[function] and not window.get("column"):
+            raise ValueError(f"The {function} window function of column '{output_column}' requires a column.")
+        if function == "rank" and window.get("method", "average") not in self.RANK_METHODS:
+            raise ValueError(f"Unsupported rank method '{window['method']}' for column '{output_column}'. It must be one of: {self.RANK_METHODS}")
+        if function in ("lag", "lead"):
+            offset = window.get("offset", 1)
+            if not isinstance(offset, int) or offset < 0:
+                raise ValueError(f"The offset of the {function} window function of column '{output_column}' must be a non-negative integer.")
+        if function in ("rolling_sum", "rolling_mean"):
+            window_size = window.get("window")
+            if isinstance(window_size, str):
+                if not self.order_by or len(self.order_by) != 1:
+                    raise ValueError(f"The time window of column '{output_column}' requires a single (datetime) order_by column.")
+                if not self.ascending:
+                    raise ValueError(f"The time window of column '{output_column}' requires an ascending order_by.")
+            elif not isinstance(window_size, int) or isinstance(window_size, bool) or window_size <= 0:
+                raise ValueError(f"The window of the {function} window function of column '{output_column}' must be a positive number of rows or a duration string.")
+            min_periods = window.get("min_periods", 1)
+            if not isinstance(min_periods, int) or min_periods < 0:
+                raise ValueError(f"The min_periods of the {function} window function of column '{output_column}' must be a non-negative integer.")
+        return window
+
+    def _validate_columns(self, df_columns) -> None:
+        df_columns = set(df_columns)
+        input_columns = set(self.partition_by or ()) | set(self.order_by or ()) | {
+            window["column"] for window in self.windows.values() if window.get("column")
+        }
+        if not input_columns <= df_columns:
+            raise MissingColumnError(f"Missing columns in the input dataframe: {input_columns - df_columns}")
+        if self.strict:
+            existing = set(self.windows) & df_columns
+            if existing:
+                raise ColumnAlreadyExistsError(f"Columns {existing} already exist in the input dataframe.")
+
+    def do_apply(self, df):
+        raise NotImplementedError("Have you imported the rules from etlrules.backends.<your_backend> and not common?")
+
+    def apply(self, data):
+        super().apply(data)
+        df = self._get_input_df(data)
+        self._validate_columns(df.columns)
+        self._set_output_df(data, self.do_apply(df))
@@ -1,5 +1,6 @@
 import dask.dataframe as dd
 import itertools
+import pandas as pd
 from pandas import isnull
 from typing import Iterable, Mapping, Optional
 
@@ -30,12 +31,22 @@ class AggregateRule(AggregateRuleBase):
         ),
     }
 
+    STATE_AGGREGATIONS = {
+        "concat": dd.Aggregation(
+            'concat',
+            chunk=lambda v: v.apply(lambda values: list(itertools.chain(*values))),
+            agg=lambda v: v.apply(lambda values: list(itertools.chain(*values))),
+        ),
+    }
+
     def __init__(
         self,
         group_by: Iterable[str],
         aggregations: Optional[Mapping[str, str]] = None,
         aggregation_expressions: Optional[Mapping[str, str]] = None,
         aggregation_types: Optional[Mapping[str, str]] = None,
+        state_file: Optional[str] = None,
+        grouping_sets: Optional[Mapping[str, Iterable[str]]] = None,
         named_input: Optional[str] = None,
         named_output: Optional[str] = None,
         name: Optional[str] = None,
@@ -46,10 +57,47 @@ class AggregateRule(AggregateRuleBase):
             raise NotImplementedError("The dask backend doesn't support aggregation expressions")
         super().__init__(
             group_by, aggregations, aggregation_expressions, aggregation_types,
-            named_input, named_output, name, description, strict)
+            state_file, grouping_sets, named_input, named_output, name, description, strict)
+
+    def do_aggregate(self, df, aggs, group_by):
+        result = df.groupby(by=group_by, dropna=False).agg(aggs).reset_index()
+        if self.aggregation_types:
+            result = result.astype({col: MAP_TYPES[col_type] for col, col_type in self.aggregation_types.items() if col in result.columns})
+        return result
+
+    def do_aggregate_states(self, df, group_by, state_aggs):
+        df = df[group_by].assign(**{state_col: df[col] for state_col, (col, _) in state_aggs.items()})
+        state = df.groupby(by=group_by, dropna=False).agg({
+            state_col: self.STATE_AGGREGATIONS.get(agg_func) or self.AGGREGATIONS[agg_func]
+            for state_col, (_, agg_func) in state_aggs.items()
+        }).reset_index()
+        # the state is small (one row per group), persisting it avoids building an ever growing graph over the batches
+        return state.persist()
+
+    def do_concat_states(self, state, batch_state):
+        return dd.concat([state, batch_state])
 
-    def do_aggregate(self, df, aggs):
-        result = df.groupby(by=self.group_by, dropna=False).agg(aggs).reset_index()
+    def do_finalize(self, state, group_by, aggregations):
+        columns = {}
+        for col, agg_func in aggregations.items():
+            suffix = self.PARTIAL_AGGREGATIONS[agg_func][0][0]
+            values = state[self._get_state_column(col, suffix)]
+            if agg_func == "mean":
+                count = state[self._get_state_column(col, "count")]
+                values = (values / count).where(count > 0)
+            elif agg_func == "list":
+                values = values.apply(list, meta=(col, "object"))
+            elif agg_func == "csv":
+                values = values.apply(lambda values: ",".join(str(elem) for elem in values), meta=(col, "object"))
+            columns[col] = values
+        result = state[group_by].assign(**columns)
         if self.aggregation_types:
-            result = result.astype({col: MAP_TYPES[col_type] for col, col_type in self.aggregation_types.items()})
+            result = result.astype({col: MAP_TYPES[col_type] for col, col_type in self.aggregation_types.items() if col in result.columns})
         return result
+
+    def do_load_state(self, state_file):
+        return dd.from_pandas(pd.read_parquet(state_file, engine="pyarrow"), npartitions=1)
+
+    def do_save_state(self, state, state_file):
+        # the state has one row per group, it's computed and saved as a single file
+        state.compute().to_parquet(state_file, engine="pyarrow", index=False)
@@ -1,3 +1,4 @@
+import pandas as pd
 import re
 
 from etlrules.backends.common.basic import (
@@ -6,20 +7,24 @@ from etlrules.backends.common.basic import (
     RenameRule as RenameRuleBase,
     ReplaceRule as ReplaceRuleBase,
     SortRule as SortRuleBase,
+    TopNRule as TopNRuleBase,
 )
 from etlrules.backends.dask.base import DaskMixin
+from etlrules.backends.pandas.basic import combine_regexes, replace_regexes, replace_substrings, replace_values
 from etlrules.backends.dask.types import MAP_TYPES
 
 
 class DedupeRule(DedupeRuleBase):
+
+    COUNT_COLUMN = "__etlrules_dedupe_count__"
+
     def do_dedupe(self, df):
         if self.keep == DedupeRule.KEEP_NONE:
             # dask's drop_duplicates doesn't support this
-            result = df.groupby(by=self.columns, group_keys=True).size().reset_index()
-            result = result[result[0] > 1]
-            result = df.merge(result, how="left", on=self.columns, suffixes=[None, "_y"], indicator=True)
-            result = result[result["_merge"] == "left_only"]
-            return result[df.columns]
+            counts = df.groupby(by=self.columns, dropna=False).size().to_frame(self.COUNT_COLUMN).reset_index()
+            result = df.merge(counts, how="left", on=self.columns)
+            result = result[result[self.COUNT_COLUMN] == 1]
+            return result[list(df.columns)]
         return df.drop_duplicates(subset=self.columns, keep=self.keep, ignore_index=True)
 
 
@@ -48,12 +53,25 @@ class ReplaceRule(ReplaceRuleBase, DaskMixin):
                 new_val = new_val.replace(f"${group_idx}", f"\\{group_idx}")
         return old_val, new_val
 
+    def _get_combined_regex(self):
+        return combine_regexes(*zip(*(
+            self._get_old_new_regex(old_val, new_val) for old_val, new_val in zip(self.values, self.new_values)
+        )))
+
     def do_apply(self, df, col):
         if self.regex:
-            for old_val, new_val in zip(self.values, self.new_values):
-                old_val, new_val = self._get_old_new_regex(old_val, new_val)
-                return col.replace(to_replace=old_val, value=new_val, regex=self.regex)
-        return col.replace(to_replace=self.values, value=self.new_values, regex=self.regex)
+            try:
+                combined, templates = self._get_combined_regex()
+            except re.error:
+                # e.g. the same group name in several regular expressions, they are applied one after the other
+                for old_val, new_val in zip(self.values, self.new_values):
+                    old_val, new_val = self._get_old_new_regex(old_val, new_val)
+                    col = col.str.replace(old_val, new_val, regex=True)
+                return col
+            return col.map_partitions(replace_regexes, combined, templates, meta=col._meta)
+        elif self.substring:
+            return col.map_partitions(replace_substrings, self.values, self.new_values, meta=col._meta)
+        return col.map_partitions(replace_values, self.values, self.new_values)
 
 
 class ExplodeValuesRule(ExplodeValuesRuleBase):
@@ -65,3 +83,27 @@ class ExplodeValuesRule(ExplodeValuesRuleBase):
         if self.column_type:
             result = result.astype({self.input_column: MAP_TYPES[self.column_type]})
         self._set_output_df(data, result)
+
+
+class TopNRule(TopNRuleBase):
+
+    def _top_n(self, df: pd.DataFrame) -> pd.DataFrame:
+        ascending = self._get_ascending()
+        if self.group_by is None:
+            if len(set(ascending)) == 1:
+                try:
+                    if ascending[0]:
+                        return df.nsmallest(self.n, self.sort_by, keep="first")
+                    return df.nlargest(self.n, self.sort_by, keep="first")
+                except TypeError:
+                    # nlargest/nsmallest only support numeric columns
+                    ...
+            return df.sort_values(by=self.sort_by, ascending=ascending).head(self.n)
+        return df.sort_values(by=self.sort_by, ascending=ascending).groupby(self.group_by, sort=False, dropna=False).head(self.n)
+
+    def do_top_n(self, df):
+        # the top rows are selected in each partition first, then from the (much smaller) union of those
+        result = df.map_partitions(self._top_n, meta=df._meta)
+        return result.repartition(npartitions=1).map_partitions(
+            lambda part: self._top_n(part).sort_values(by=self.sort_by, ascending=self._get_ascending(), ignore_index=True), meta=df._meta
+        )
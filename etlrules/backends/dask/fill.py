@@ -1,25 +1,57 @@
+import dask.dataframe as dd
+import pandas as pd
+from dask import delayed
+
 from etlrules.backends.common.fill import (
     BackFillRule as BackFillRuleBase,
     ForwardFillRule as ForwardFillRuleBase,
 )
+from etlrules.backends.pandas.fill import fill_columns
 
 
 class FillMixin:
+
+    def _get_state_columns(self):
+        return list(dict.fromkeys((self.group_by or []) + self.columns))
+
+    def _is_backward(self):
+        return self.FILL_METHOD == "bfill"
+
+    def _with_carry(self, df, carry):
+        # the carried values come from the previous partitions (or the next partitions for a back fill)
+        if carry is None:
+            return df
+        return pd.concat([df, carry] if self._is_backward() else [carry, df], ignore_index=True)
+
+    def _get_state(self, df, carry=None):
+        # one row per group with the value each column would carry over to the next (or previous) partition
+        df = self._with_carry(df[self._get_state_columns()], carry)
+        df = df.assign(**fill_columns(df, self.columns, self.group_by, self._is_backward()))
+        rows = df.groupby(self.group_by, sort=False, dropna=False) if self.group_by else df
+        return rows.head(1) if self._is_backward() else rows.tail(1)
+
+    def _fill_partition(self, df, carry):
+        state_df = self._with_carry(df[self._get_state_columns()], carry)
+        offset = len(state_df) - len(df) if not self._is_backward() else 0
+        df = df.copy(deep=False)
+        for col, values in fill_columns(state_df, self.columns, self.group_by, self._is_backward()).items():
+            df[col] = values.array[offset:offset + len(df)]
+        return df
+
     def do_apply(self, df):
-        df_columns = [col for col in df.columns]
         if self.sort_by:
             df = df.sort_values(by=self.sort_by, ascending=self.sort_ascending)
-        if self.group_by:
-            df = df.reset_index()
-            res = df.groupby(self.group_by)
-            res = getattr(res, self.FILL_METHOD)()
-            res = res[self.columns]
-        else:
-            res = df[self.columns]
-            res = getattr(res, self.FILL_METHOD)()
-        df = df.assign(**{col: res[col] for col in self.columns})
-        df = df[df_columns]
-        return df
+        partitions = df.to_delayed()
+        # the state of each partition is computed independently, then only the small states are
+        # carried over between the partitions, in order, before filling each partition in parallel
+        states = [delayed(self._get_state)(partition) for partition in partitions]
+        indices = range(len(partitions) - 1, -1, -1) if self._is_backward() else range(len(partitions))
+        carry = None
+        filled = [None] * len(partitions)
+        for idx in indices:
+            filled[idx] = delayed(self._fill_partition)(partitions[idx], carry)
+            carry = delayed(self._get_state)(states[idx], carry)
+        return dd.from_delayed(filled, meta=df._meta, verify_meta=False)
 
 
 class ForwardFillRule(FillMixin, ForwardFillRuleBase):
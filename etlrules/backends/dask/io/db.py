@@ -5,16 +5,18 @@ import tempfile
 
 from etlrules.backends.common.io.db import (
     ReadSQLQueryRule as ReadSQLQueryRuleBase,
+    SQLLookupJoinRule as SQLLookupJoinRuleBase,
     WriteSQLTableRule as WriteSQLTableRuleBase,
+    SQLAlchemyEngines,
 )
+from etlrules.backends.dask.joins import InnerJoinRule, LeftJoinRule
 from etlrules.backends.dask.types import MAP_TYPES
 from etlrules.data import context
-from etlrules.exceptions import SQLError
 
 
 class ReadSQLQueryRule(ReadSQLQueryRuleBase):
 
-    def _do_apply(self, connection):
+    def _do_apply(self, connection, sql_query, params):
         if self.column_types:
             column_types = {col: MAP_TYPES[col_type] for col, col_type in self.column_types.items()}
         else:
@@ -22,7 +24,7 @@ class ReadSQLQueryRule(ReadSQLQueryRuleBase):
 
         import sqlalchemy as sa
         res = connection.execution_options(stream_results=True).execute(
-            sa.text(self._get_sql_query())
+            sa.text(sql_query), params
         )
         keys = res.keys()
         temp_dir = tempfile.mkdtemp(prefix='dask_sql_read', dir=context.etlrules_tempdir)
@@ -42,22 +44,52 @@ class ReadSQLQueryRule(ReadSQLQueryRuleBase):
             return dd.from_pandas(df, npartitions=1)
         return dd.read_parquet(os.path.join(temp_dir, 'data-*.parquet'), backend_dtype="numpy_nullable")
 
+    def _get_column_max(self, df, column):
+        value = df[column].max().compute()
+        return None if pd.isna(value) else value
+
 
 class WriteSQLTableRule(WriteSQLTableRuleBase):
 
     METHOD = 'multi'
 
-    def apply(self, data):
-        super().apply(data)
-        df = self._get_input_df(data)
-        import sqlalchemy as sa
-        try:
-            df.to_sql(
-                self._get_sql_table(),
-                self._get_sql_engine(),
-                if_exists=self.if_exists,
+    def _write_table(self, connection, df, sql_table, if_exists, schema=None):
+        sql_engine = self._get_sql_engine()
+        # dask creates its own engine from the uri in each task, only pass on the options
+        df.to_sql(
+            sql_table,
+            sql_engine,
+            schema=schema,
+            if_exists=if_exists,
+            index=False,
+            method=self.METHOD,
+            engine_kwargs=SQLAlchemyEngines.get_engine_options(sql_engine),
+        )
+
+    def _write_upsert_table(self, connection, df, sql_table, schema):
+        # the partitions are computed and written one at a time through the connection, in the upsert transaction
+        for idx, partition in enumerate(df.to_delayed()):
+            partition.compute().to_sql(
+                sql_table,
+                connection,
+                schema=schema,
+                if_exists=self.IF_EXISTS_OPTIONS.FAIL if idx == 0 else self.IF_EXISTS_OPTIONS.APPEND,
                 index=False,
-                method=self.METHOD
+                method=self.METHOD,
             )
-        except sa.exc.SQLAlchemyError as exc:
-            raise SQLError(str(exc))
+
+
+class SQLLookupJoinRule(SQLLookupJoinRuleBase):
+
+    JOIN_RULES = {"left": LeftJoinRule, "inner": InnerJoinRule}
+
+    def _get_distinct_keys(self, df):
+        return list(df[self.key_columns].dropna().drop_duplicates().compute().itertuples(index=False, name=None))
+
+    def _create_lookup_df(self, df, columns, rows):
+        lookup_df = pd.DataFrame.from_records(rows, columns=columns).convert_dtypes()
+        lookup_df = lookup_df.astype({
+            lookup_col: df[col].dtype for col, lookup_col in zip(self.key_columns, self._get_lookup_key_columns())
+        })
+        # the rows looked up are bounded by the size of the input, a single partition is joined to every input partition
+        return dd.from_pandas(lookup_df, npartitions=1)
@@ -5,13 +5,27 @@ from etlrules.exceptions import MissingColumnError
 
 from etlrules.backends.common.io.files import (
     ReadCSVFileRule as ReadCSVFileRuleBase,
+    ReadJSONLinesFileRule as ReadJSONLinesFileRuleBase,
     ReadParquetFileRule as ReadParquetFileRuleBase,
     WriteCSVFileRule as WriteCSVFileRuleBase,
+    WriteJSONLinesFileRule as WriteJSONLinesFileRuleBase,
     WriteParquetFileRule as WriteParquetFileRuleBase,
 )
+from etlrules.backends.dask.types import MAP_TYPES
 
 
-class ReadCSVFileRule(ReadCSVFileRuleBase):
+class ReadFileMixin:
+    def do_concat(self, left_df: dd.DataFrame, right_df: dd.DataFrame) -> dd.DataFrame:
+        return dd.concat([left_df, right_df], axis=0, ignore_index=True)
+
+    def do_empty(self, df: dd.DataFrame) -> dd.DataFrame:
+        return dd.from_pandas(df._meta, npartitions=1)
+
+
+class ReadCSVFileRule(ReadFileMixin, ReadCSVFileRuleBase):
+
+    CACHE_EXT = ".parquet"
+
     def do_read(self, file_path: str) -> dd.DataFrame:
         return dd.read_csv(
             file_path, blocksize=None, sep=self.separator, header='infer' if self.header else None,
@@ -19,13 +33,31 @@ class ReadCSVFileRule(ReadCSVFileRuleBase):
             index_col=False
         )
 
+    def do_cache_load(self, cache_path: str) -> dd.DataFrame:
+        df = dd.read_parquet(cache_path, engine="pyarrow")
+        if not self.header:
+            df.columns = list(range(len(df.columns)))
+        return df
+
+    def do_cache_store(self, df: dd.DataFrame, cache_path: str) -> None:
+        # parquet only supports string column names
+        df.rename(columns=str).to_parquet(cache_path, engine="pyarrow", write_index=False, write_metadata_file=False)
+
+
+class ReadJSONLinesFileRule(ReadFileMixin, ReadJSONLinesFileRuleBase):
+    def do_read(self, file_path: str) -> dd.DataFrame:
+        df = dd.read_json(file_path, orient="records", lines=True, blocksize=self.block_size)
+        if self.column_types:
+            df = df.astype({col: MAP_TYPES[col_type] for col, col_type in self.column_types.items()})
+        return df
+
 
 def parquet_file_name_split(file_name: str) -> tuple[str, str]:
     fn, ext = os.path.splitext(file_name)
     return fn, ext or "parquet"
 
 
-class ReadParquetFileRule(ReadParquetFileRuleBase):
+class ReadParquetFileRule(ReadFileMixin, ReadParquetFileRuleBase):
 
     def do_read(self, file_path: str) -> dd.DataFrame:
         from pyarrow.lib import ArrowInvalid
@@ -33,7 +65,7 @@ class ReadParquetFileRule(ReadParquetFileRuleBase):
         fn, ext = parquet_file_name_split(file_name)
         try:
             return dd.read_parquet(
-                os.path.join(file_dir, f"{fn}*.{ext}"), engine="pyarrow", columns=self.columns, filters=self.filters
+                os.path.join(file_dir, f"{fn}*.{ext}"), engine="pyarrow", columns=self.columns, filters=self._get_read_filters()
             )
         except ArrowInvalid as exc:
             raise MissingColumnError(str(exc))
@@ -69,3 +101,16 @@ class WriteParquetFileRule(WriteParquetFileRuleBase):
             write_index=False
         )
 
+
+
+class WriteJSONLinesFileRule(WriteJSONLinesFileRuleBase):
+
+    def do_write(self, file_name: str, file_dir: str, df: dd.DataFrame) -> None:
+        # compute and write one partition at a time to keep the memory bounded
+        with open(os.path.join(file_dir, file_name), "w", encoding="utf-8") as f:
+            for partition in df.to_delayed():
+                pdf = partition.compute()
+                for start in range(0, len(pdf), self.chunk_size):
+                    pdf.iloc[start:start + self.chunk_size].to_json(
+                        f, orient="records", lines=True, date_format="iso", index=False
+                    )
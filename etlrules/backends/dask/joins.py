@@ -1,4 +1,17 @@
+import math
+from typing import Optional
+
+import dask.dataframe as dd
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+from pandas.util import hash_pandas_object
+
 from etlrules.backends.common.joins import (
+    AsOfJoinRule as AsOfJoinRuleBase,
+    SemiJoinRule as SemiJoinRuleBase,
+    AntiJoinRule as AntiJoinRuleBase,
+    BuildJoinIndexRule as BuildJoinIndexRuleBase,
     LeftJoinRule as LeftJoinRuleBase,
     RightJoinRule as RightJoinRuleBase,
     InnerJoinRule as InnerJoinRuleBase,
@@ -6,17 +19,126 @@ from etlrules.backends.common.joins import (
 )
 
 
-class JoinsMixin():
+class BuildJoinIndexRule(BuildJoinIndexRuleBase):
+    def do_build_index(self, df):
+        # computes the dataframe once for all the joins using it
+        return df.persist()
+
+
+class KeyValuesMixin():
+    def _get_key_values(self, df, column):
+        return df[column].dropna().drop_duplicates().compute().tolist()
+
+    def _has_null_keys(self, df, column):
+        return bool(df[column].isna().any().compute())
+
+
+class JoinsMixin(KeyValuesMixin):
+
+    # the merge matches the null keys
+    NULL_KEYS_MATCH = True
+
+    # the build side is broadcast when its memory size is at most this number of bytes
+    BROADCAST_MAX_BYTES = 100 * 1024 * 1024
+    # or, when its memory size is not known, when it has at most this fraction of the partitions of the other side
+    BROADCAST_MAX_PARTITIONS_RATIO = 0.25
+
     def do_apply(self, left_df, right_df):
         left_on, right_on = self._get_key_columns()
+        strategy = self._get_strategy(left_df, right_df)
+        if strategy == self.STRATEGY_MERGE:
+            # with sorted indexes, the partitions are aligned by their divisions and merged without a shuffle
+            df = left_df.set_index(left_on[0], sorted=True).merge(
+                right_df.set_index(right_on[0], sorted=True),
+                how=self.JOIN_TYPE,
+                left_index=True,
+                right_index=True,
+                suffixes=self.suffixes
+            )
+            # the index merge moves the key column first, the columns are put back in the order of a regular merge
+            columns = left_df._meta.merge(right_df._meta, how=self.JOIN_TYPE, on=left_on, suffixes=self.suffixes).columns
+            return df.reset_index()[list(columns)]
+        if strategy == self.STRATEGY_BROADCAST and self.JOIN_TYPE == "inner":
+            left_df, right_df = self._align_broadcast_side(left_df, right_df)
         return left_df.merge(
             right_df,
             how=self.JOIN_TYPE,
             left_on=left_on,
             right_on=right_on,
-            suffixes=self.suffixes
+            suffixes=self.suffixes,
+            broadcast=strategy == self.STRATEGY_BROADCAST,
         )
 
+    def _get_memory_size(self, df) -> Optional[int]:
+        """ Returns the memory size of a dataframe when it is known without computing it or None otherwise.
+
+        The size is known for a dataframe created from a pandas dataframe and is estimated from the metadata
+        (the uncompressed size of the row groups) for a dataframe read from parquet files.
+        """
+        try:
+            from dask_expr.io.io import FromPandas
+            from dask_expr.io.parquet import ReadParquet
+            expr = df.expr
+            if isinstance(expr, FromPandas):
+                return int(expr.frame.memory_usage(deep=True).sum())
+            if isinstance(expr, ReadParquet):
+                return sum(
+                    fragment.metadata.row_group(idx).total_byte_size
+                    for fragment in expr._dataset_info["ds"].get_fragments()
+                    for idx in range(fragment.metadata.num_row_groups)
+                )
+        except (ImportError, AttributeError, KeyError, OSError):
+            pass
+        return None
+
+    def _get_broadcast_sides(self, left_df, right_df):
+        # the side to broadcast and the other side
+        if self.JOIN_TYPE == "left":
+            return right_df, left_df
+        if self.JOIN_TYPE == "right":
+            return left_df, right_df
+        if self.JOIN_TYPE == "inner":
+            left_size, right_size = self._get_memory_size(left_df), self._get_memory_size(right_df)
+            if left_size is None or right_size is None:
+                left_size, right_size = left_df.npartitions, right_df.npartitions
+            return (left_df, right_df) if left_size < right_size else (right_df, left_df)
+        return None
+
+    def _align_broadcast_side(self, left_df, right_df):
+        # dask broadcasts the side of an inner join with fewer partitions (the right side on a tie),
+        # when that is not the build side, the build side is put in a single partition to be broadcast instead
+        build_df, _ = self._get_broadcast_sides(left_df, right_df)
+        dask_build_df = left_df if left_df.npartitions < right_df.npartitions else right_df
+        if build_df is left_df and dask_build_df is not left_df:
+            left_df = left_df.repartition(npartitions=1)
+        elif build_df is right_df and dask_build_df is not right_df:
+            right_df = right_df.repartition(npartitions=1)
+        return left_df, right_df
+
+    def _is_broadcast(self, build_df, other_df) -> bool:
+        size = self._get_memory_size(build_df)
+        if size is not None:
+            return size <= self.BROADCAST_MAX_BYTES
+        return build_df.npartitions <= other_df.npartitions * self.BROADCAST_MAX_PARTITIONS_RATIO
+
+    def _get_strategy(self, left_df, right_df):
+        left_on, right_on = self._get_key_columns()
+        sides = self._get_broadcast_sides(left_df, right_df)
+        strategy = self.strategy
+        if strategy is None:
+            if self.sorted_input:
+                strategy = self.STRATEGY_MERGE
+            elif sides is not None and self._is_broadcast(*sides):
+                strategy = self.STRATEGY_BROADCAST
+        if (
+            (strategy == self.STRATEGY_MERGE and (len(left_on) > 1 or left_on != right_on)) or
+            (strategy == self.STRATEGY_BROADCAST and sides is None) or
+            strategy in (None, self.STRATEGY_INDEX)
+        ):
+            strategy = self.STRATEGY_HASH
+        self._log_strategy(strategy)
+        return strategy
+
 
 class LeftJoinRule(JoinsMixin, LeftJoinRuleBase):
     JOIN_TYPE = "left"
@@ -32,3 +154,131 @@ class OuterJoinRule(JoinsMixin, OuterJoinRuleBase):
 
 class RightJoinRule(JoinsMixin, RightJoinRuleBase):
     JOIN_TYPE = "right"
+
+
+class AsOfJoinRule(AsOfJoinRuleBase):
+    def do_apply(self, left_df, right_df):
+        left_on, right_on = self._get_key_columns()
+        by_left, by_right = self._get_by_columns()
+        if not self.sorted_input:
+            left_df = left_df.sort_values(left_on)
+            right_df = right_df.sort_values(right_on)
+        tolerance = self.tolerance
+        if isinstance(tolerance, str):
+            tolerance = pd.Timedelta(tolerance)
+        return dd.merge_asof(
+            left_df,
+            right_df,
+            left_on=left_on,
+            right_on=right_on,
+            left_by=by_left,
+            right_by=by_right,
+            suffixes=self.suffixes,
+            tolerance=tolerance,
+            direction=self.direction,
+        )
+
+
+class BloomFilter:
+    """ A bloom filter on the hashes of the keys of a dataframe.
+
+    A bloom filter answers whether a key might be in the set of keys it was built from,
+    with no false negatives and a false positive rate close to false_positive_rate.
+    """
+
+    def __init__(self, hashes: np.ndarray, false_positive_rate: float=0.01):
+        num_keys = max(len(hashes), 1)
+        self.num_bits = max(int(math.ceil(-num_keys * math.log(false_positive_rate) / math.log(2) ** 2)), 64)
+        self.num_hashes = max(int(round(self.num_bits / num_keys * math.log(2))), 1)
+        bits = np.zeros(self.num_bits, dtype=bool)
+        for positions in self._get_positions(hashes):
+            bits[positions] = True
+        self.bits = np.packbits(bits)
+
+    def _get_positions(self, hashes: np.ndarray):
+        # double hashing: the i-th hash function is h1 + i * h2
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        for idx in range(self.num_hashes):
+            yield (h1 + np.uint64(idx) * h2) % np.uint64(self.num_bits)
+
+    def might_contain(self, hashes: np.ndarray) -> np.ndarray:
+        result = np.ones(len(hashes), dtype=bool)
+        for positions in self._get_positions(hashes):
+            result &= (self.bits[positions >> np.uint64(3)] >> (np.uint64(7) - (positions & np.uint64(7))).astype(np.uint8)) & 1 == 1
+        return result
+
+
+def _get_hash_dtypes(left_dtypes, right_dtypes):
+    # the keys are hashed with the same dtypes on both sides so that the same values have the same hashes
+    # the numeric keys of different types are hashed as floats, None when the keys cannot be hashed the same way
+    dtypes = []
+    for left_dtype, right_dtype in zip(left_dtypes, right_dtypes):
+        if left_dtype == right_dtype:
+            dtypes.append(left_dtype)
+        elif is_numeric_dtype(left_dtype) and is_numeric_dtype(right_dtype):
+            dtypes.append(np.dtype("float64"))
+        else:
+            return None
+    return dtypes
+
+
+def _hash_keys(df, key_columns, dtypes):
+    return hash_pandas_object(df[key_columns].astype(dict(zip(key_columns, dtypes))), index=False).to_numpy()
+
+
+def _bloom_filter_partition(df, key_columns, dtypes, bloom_filter, keep_matching):
+    # the keys with nulls never match, so only the other keys are hashed
+    not_null = df[key_columns].notna().all(axis=1).to_numpy()
+    might_match = np.zeros(len(df), dtype=bool)
+    might_match[not_null] = bloom_filter.might_contain(_hash_keys(df[not_null], key_columns, dtypes))
+    return df[might_match if keep_matching else ~might_match]
+
+
+class SemiJoinMixin(KeyValuesMixin):
+
+    MATCH_COLUMN = "__etlrules_semi_join_match__"
+    BLOOM_FILTER_FALSE_POSITIVE_RATE = 0.01
+
+    def do_apply(self, left_df, right_df):
+        left_on, right_on = self._get_key_columns()
+        # rename the right keys as the left keys to not clash with the left columns
+        # the nulls are dropped as they never match
+        right_keys = right_df[right_on].dropna().rename(columns=dict(zip(right_on, left_on)))
+        not_matching = None
+        dtypes = _get_hash_dtypes(left_df[left_on].dtypes.tolist(), right_keys.dtypes.tolist()) if self.bloom_filter else None
+        if dtypes is not None:
+            if right_df.npartitions <= left_df.npartitions:
+                # the left rows which cannot match are discarded (semi) or set aside to be added back (anti)
+                bloom_filter = self._build_bloom_filter(right_keys, left_on, dtypes)
+                if self.JOIN_TYPE == "anti":
+                    not_matching = left_df.map_partitions(_bloom_filter_partition, left_on, dtypes, bloom_filter, False)
+                left_df = left_df.map_partitions(_bloom_filter_partition, left_on, dtypes, bloom_filter, True)
+            else:
+                # only the right keys which can match a left row are shuffled
+                bloom_filter = self._build_bloom_filter(left_df[left_on].dropna(), left_on, dtypes)
+                right_keys = right_keys.map_partitions(_bloom_filter_partition, left_on, dtypes, bloom_filter, True)
+        right_keys = right_keys.drop_duplicates().assign(**{self.MATCH_COLUMN: True})
+        df = left_df.merge(right_keys, how="left", on=left_on)
+        if self.JOIN_TYPE == "semi":
+            df = df[df[self.MATCH_COLUMN].notnull()]
+        else:
+            df = df[df[self.MATCH_COLUMN].isnull()]
+        df = df.drop(columns=[self.MATCH_COLUMN])
+        if not_matching is not None:
+            df = dd.concat([not_matching, df])
+        return df.reset_index(drop=True)
+
+    def _build_bloom_filter(self, keys_df, key_columns, dtypes):
+        hashes = keys_df.map_partitions(
+            lambda df: pd.Series(_hash_keys(df, key_columns, dtypes)), meta=(None, "uint64")
+        ).compute().to_numpy()
+        return BloomFilter(hashes, self.BLOOM_FILTER_FALSE_POSITIVE_RATE)
+
+
+class SemiJoinRule(SemiJoinMixin, SemiJoinRuleBase):
+    JOIN_TYPE = "semi"
+
+
+class AntiJoinRule(SemiJoinMixin, AntiJoinRuleBase):
+    JOIN_TYPE = "anti"
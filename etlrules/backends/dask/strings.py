@@ -13,6 +13,7 @@ from etlrules.backends.common.strings import (
     StrExtractRule as StrExtractRuleBase,
 )
 
+from etlrules.backends.pandas.strings import split_rejoin
 from .base import DaskMixin, is_pyarrow_string_enabled
 
 perf_logger = logging.getLogger("etlrules.perf")
@@ -45,22 +46,9 @@ class StrSplitRule(StrSplitRuleBase, DaskMixin):
 
 class StrSplitRejoinRule(StrSplitRejoinRuleBase, DaskMixin):
     def do_apply(self, df, col):
-        perf_logger.warning("StrSplitRejoinRule is not vectorized and might hurt the overall performance.")
-        new_col = col.str.split(pat=self.separator, n=self.limit)
-        new_separator = self.new_separator
-        pyarrow_string_enabled = is_pyarrow_string_enabled()
-        if self.sort is not None:
-            reverse = self.sort==self.SORT_DESCENDING
-            if pyarrow_string_enabled:
-                func = lambda val: new_separator.join(sorted(eval(val), reverse=reverse)) if not isnull(val) else val
-            else:
-                func = lambda val: new_separator.join(sorted(val, reverse=reverse)) if val not in (nan, NA, None) else val
-        else:
-            if pyarrow_string_enabled:
-                func = lambda val: new_separator.join(eval(val)) if not isnull(val) else val
-            else:
-                func = lambda val: new_separator.join(val) if val not in (nan, NA, None) else val
-        return new_col.apply(func, meta=(col.name, "string")).astype({col.name: 'string'})
+        return col.map_partitions(
+            split_rejoin, self.separator, self.limit, self.new_separator, self.sort, meta=(col.name, "string")
+        )
 
 
 class StrStripRule(StrStripRuleBase, DaskMixin):
@@ -0,0 +1,46 @@
+import logging
+
+from etlrules.backends.common.window import WindowRule as WindowRuleBase
+from etlrules.backends.pandas.window import apply_windows
+
+
+perf_logger = logging.getLogger("etlrules.perf")
+
+
+class WindowRule(WindowRuleBase):
+
+    # the functions which dask can compute natively across partitions, in the order of the rows
+    NATIVE_FUNCTIONS = ("cumsum", "cummin", "cummax", "cumcount", "lag", "lead", "rolling_sum", "rolling_mean")
+
+    def _is_native(self, window):
+        return window["function"] in self.NATIVE_FUNCTIONS and not isinstance(window.get("window"), str)
+
+    def _get_native_result(self, df, window):
+        function = window["function"]
+        if function == "cumcount":
+            return df.map_partitions(lambda pdf: pdf.assign(__cumcount=1)["__cumcount"], meta=("__cumcount", "int64")).cumsum() - 1
+        values = df[window["column"]]
+        if function in ("cumsum", "cummin", "cummax"):
+            return getattr(values, function)()
+        elif function in ("lag", "lead"):
+            offset = window.get("offset", 1)
+            return values.shift(offset if function == "lag" else -offset)
+        # uses map_overlap to get the rows from the previous partition
+        rolling = values.rolling(window["window"], min_periods=window.get("min_periods", 1))
+        return rolling.sum() if function == "rolling_sum" else rolling.mean()
+
+    def _apply_windows(self, pdf):
+        return apply_windows(pdf, self.windows, self.partition_by, self.order_by, self.ascending)
+
+    def do_apply(self, df):
+        if self.partition_by:
+            # moves all the rows of a partition_by group into the same dask partition
+            df = df.shuffle(on=self.partition_by)
+            return df.map_partitions(self._apply_windows, meta=self._apply_windows(df._meta))
+        if not self.order_by and all(self._is_native(window) for window in self.windows.values()):
+            return df.assign(**{
+                output_column: self._get_native_result(df, window) for output_column, window in self.windows.items()
+            })
+        perf_logger.warning("WindowRule without partition_by requires all the rows in a single partition for ordered windows or rank.")
+        df = df.repartition(npartitions=1)
+        return df.map_partitions(self._apply_windows, meta=self._apply_windows(df._meta))
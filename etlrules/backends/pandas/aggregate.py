@@ -1,3 +1,6 @@
+import itertools
+
+import pandas as pd
 from pandas import isnull
 
 from etlrules.backends.common.aggregate import AggregateRule as AggregateRuleBase
@@ -19,8 +22,45 @@ class AggregateRule(AggregateRuleBase):
         "csv": lambda values: ",".join(str(elem) for elem in values if not isnull(elem)),
     }
 
-    def do_aggregate(self, df, aggs):
-        result = df.groupby(by=self.group_by, as_index=False, dropna=False).agg(aggs)
+    STATE_AGGREGATIONS = {
+        "concat": lambda values: list(itertools.chain.from_iterable(values)),
+    }
+
+    def do_aggregate(self, df, aggs, group_by):
+        result = df.groupby(by=group_by, as_index=False, dropna=False).agg(aggs)
+        if self.aggregation_types:
+            result = result.astype({col: MAP_TYPES[col_type] for col, col_type in self.aggregation_types.items() if col in result.columns})
+        return result
+
+    def do_aggregate_states(self, df, group_by, state_aggs):
+        df = pd.concat([df[group_by]] + [df[col].rename(state_col) for state_col, (col, _) in state_aggs.items()], axis=1)
+        return df.groupby(by=group_by, as_index=False, dropna=False).agg({
+            state_col: self.STATE_AGGREGATIONS.get(agg_func) or self.AGGREGATIONS[agg_func]
+            for state_col, (_, agg_func) in state_aggs.items()
+        })
+
+    def do_concat_states(self, state, batch_state):
+        return pd.concat([state, batch_state], ignore_index=True)
+
+    def do_finalize(self, state, group_by, aggregations):
+        result = state[group_by].copy()
+        for col, agg_func in aggregations.items():
+            suffix = self.PARTIAL_AGGREGATIONS[agg_func][0][0]
+            values = state[self._get_state_column(col, suffix)]
+            if agg_func == "mean":
+                count = state[self._get_state_column(col, "count")]
+                values = (values / count).where(count > 0)
+            elif agg_func == "list":
+                values = values.map(list)
+            elif agg_func == "csv":
+                values = values.map(lambda values: ",".join(str(elem) for elem in values))
+            result[col] = values
         if self.aggregation_types:
-            result = result.astype({col: MAP_TYPES[col_type] for col, col_type in self.aggregation_types.items()})
+            result = result.astype({col: MAP_TYPES[col_type] for col, col_type in self.aggregation_types.items() if col in result.columns})
         return result
+
+    def do_load_state(self, state_file):
+        return pd.read_parquet(state_file, engine="pyarrow")
+
+    def do_save_state(self, state, state_file):
+        state.to_parquet(state_file, engine="pyarrow", index=False)
@@ -1,4 +1,9 @@
+import numpy as np
+import os
+import pandas as pd
 import re
+from pandas.api.types import is_float_dtype, is_object_dtype
+from typing import Optional
 
 from etlrules.backends.common.basic import (
     DedupeRule as DedupeRuleBase,
@@ -6,15 +11,113 @@ from etlrules.backends.common.basic import (
     RenameRule as RenameRuleBase,
     ReplaceRule as ReplaceRuleBase,
     SortRule as SortRuleBase,
+    TopNRule as TopNRuleBase,
 )
 from etlrules.backends.pandas.base import PandasMixin
 from etlrules.backends.pandas.types import MAP_TYPES
 
 
 class DedupeRule(DedupeRuleBase):
+
+    ROW_INDEX_COLUMN = "__etlrules_dedupe_row_idx__"
+
+    def _get_keep(self):
+        return False if self.keep == DedupeRule.KEEP_NONE else self.keep
+
+    def _get_hashes(self, df: pd.DataFrame) -> pd.Series:
+        keys = df[self.columns]
+        # -0.0 and 0.0 are the same key but hash differently, adding 0.0 turns -0.0 into 0.0
+        floats = {col: keys[col] + 0.0 for col in self.columns if is_float_dtype(keys[col].dtype)}
+        if floats:
+            keys = keys.assign(**floats)
+        return pd.util.hash_pandas_object(keys, index=False).reset_index(drop=True)
+
+    def _equal_keys(self, df: pd.DataFrame, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        # compares the keys of the rows at the left positions with the keys of the rows at the right positions
+        equal = np.ones(len(left), dtype=bool)
+        for col in self.columns:
+            left_values = df[col].iloc[left].reset_index(drop=True)
+            right_values = df[col].iloc[right].reset_index(drop=True)
+            same = (left_values == right_values).fillna(False) | (left_values.isna() & right_values.isna())
+            equal &= same.to_numpy(dtype=bool)
+        return equal
+
+    def _duplicated_hashed(self, df: pd.DataFrame) -> Optional[np.ndarray]:
+        if any(is_float_dtype(df[col].dtype) or is_object_dtype(df[col].dtype) for col in self.columns):
+            # the float and object keys are compared by their values (-0.0 equals 0.0, None differs from nan)
+            return None
+        # the duplicates are found on a compact 64-bit hash of the key columns rather than the key columns
+        hashes = self._get_hashes(df)
+        codes, _ = pd.factorize(hashes)
+        # codes are allocated in the order of first appearance, so the first row of each code is at first_pos[code]
+        _, first_pos = np.unique(codes, return_index=True)
+        representatives = first_pos[codes]
+        positions = np.flatnonzero(representatives != np.arange(len(df)))
+        if len(positions) and not self._equal_keys(df, positions, representatives[positions]).all():
+            # hash collision, fall back to comparing the key columns
+            return None
+        return hashes.duplicated(keep=self._get_keep()).to_numpy()
+
+    def _is_sorted(self, df: pd.DataFrame) -> bool:
+        # each column must be ascending or descending, with the nulls first or last, in the rows where the previous columns are equal
+        tied = np.ones(max(len(df) - 1, 0), dtype=bool)
+        for col in self.columns:
+            values = df[col].reset_index(drop=True)
+            nulls = values.isna()
+            for key in (nulls, values):
+                prev, cur = key.iloc[:-1].reset_index(drop=True), key.iloc[1:].reset_index(drop=True)
+                greater = (cur > prev).fillna(False).to_numpy(dtype=bool) & tied
+                less = (cur < prev).fillna(False).to_numpy(dtype=bool) & tied
+                if greater.any() and less.any():
+                    return False
+                tied &= ((cur == prev).fillna(False) | (prev.isna() & cur.isna())).to_numpy(dtype=bool)
+        return True
+
+    def _duplicated_sorted(self, df: pd.DataFrame) -> np.ndarray:
+        if self.strict and not self._is_sorted(df):
+            self._raise_not_sorted()
+        positions = np.arange(1, len(df))
+        same_as_prev = np.zeros(len(df), dtype=bool)
+        same_as_prev[1:] = self._equal_keys(df, positions, positions - 1)
+        same_as_next = np.append(same_as_prev[1:], False)
+        if self.keep == DedupeRule.KEEP_FIRST:
+            return same_as_prev
+        elif self.keep == DedupeRule.KEEP_LAST:
+            return same_as_next
+        return same_as_prev | same_as_next
+
+    def _dedupe(self, df: pd.DataFrame) -> pd.DataFrame:
+        duplicated = self._duplicated_sorted(df) if self.sorted_input else self._duplicated_hashed(df)
+        if duplicated is None:
+            return df.drop_duplicates(subset=self.columns, keep=self._get_keep(), ignore_index=True)
+        return df[~duplicated].reset_index(drop=True)
+
+    def _dedupe_spilled(self, df: pd.DataFrame) -> pd.DataFrame:
+        results = []
+        with self._spill_dir("dedupe_spill") as spill_dir:
+            # the input is hashed and spilled one chunk at a time, each chunk adding a file to each partition
+            # the partitions are pickled to keep the values exactly (eg None and nan in object columns)
+            paths = [[] for _ in range(self.spill_partitions)]
+            for chunk_idx, start in enumerate(range(0, len(df), self.SPILL_CHUNK_ROWS)):
+                chunk = df.iloc[start:start + self.SPILL_CHUNK_ROWS]
+                partitions = (self._get_hashes(chunk) % self.spill_partitions).to_numpy()
+                chunk = chunk.assign(**{self.ROW_INDEX_COLUMN: np.arange(start, start + len(chunk))})
+                for partition in np.unique(partitions):
+                    path = os.path.join(spill_dir, f"partition_{partition}_{chunk_idx}.pkl")
+                    chunk[partitions == partition].to_pickle(path)
+                    paths[partition].append(path)
+                del chunk, partitions
+            for partition_paths in paths:
+                if partition_paths:
+                    partition_df = pd.concat([pd.read_pickle(path) for path in partition_paths], ignore_index=True)
+                    results.append(self._dedupe(partition_df))
+        result = pd.concat(results, ignore_index=True)
+        return result.sort_values(self.ROW_INDEX_COLUMN, ignore_index=True).drop(columns=[self.ROW_INDEX_COLUMN])
+
     def do_dedupe(self, df):
-        keep = False if self.keep == DedupeRule.KEEP_NONE else self.keep
-        return df.drop_duplicates(subset=self.columns, keep=keep, ignore_index=True)
+        if self.spill_partitions and not self.sorted_input and not df.empty:
+            return self._dedupe_spilled(df)
+        return self._dedupe(df)
 
 
 class RenameRule(RenameRuleBase):
@@ -23,31 +126,163 @@ class RenameRule(RenameRuleBase):
 
 
 class SortRule(SortRuleBase):
-    def do_sort(self, df):
+
+    def _sort(self, df: pd.DataFrame) -> pd.DataFrame:
         return df.sort_values(by=self.sort_by, ascending=self.ascending, ignore_index=True)
 
+    def _merge_runs(self, runs: list, batch_rows: int) -> pd.DataFrame:
+        # merges the sorted runs in batches: the carry holds the rows read from the runs but not yet emitted
+        offsets = [0] * len(runs)
+        carry = None
+        result = []
+        while True:
+            batches = [] if carry is None else [carry]
+            in_carry = set() if carry is None else set(carry[self.RUN_COLUMN].unique())
+            for run, table in enumerate(runs):
+                if run not in in_carry and offsets[run] < table.num_rows:
+                    batch = table.slice(offsets[run], batch_rows).to_pandas()
+                    batches.append(batch.assign(**{self.RUN_COLUMN: run}))
+                    offsets[run] += batch_rows
+            carry = self._sort(pd.concat(batches, ignore_index=True))
+            active = [run for run, table in enumerate(runs) if offsets[run] < table.num_rows]
+            if not active:
+                result.append(carry)
+                break
+            # no row yet to be read from an active run can be smaller than the last row read from that run,
+            # so the rows up to the smallest such last row are in their final order
+            last_rows = carry[carry[self.RUN_COLUMN].isin(active)].drop_duplicates(self.RUN_COLUMN, keep="last")
+            boundary = last_rows.index.min()
+            result.append(carry.iloc[:boundary + 1])
+            carry = carry.iloc[boundary + 1:]
+        return pd.concat(result, ignore_index=True).drop(columns=[self.RUN_COLUMN])
+
+    def _external_sort(self, df: pd.DataFrame, run_rows: int) -> pd.DataFrame:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        with self._spill_dir("sort_spill") as spill_dir:
+            runs = []
+            for start in range(0, len(df), run_rows):
+                path = os.path.join(spill_dir, f"run_{len(runs)}.arrow")
+                table = pa.Table.from_pandas(self._sort(df.iloc[start:start + run_rows]), preserve_index=False)
+                feather.write_feather(table, path, compression="uncompressed")
+                runs.append(feather.read_table(path, memory_map=True))
+            return self._merge_runs(runs, max(1, run_rows // (len(runs) + 1)))
+
+    def do_sort(self, df):
+        if self.max_memory_mb is not None:
+            run_rows = self._get_run_rows(len(df), df.memory_usage(deep=True).sum())
+            if run_rows is not None:
+                return self._external_sort(df, run_rows)
+        return self._sort(df)
+
+
+def replace_values(col, values, new_values):
+    """ Replaces the values equal to one of the values with the corresponding new values.
+
+    Only the distinct values of the column are remapped, the result is then taken from the remapped distinct values.
+    """
+    codes, uniques = pd.factorize(col, use_na_sentinel=False)
+    new_uniques = pd.Series(uniques).replace(to_replace=values, value=new_values)
+    return pd.Series(new_uniques.array.take(codes), index=col.index, name=col.name)
+
+
+def replace_substrings(col, values, new_values):
+    """ Replaces all the occurrences of the values in the strings of the column in a single pass. """
+    mapping = {}
+    for value, new_value in zip(values, new_values):
+        mapping.setdefault(value, new_value)
+    # the shorter values are tried first when several values match at the same position
+    pattern = re.compile("|".join(re.escape(value) for value in sorted(mapping, key=len)))
+    return col.str.replace(pattern, lambda match: mapping[match.group(0)], regex=True)
+
+
+# the escapes (octal escapes, numbered backreferences or escaped characters) and the character classes in a regular expression
+REGEX_ESCAPES_AND_CLASSES = re.compile(r"\\(?:[0-7]{3}|0[0-7]{0,2}|([1-9]\d?)|.)|\[\^?\]?(?:\\.|[^\]\\])*\]", re.DOTALL)
+
+
+def _shift_backreferences(value, shift):
+    def _shift(match):
+        if match.group(1) is None:
+            return match.group(0)
+        ref = int(match.group(1)) + shift
+        if ref > 99:
+            raise re.error(f"Cannot shift the backreference \\{match.group(1)} of {value!r} past the 99th group.")
+        # the (?:) keeps the shifted backreference apart from any digit following it
+        return f"(?:\\{ref})"
+    return REGEX_ESCAPES_AND_CLASSES.sub(_shift, value)
+
+
+def combine_regexes(values, new_values):
+    """ Combines the regular expressions into a single alternation, each in its own group.
+
+    Returns the combined regular expression and a dict of the replacement templates by the group of each
+    regular expression, with the references to groups (in the regular expressions and in the templates)
+    shifted to the groups in the combined regular expression.
+    """
+    patterns, templates, group = [], {}, 1
+    for value, new_value in zip(values, new_values):
+        compiled = re.compile(value)
+
+        def _shift_group(match, group=group, groupindex=compiled.groupindex):
+            ref = match.group(1) or match.group(2)
+            return f"\\g<{group + (int(ref) if ref.isdigit() else groupindex[ref])}>"
+
+        templates[group] = re.sub(r"\\g<(\w+)>|\\(\d+)", _shift_group, new_value)
+        patterns.append(f"({_shift_backreferences(value, group)})")
+        group += compiled.groups + 1
+    return re.compile("|".join(patterns)), templates
+
+
+def replace_regexes(col, combined, templates):
+    """ Replaces the matches of the combined regular expression using the template of the group which matched. """
+    # the group of the regular expression which matched is the outermost and last to close
+    return col.str.replace(combined, lambda match: match.expand(templates[match.lastindex]), regex=True)
+
+
+def get_regex_replacement(old_val, new_val):
+    """ Converts the $name/${name} references to groups in the replacement to the python re syntax. """
+    compiled = re.compile(old_val)
+    groupindex = compiled.groupindex
+    if compiled.groups > 0 and not groupindex:
+        groupindex = {v: v for v in range(1, compiled.groups + 1)}
+    for group_name, group_idx in groupindex.items():
+        new_val = new_val.replace(f"${group_name}", f"\\g<{group_name}>")
+        new_val = new_val.replace(f"${{{group_name}}}", f"\\g<{group_name}>")
+        if group_name != group_idx:
+            new_val = new_val.replace(f"${{{group_idx}}}", f"\\{group_idx}")
+            new_val = new_val.replace(f"${group_idx}", f"\\{group_idx}")
+    return old_val, new_val
+
+
+def combine_replacements(values, new_values):
+    """ Combines the regular expressions and their replacements (with $name/${name} references) with combine_regexes. """
+    return combine_regexes(*zip(*(
+        get_regex_replacement(old_val, new_val) for old_val, new_val in zip(values, new_values)
+    )))
+
 
 class ReplaceRule(ReplaceRuleBase, PandasMixin):
 
     def _get_old_new_regex(self, old_val, new_val):
-        compiled = re.compile(old_val)
-        groupindex = compiled.groupindex
-        if compiled.groups > 0 and not groupindex:
-            groupindex = {v: v for v in range(1, compiled.groups + 1)}
-        for group_name, group_idx in groupindex.items():
-            new_val = new_val.replace(f"${group_name}", f"\\g<{group_name}>")
-            new_val = new_val.replace(f"${{{group_name}}}", f"\\g<{group_name}>")
-            if group_name != group_idx:
-                new_val = new_val.replace(f"${{{group_idx}}}", f"\\{group_idx}")
-                new_val = new_val.replace(f"${group_idx}", f"\\{group_idx}")
-        return old_val, new_val
+        return get_regex_replacement(old_val, new_val)
+
+    def _get_combined_regex(self):
+        return combine_replacements(self.values, self.new_values)
 
     def do_apply(self, df, col):
         if self.regex:
-            for old_val, new_val in zip(self.values, self.new_values):
-                old_val, new_val = self._get_old_new_regex(old_val, new_val)
-                return col.replace(to_replace=old_val, value=new_val, regex=self.regex)
-        return col.replace(to_replace=self.values, value=self.new_values, regex=self.regex)
+            try:
+                combined, templates = self._get_combined_regex()
+            except re.error:
+                # e.g. the same group name in several regular expressions, they are applied one after the other
+                for old_val, new_val in zip(self.values, self.new_values):
+                    old_val, new_val = self._get_old_new_regex(old_val, new_val)
+                    col = col.str.replace(old_val, new_val, regex=True)
+                return col
+            return replace_regexes(col, combined, templates)
+        elif self.substring:
+            return replace_substrings(col, self.values, self.new_values)
+        return replace_values(col, self.values, self.new_values)
 
 
 class ExplodeValuesRule(ExplodeValuesRuleBase):
@@ -59,3 +294,28 @@ class ExplodeValuesRule(ExplodeValuesRuleBase):
         if self.column_type:
             result = result.astype({self.input_column: MAP_TYPES[self.column_type]})
         self._set_output_df(data, result)
+
+
+class TopNRule(TopNRuleBase):
+
+    def _sort(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df.sort_values(by=self.sort_by, ascending=self._get_ascending(), ignore_index=True)
+
+    def do_top_n(self, df):
+        ascending = self._get_ascending()
+        if self.group_by is None:
+            if len(set(ascending)) == 1:
+                try:
+                    if ascending[0]:
+                        return self._sort(df.nsmallest(self.n, self.sort_by, keep="first"))
+                    return self._sort(df.nlargest(self.n, self.sort_by, keep="first"))
+                except TypeError:
+                    # nlargest/nsmallest only support numeric columns
+                    ...
+            return self._sort(df).head(self.n)
+        if len(self.sort_by) == 1:
+            ranks = df.groupby(self.group_by, sort=False, dropna=False)[self.sort_by[0]].rank(
+                method="first", ascending=ascending[0], na_option="bottom"
+            )
+            return self._sort(df[ranks <= self.n])
+        return self._sort(df).groupby(self.group_by, sort=False, dropna=False).head(self.n).reset_index(drop=True)
@@ -1,23 +1,56 @@
+import numpy as np
+import pandas as pd
+
 from etlrules.backends.common.fill import (
     BackFillRule as BackFillRuleBase,
     ForwardFillRule as ForwardFillRuleBase,
 )
 
 
+def fill_columns(df, columns, group_by=None, backward=False):
+    """ Fills the NAs in the columns with the previous (or next, when backward) non-NA value in the same group.
+
+    The rows are grouped by their group codes and each column is filled in a single vectorized pass over the
+    positions of the values to fill from. Returns a dict of the filled columns, skipping the columns with no NAs.
+    """
+    steps = np.arange(len(df))
+    if group_by:
+        codes = df.groupby(group_by, sort=False, dropna=False).ngroup().to_numpy()
+        # the rows of each group are contiguous in this order, keeping their relative order
+        order = np.argsort(codes, kind="stable")
+    else:
+        codes, order = None, steps
+    if backward:
+        order = order[::-1]
+    if codes is not None:
+        ordered_codes = codes[order]
+        group_starts = np.maximum.accumulate(np.where(np.diff(ordered_codes, prepend=-1) != 0, steps, 0))
+    results = {}
+    for col in columns:
+        valid = df[col].notna().to_numpy()
+        if valid.all():
+            continue
+        last_valid = np.maximum.accumulate(np.where(valid[order], steps, -1))
+        if codes is not None:
+            last_valid = np.where(last_valid >= group_starts, last_valid, -1)
+        # rows with nothing to fill from take their own (NA) value
+        positions = np.empty(len(df), dtype=np.intp)
+        positions[order] = np.where(last_valid >= 0, order[last_valid], order)
+        results[col] = pd.Series(df[col].array.take(positions), index=df.index, name=col)
+    return results
+
+
 class FillMixin:
     def do_apply(self, df):
-        df_columns = [col for col in df.columns]
         if self.sort_by:
-            df = df.sort_values(by=self.sort_by, ascending=self.sort_ascending, ignore_index=True)
-        if self.group_by:
-            res = df.groupby(self.group_by)
-            res = getattr(res, self.FILL_METHOD)()
-            res = res[self.columns]
+            # sorts the positions using only the sort_by columns, then takes the rows once
+            positions = df[self.sort_by].reset_index(drop=True).sort_values(by=self.sort_by, ascending=self.sort_ascending).index
+            df = df.take(positions)
+            df.index = pd.RangeIndex(len(df))
         else:
-            res = df[self.columns]
-            res = getattr(res, self.FILL_METHOD)()
-        df = df.assign(**{col: res[col] for col in self.columns})
-        df = df[df_columns]
+            df = df.copy(deep=False)
+        for col, values in fill_columns(df, self.columns, self.group_by, self.FILL_METHOD == "bfill").items():
+            df[col] = values
         return df
 
 
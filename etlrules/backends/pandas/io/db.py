@@ -2,47 +2,58 @@ import pandas as pd
 
 from etlrules.backends.common.io.db import (
     ReadSQLQueryRule as ReadSQLQueryRuleBase,
+    SQLLookupJoinRule as SQLLookupJoinRuleBase,
     WriteSQLTableRule as WriteSQLTableRuleBase,
-    SQLAlchemyEngines,
 )
+from etlrules.backends.pandas.joins import InnerJoinRule, LeftJoinRule
 from etlrules.backends.pandas.types import MAP_TYPES
-from etlrules.exceptions import SQLError
 
 
 class ReadSQLQueryRule(ReadSQLQueryRuleBase):
-    def _do_apply(self, connection):
+    def _do_apply(self, connection, sql_query, params):
         if self.column_types is not None:
             column_types = {col: MAP_TYPES[col_type] for col, col_type in self.column_types.items()}
         else:
             column_types = None
+        if params:
+            import sqlalchemy as sa
+            sql_query = sa.text(sql_query)
         return pd.read_sql_query(
-            self._get_sql_query(),
+            sql_query,
             connection,
+            params=params or None,
             dtype=column_types,
         ).convert_dtypes()
 
+    def _get_column_max(self, df, column):
+        value = df[column].max()
+        return None if pd.isna(value) else value
+
 
 class WriteSQLTableRule(WriteSQLTableRuleBase):
 
     METHOD = 'multi'
 
-    def _do_apply(self, connection, df):
+    def _write_table(self, connection, df, sql_table, if_exists, schema=None):
         df.to_sql(
-            self._get_sql_table(),
+            sql_table,
             connection,
-            if_exists=self.if_exists,
+            schema=schema,
+            if_exists=if_exists,
             index=False,
             method=self.METHOD
         )
 
-    def apply(self, data):
-        super().apply(data)
-        df = self._get_input_df(data)
-        engine = SQLAlchemyEngines.get_engine(self._get_sql_engine())
-        import sqlalchemy as sa
-        with engine.connect() as connection:
-            try:
-                self._do_apply(connection, df)
-            except sa.exc.SQLAlchemyError as exc:
-                raise SQLError(str(exc))
-            connection.commit()
+
+class SQLLookupJoinRule(SQLLookupJoinRuleBase):
+
+    JOIN_RULES = {"left": LeftJoinRule, "inner": InnerJoinRule}
+
+    def _get_distinct_keys(self, df):
+        return list(df[self.key_columns].dropna().drop_duplicates().itertuples(index=False, name=None))
+
+    def _create_lookup_df(self, df, columns, rows):
+        lookup_df = pd.DataFrame.from_records(rows, columns=columns).convert_dtypes()
+        return lookup_df.astype({
+            lookup_col: df[col].dtype for col, lookup_col in zip(self.key_columns, self._get_lookup_key_columns())
+        })
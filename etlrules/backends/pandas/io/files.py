@@ -1,35 +1,110 @@
+import itertools
 import os
+import urllib.request
 import pandas as pd
+from typing import Optional
 
 from etlrules.exceptions import MissingColumnError
 
 from etlrules.backends.common.io.files import (
     ReadCSVFileRule as ReadCSVFileRuleBase,
+    ReadJSONLinesFileRule as ReadJSONLinesFileRuleBase,
     ReadParquetFileRule as ReadParquetFileRuleBase,
     WriteCSVFileRule as WriteCSVFileRuleBase,
+    WriteJSONLinesFileRule as WriteJSONLinesFileRuleBase,
     WriteParquetFileRule as WriteParquetFileRuleBase,
 )
+from etlrules.backends.pandas.types import MAP_TYPES
 
 
-class ReadCSVFileRule(ReadCSVFileRuleBase):
-    def do_read(self, file_path: str) -> pd.DataFrame:
+class ReadFileMixin:
+    def do_concat(self, left_df: pd.DataFrame, right_df: pd.DataFrame) -> pd.DataFrame:
+        return pd.concat([left_df, right_df], axis=0, ignore_index=True)
+
+    def do_empty(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df[:0]
+
+
+class ReadCSVFileRule(ReadFileMixin, ReadCSVFileRuleBase):
+    def _read_csv(self, file_path: str, nrows: Optional[int]=None) -> pd.DataFrame:
         return pd.read_csv(
             file_path, sep=self.separator, header='infer' if self.header else None,
             skiprows=self.skip_header_rows,
-            index_col=False
+            index_col=False, nrows=nrows
         )
 
+    def do_read(self, file_path: str) -> pd.DataFrame:
+        return self._read_csv(file_path)
+
+    def do_read_empty(self, file_path: str) -> pd.DataFrame:
+        return self.do_empty(self._read_csv(file_path, nrows=self.EMPTY_RESULT_SAMPLE_ROWS))
+
+    def do_cache_load(self, cache_path: str) -> pd.DataFrame:
+        import pyarrow as pa
+        with pa.memory_map(cache_path) as source:
+            df = pa.ipc.open_file(source).read_all().to_pandas()
+        if not self.header:
+            # arrow only supports string column names
+            df.columns = range(len(df.columns))
+        return df
+
+    def do_cache_store(self, df: pd.DataFrame, cache_path: str) -> None:
+        import pyarrow as pa
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.OSFile(cache_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
 
-class ReadParquetFileRule(ReadParquetFileRuleBase):
+
+class ReadParquetFileRule(ReadFileMixin, ReadParquetFileRuleBase):
     def do_read(self, file_path: str) -> pd.DataFrame:
         from pyarrow.lib import ArrowInvalid
         try:
             return pd.read_parquet(
-                file_path, engine="pyarrow", columns=self.columns, filters=self.filters
+                file_path, engine="pyarrow", columns=self.columns, filters=self._get_read_filters()
             )
         except ArrowInvalid as exc:
             raise MissingColumnError(str(exc))
 
+    def do_read_empty(self, file_path: str) -> pd.DataFrame:
+        import pyarrow.parquet as pq
+        # only the schema is read from the parquet metadata
+        table = pq.read_schema(file_path).empty_table()
+        if self.columns:
+            try:
+                table = table.select(self.columns)
+            except KeyError as exc:
+                raise MissingColumnError(str(exc))
+        return table.to_pandas()
+
+
+class ReadJSONLinesFileRule(ReadFileMixin, ReadJSONLinesFileRuleBase):
+    def _read_json(self, source) -> pd.DataFrame:
+        import pyarrow as pa
+        from pyarrow import json as pa_json
+        read_options = pa_json.ReadOptions(block_size=self.block_size) if self.block_size else None
+        parse_options = None
+        if self.column_types:
+            parse_options = pa_json.ParseOptions(explicit_schema=pa.schema([
+                (col, pa.type_for_alias(col_type)) for col, col_type in self.column_types.items()
+            ]))
+        df = pa_json.read_json(source, read_options=read_options, parse_options=parse_options).to_pandas()
+        if self.column_types:
+            df = df.astype({col: MAP_TYPES[col_type] for col, col_type in self.column_types.items()})
+        return df
+
+    def do_read(self, file_path: str) -> pd.DataFrame:
+        if file_path.startswith("http://") or file_path.startswith("https://"):
+            # pyarrow only reads local files, the uris (not cached locally) are streamed over http
+            with urllib.request.urlopen(file_path) as f:
+                return self._read_json(f)
+        return self._read_json(file_path)
+
+    def do_read_empty(self, file_path: str) -> pd.DataFrame:
+        import pyarrow as pa
+        with open(file_path, "rb") as f:
+            sample = b"".join(itertools.islice(f, self.EMPTY_RESULT_SAMPLE_ROWS))
+        return self.do_empty(self._read_json(pa.BufferReader(sample)))
+
 
 class WriteCSVFileRule(WriteCSVFileRuleBase):
 
@@ -53,3 +128,13 @@ class WriteParquetFileRule(WriteParquetFileRuleBase):
             index=False
         )
 
+
+
+class WriteJSONLinesFileRule(WriteJSONLinesFileRuleBase):
+
+    def do_write(self, file_name: str, file_dir: str, df: pd.DataFrame) -> None:
+        with open(os.path.join(file_dir, file_name), "w", encoding="utf-8") as f:
+            for start in range(0, len(df), self.chunk_size):
+                df.iloc[start:start + self.chunk_size].to_json(
+                    f, orient="records", lines=True, date_format="iso", index=False
+                )
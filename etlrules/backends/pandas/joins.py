@@ -1,4 +1,13 @@
+import logging
+
+import pandas as pd
+
 from etlrules.backends.common.joins import (
+    JoinIndexes,
+    AsOfJoinRule as AsOfJoinRuleBase,
+    SemiJoinRule as SemiJoinRuleBase,
+    AntiJoinRule as AntiJoinRuleBase,
+    BuildJoinIndexRule as BuildJoinIndexRuleBase,
     LeftJoinRule as LeftJoinRuleBase,
     RightJoinRule as RightJoinRuleBase,
     InnerJoinRule as InnerJoinRuleBase,
@@ -6,9 +15,59 @@ from etlrules.backends.common.joins import (
 )
 
 
-class JoinsMixin():
+perf_logger = logging.getLogger("etlrules.perf")
+
+
+def _get_keys_index(df, key_columns):
+    if len(key_columns) == 1:
+        return pd.Index(df[key_columns[0]])
+    return pd.MultiIndex.from_frame(df[key_columns])
+
+
+class BuildJoinIndexRule(BuildJoinIndexRuleBase):
+    def do_build_index(self, df):
+        index = _get_keys_index(df, self.key_columns)
+        # checking for uniqueness builds the hash table of the index which is then cached on it
+        if index.is_unique:
+            JoinIndexes.register(df, self.key_columns, index)
+        else:
+            perf_logger.warning("Join index not built as the key columns %s are not unique.", self.key_columns)
+        return df
+
+
+class KeyValuesMixin():
+    def _get_key_values(self, df, column):
+        return df[column].dropna().drop_duplicates().tolist()
+
+    def _has_null_keys(self, df, column):
+        return bool(df[column].isna().any())
+
+
+class JoinsMixin(KeyValuesMixin):
+
+    # the merge matches the null keys
+    NULL_KEYS_MATCH = True
+
     def do_apply(self, left_df, right_df):
         left_on, right_on = self._get_key_columns()
+        index = JoinIndexes.get(right_df, right_on) if self.JOIN_TYPE in ("left", "inner") else None
+        strategy = self._get_strategy(index)
+        if strategy == self.STRATEGY_INDEX:
+            positions = index.get_indexer(_get_keys_index(left_df, left_on))
+            if self.JOIN_TYPE == "inner":
+                matched = positions >= 0
+                left_df = left_df[matched]
+                positions = positions[matched]
+            return self._join_on_indexers(left_df, right_df, None, positions)
+        if strategy == self.STRATEGY_MERGE:
+            left_index = pd.Index(left_df[left_on[0]])
+            right_index = pd.Index(right_df[right_on[0]])
+            if left_index.is_monotonic_increasing and right_index.is_monotonic_increasing:
+                # joining two monotonic indexes does a merge join
+                join_index, left_indexer, right_indexer = left_index.join(right_index, how=self.JOIN_TYPE, return_indexers=True)
+                return self._join_on_indexers(left_df, right_df, left_indexer, right_indexer, join_index)
+            if self.strict:
+                self._raise_not_sorted()
         return left_df.merge(
             right_df,
             how=self.JOIN_TYPE,
@@ -17,6 +76,52 @@ class JoinsMixin():
             suffixes=self.suffixes
         )
 
+    def _get_strategy(self, index):
+        left_on, _ = self._get_key_columns()
+        strategy = self.strategy
+        if strategy is None:
+            if index is not None:
+                strategy = self.STRATEGY_INDEX
+            elif self.sorted_input:
+                strategy = self.STRATEGY_MERGE
+        if (
+            (strategy == self.STRATEGY_INDEX and index is None) or
+            (strategy == self.STRATEGY_MERGE and len(left_on) > 1) or
+            strategy in (None, self.STRATEGY_BROADCAST)
+        ):
+            strategy = self.STRATEGY_HASH
+        self._log_strategy(strategy)
+        return strategy
+
+    def _join_on_indexers(self, left_df, right_df, left_indexer, right_indexer, join_index=None):
+        # the indexers are the row positions of each result row in left/right (-1 for missing, None for all rows)
+        left_on, right_on = self._get_key_columns()
+        # replicate the merge columns: the right keys with the same name as the left keys are not repeated
+        right_columns = [
+            col for col in right_df.columns
+            if col not in right_on or left_on[right_on.index(col)] != col
+        ]
+        common_cols = [col for col in left_df.columns if col in right_columns]
+        suffix_left, suffix_right = self.suffixes
+        if suffix_left:
+            left_df = left_df.rename(columns={col: col + suffix_left for col in common_cols})
+        right_df = right_df[right_columns]
+        if suffix_right:
+            right_df = right_df.rename(columns={col: col + suffix_right for col in common_cols})
+        # the missing positions (-1) are not in the index so they result in NA rows
+        left_df = left_df.reset_index(drop=True)
+        if left_indexer is not None:
+            left_df = left_df.reindex(left_indexer).reset_index(drop=True)
+        right_df = right_df.reset_index(drop=True)
+        if right_indexer is not None:
+            right_df = right_df.reindex(right_indexer)
+        right_df.index = left_df.index
+        df = pd.concat([left_df, right_df], axis=1)
+        if join_index is not None:
+            for left_col, right_col in zip(left_on, right_on):
+                if left_col == right_col:
+                    df[left_col] = pd.Series(join_index.array, index=df.index)
+        return df
 
 class LeftJoinRule(JoinsMixin, LeftJoinRuleBase):
     JOIN_TYPE = "left"
@@ -32,3 +137,48 @@ class OuterJoinRule(JoinsMixin, OuterJoinRuleBase):
 
 class RightJoinRule(JoinsMixin, RightJoinRuleBase):
     JOIN_TYPE = "right"
+
+
+class AsOfJoinRule(AsOfJoinRuleBase):
+    def do_apply(self, left_df, right_df):
+        left_on, right_on = self._get_key_columns()
+        by_left, by_right = self._get_by_columns()
+        if not self.sorted_input:
+            left_df = left_df.sort_values(left_on, kind="stable")
+            right_df = right_df.sort_values(right_on, kind="stable")
+        tolerance = self.tolerance
+        if isinstance(tolerance, str):
+            tolerance = pd.Timedelta(tolerance)
+        return pd.merge_asof(
+            left_df,
+            right_df,
+            left_on=left_on,
+            right_on=right_on,
+            left_by=by_left,
+            right_by=by_right,
+            suffixes=self.suffixes,
+            tolerance=tolerance,
+            direction=self.direction,
+        )
+
+
+class SemiJoinMixin(KeyValuesMixin):
+    def do_apply(self, left_df, right_df):
+        left_on, right_on = self._get_key_columns()
+        if len(left_on) == 1:
+            matched = left_df[left_on[0]].isin(right_df[right_on[0]].dropna())
+        else:
+            right_keys = pd.MultiIndex.from_frame(right_df[right_on].dropna())
+            matched = _get_keys_index(left_df, left_on).isin(right_keys)
+        matched = matched & left_df[left_on].notna().all(axis=1).to_numpy()
+        if self.JOIN_TYPE == "anti":
+            matched = ~matched
+        return left_df[matched].reset_index(drop=True)
+
+
+class SemiJoinRule(SemiJoinMixin, SemiJoinRuleBase):
+    JOIN_TYPE = "semi"
+
+
+class AntiJoinRule(SemiJoinMixin, AntiJoinRuleBase):
+    JOIN_TYPE = "anti"
@@ -1,6 +1,6 @@
-import logging
-from pandas import NA
-from numpy import nan
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
 from etlrules.backends.common.strings import (
     StrLowerRule as StrLowerRuleBase,
@@ -15,7 +15,30 @@ from etlrules.backends.common.strings import (
 
 from .base import PandasMixin
 
-perf_logger = logging.getLogger("etlrules.perf")
+
+def split_rejoin(col, separator, limit, new_separator, sort=None):
+    """ Splits the strings in a pandas series, optionally sorts the substrings and joins them with the new separator.
+
+    The whole column is processed at once with the pyarrow compute kernels: the substrings of all the values are
+    sorted together by (value position, substring) and put back in the lists of substrings using the list offsets.
+    """
+    values = pa.array(col, from_pandas=True)
+    if isinstance(values, pa.ChunkedArray):
+        # the pyarrow backed columns can be made of multiple chunks
+        values = values.combine_chunks()
+    if pa.types.is_null(values.type):
+        # an object column with only nulls has no string type
+        values = values.cast(pa.string())
+    lists = pc.split_pattern(values, separator, max_splits=limit if limit is not None and limit > 0 else None)
+    if sort is not None:
+        substrings = pc.list_flatten(lists)
+        order = pc.sort_indices(
+            pa.table({"parent": pc.list_parent_indices(lists), "substring": substrings}),
+            sort_keys=[("parent", "ascending"), ("substring", sort)]
+        )
+        lists = pa.ListArray.from_arrays(lists.offsets, substrings.take(order), mask=lists.is_null())
+    result = pc.binary_join(lists, pa.scalar(new_separator, type=lists.type.value_type))
+    return pd.Series(pd.StringDtype().__from_arrow__(result), index=col.index, name=col.name)
 
 
 class StrLowerRule(StrLowerRuleBase, PandasMixin):
@@ -40,15 +63,7 @@ class StrSplitRule(StrSplitRuleBase, PandasMixin):
 
 class StrSplitRejoinRule(StrSplitRejoinRuleBase, PandasMixin):
     def do_apply(self, df, col):
-        perf_logger.warning("StrSplitRejoinRule is not vectorized and might hurt the overall performance.")
-        new_col = col.str.split(pat=self.separator, n=self.limit, regex=False)
-        new_separator = self.new_separator
-        if self.sort is not None:
-            reverse = self.sort==self.SORT_DESCENDING
-            func = lambda val: new_separator.join(sorted(val, reverse=reverse)) if val not in (nan, NA, None) else val
-        else:
-            func = lambda val: new_separator.join(val) if val not in (nan, NA, None) else val
-        return new_col.apply(func).astype("string")
+        return split_rejoin(col, self.separator, self.limit, self.new_separator, self.sort)
 
 
 class StrStripRule(StrStripRuleBase, PandasMixin):
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from etlrules.backends.common.window import WindowRule as WindowRuleBase
+
+
+def _with_peers(ordered_df, result, keys):
+    """ Gives each row the result of the last of its peers (the rows with the same keys), which includes all the peers. """
+    groupby = ordered_df.groupby(keys, sort=False, dropna=False)
+    ids = groupby.ngroup().to_numpy()
+    is_last = (groupby.cumcount(ascending=False) == 0).to_numpy()
+    last_values = pd.Series(result.to_numpy()[is_last], index=ids[is_last])
+    return pd.Series(last_values.reindex(ids).to_numpy(), index=result.index, name=result.name)
+
+
+def apply_windows(df, windows, partition_by, order_by, ascending):
+    """ Computes the window functions over a pandas dataframe and returns the dataframe with the new columns. """
+    # positional index to restore the input order after sorting
+    ordered_df = df.reset_index(drop=True)
+    if order_by:
+        ordered_df = ordered_df.sort_values(order_by, ascending=ascending, kind="stable")
+    if partition_by:
+        groupby = ordered_df.groupby(partition_by, sort=False, dropna=False)
+    results = {}
+    for output_column, window in windows.items():
+        function = window["function"]
+        column = window.get("column")
+        values = (groupby[column] if partition_by else ordered_df[column]) if column else None
+        if function in ("cumsum", "cummin", "cummax"):
+            result = getattr(values, function)()
+        elif function == "cumcount":
+            result = groupby.cumcount() if partition_by else pd.Series(np.arange(len(ordered_df)), index=ordered_df.index)
+        elif function == "rank":
+            result = values.rank(method=window.get("method", "average"), ascending=not window.get("descending", False))
+        elif function in ("lag", "lead"):
+            offset = window.get("offset", 1)
+            result = values.shift(offset if function == "lag" else -offset)
+        else:
+            window_size, min_periods = window["window"], window.get("min_periods", 1)
+            if isinstance(window_size, str):
+                # time based windows, over the order_by column
+                on = order_by[0]
+                frame = groupby[[column, on]] if partition_by else ordered_df[[column, on]]
+                rolling = frame.rolling(window_size, on=on, min_periods=min_periods)
+                result = (rolling.sum() if function == "rolling_sum" else rolling.mean())[column]
+                if partition_by:
+                    result = result.droplevel(list(range(result.index.nlevels - 1)))
+                result = _with_peers(ordered_df, result.reindex(ordered_df.index), (partition_by or []) + [on])
+            else:
+                rolling = values.rolling(window_size, min_periods=min_periods)
+                result = rolling.sum() if function == "rolling_sum" else rolling.mean()
+                if partition_by:
+                    # groupby rolling prefixes the index with the partition_by values
+                    result = result.droplevel(list(range(result.index.nlevels - 1)))
+        results[output_column] = result.sort_index().set_axis(df.index)
+    return df.assign(**results)
+
+
+class WindowRule(WindowRuleBase):
+    def do_apply(self, df):
+        return apply_windows(df, self.windows, self.partition_by, self.order_by, self.ascending)
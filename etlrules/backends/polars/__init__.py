@@ -1,6 +1,6 @@
 from .aggregate import AggregateRule
 from etlrules.backends.common.basic import ProjectRule
-from .basic import DedupeRule, ExplodeValuesRule, RenameRule, ReplaceRule, SortRule
+from .basic import DedupeRule, ExplodeValuesRule, RenameRule, ReplaceRule, SortRule, TopNRule
 from .concat import VConcatRule, HConcatRule
 from .conditions import IfThenElseRule, FilterRule
 from .datetime import (
@@ -10,7 +10,10 @@ from .datetime import (
     DateTimeDiffRule,
 )
 from .fill import ForwardFillRule, BackFillRule
-from .joins import LeftJoinRule, InnerJoinRule, OuterJoinRule, RightJoinRule
+from .joins import (
+    AsOfJoinRule, BuildJoinIndexRule, LeftJoinRule, InnerJoinRule, OuterJoinRule, RightJoinRule,
+    SemiJoinRule, AntiJoinRule,
+)
 from .newcolumns import AddNewColumnRule, AddRowNumbersRule
 from .numeric import AbsRule, RoundRule
 from .strings import (
@@ -18,17 +21,21 @@ from .strings import (
     StrStripRule, StrPadRule, StrExtractRule,
 )
 from .types import TypeConversionRule
+from .window import WindowRule
 
 from etlrules.backends.common.basic import RulesBlock
 
 ## IO - extractors and loaders
-from .io.files import ReadCSVFileRule, ReadParquetFileRule, WriteCSVFileRule, WriteParquetFileRule
-from .io.db import ReadSQLQueryRule, WriteSQLTableRule
+from .io.files import (
+    ReadCSVFileRule, ReadJSONLinesFileRule, ReadParquetFileRule,
+    WriteCSVFileRule, WriteJSONLinesFileRule, WriteParquetFileRule,
+)
+from .io.db import ReadSQLQueryRule, SQLLookupJoinRule, WriteSQLTableRule
 
 
 __all__ = [
     'AggregateRule',
-    'DedupeRule', 'ExplodeValuesRule', 'ProjectRule', 'RenameRule', 'ReplaceRule', 'SortRule',
+    'DedupeRule', 'ExplodeValuesRule', 'ProjectRule', 'RenameRule', 'ReplaceRule', 'SortRule', 'TopNRule',
     'VConcatRule', 'HConcatRule',
     'IfThenElseRule', 'FilterRule',
     'DateTimeLocalNowRule', 'DateTimeUTCNowRule', 'DateTimeToStrFormatRule',
@@ -36,14 +43,17 @@ __all__ = [
     'DateTimeExtractComponentRule', 'DateTimeAddRule', 'DateTimeSubstractRule',
     'DateTimeDiffRule',
     'ForwardFillRule', 'BackFillRule',
-    'LeftJoinRule', 'InnerJoinRule', 'OuterJoinRule', 'RightJoinRule',
+    'AsOfJoinRule', 'BuildJoinIndexRule', 'LeftJoinRule', 'InnerJoinRule', 'OuterJoinRule', 'RightJoinRule',
+    'SemiJoinRule', 'AntiJoinRule',
     'AddNewColumnRule', 'AddRowNumbersRule',
     'AbsRule', 'RoundRule',
     'StrLowerRule', 'StrUpperRule', 'StrCapitalizeRule', 'StrSplitRule', 'StrSplitRejoinRule',
     'StrStripRule', 'StrPadRule', 'StrExtractRule',
     'TypeConversionRule',
+    'WindowRule',
     'RulesBlock',
     # IO extractors and loaders
-    'ReadCSVFileRule', 'ReadParquetFileRule', 'WriteCSVFileRule', 'WriteParquetFileRule',
-    'ReadSQLQueryRule', 'WriteSQLTableRule',
+    'ReadCSVFileRule', 'ReadJSONLinesFileRule', 'ReadParquetFileRule',
+    'WriteCSVFileRule', 'WriteJSONLinesFileRule', 'WriteParquetFileRule',
+    'ReadSQLQueryRule', 'SQLLookupJoinRule', 'WriteSQLTableRule',
 ]
@@ -32,6 +32,11 @@ class AggregateRule(AggregateRuleBase):
         },
     }
 
+    STATE_AGGREGATIONS = {
+        "list": "drop_nulls",
+        "concat": ["explode", "drop_nulls"],
+    }
+
     def _get_agg(self, col, aggs, kwargs):
         if isinstance(aggs, str):
             return getattr(pl.col(col), aggs)(**kwargs)
@@ -51,12 +56,48 @@ class AggregateRule(AggregateRuleBase):
         # assumes lambda
         return pl.col(col).map_elements(aggs)
 
-    def do_aggregate(self, df, aggs):
+    def do_aggregate(self, df, aggs, group_by):
         aggs = [self._get_agg(col, aggs, {}) for col, aggs in aggs.items()]
-        result = df.group_by(self.group_by, maintain_order=True).agg(*aggs)
+        result = df.group_by(group_by, maintain_order=True).agg(*aggs)
         if self.aggregation_types:
             result = result.select(
                 pl.col(col).cast(MAP_TYPES[self.aggregation_types[col]]) if col in self.aggregation_types else pl.col(col)
                 for col in result.columns
             )
         return result
+
+    def do_aggregate_states(self, df, group_by, state_aggs):
+        aggs = [
+            self._get_agg(col, self.STATE_AGGREGATIONS.get(agg_func) or self.AGGREGATIONS[agg_func], {}).alias(state_col)
+            for state_col, (col, agg_func) in state_aggs.items()
+        ]
+        return df.group_by(group_by, maintain_order=True).agg(*aggs)
+
+    def do_concat_states(self, state, batch_state):
+        return pl.concat([state, batch_state], how="vertical_relaxed")
+
+    def do_finalize(self, state, group_by, aggregations):
+        exprs = [pl.col(col) for col in group_by]
+        for col, agg_func in aggregations.items():
+            suffix = self.PARTIAL_AGGREGATIONS[agg_func][0][0]
+            expr = pl.col(self._get_state_column(col, suffix))
+            if agg_func == "mean":
+                count = pl.col(self._get_state_column(col, "count"))
+                expr = pl.when(count > 0).then(expr / count)
+            elif agg_func == "csv":
+                expr = expr.map_elements(stringify, return_dtype=pl.Utf8)
+            exprs.append(expr.alias(col))
+        result = state.select(exprs)
+        if self.aggregation_types:
+            result = result.select(
+                pl.col(col).cast(MAP_TYPES[self.aggregation_types[col]]) if col in self.aggregation_types else pl.col(col)
+                for col in result.columns
+            )
+        return result
+
+    def do_load_state(self, state_file):
+        # the state file is a path, not a glob pattern
+        return pl.read_parquet(state_file, glob=False)
+
+    def do_save_state(self, state, state_file):
+        state.write_parquet(state_file)
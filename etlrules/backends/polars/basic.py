@@ -1,3 +1,4 @@
+import os
 import polars as pl
 import re
 
@@ -7,15 +8,79 @@ from etlrules.backends.common.basic import (
     RenameRule as RenameRuleBase,
     ReplaceRule as ReplaceRuleBase,
     SortRule as SortRuleBase,
+    TopNRule as TopNRuleBase,
 )
+from etlrules.backends.pandas.basic import combine_replacements, replace_regexes
 from etlrules.backends.polars.base import PolarsMixin
 from etlrules.backends.polars.types import MAP_TYPES
 
 
 class DedupeRule(DedupeRuleBase):
-    def do_dedupe(self, df):
+
+    ROW_INDEX_COLUMN = "__etlrules_dedupe_row_idx__"
+    PARTITION_COLUMN = "__etlrules_dedupe_partition__"
+
+    def _is_sorted(self, df: pl.DataFrame) -> bool:
+        # each column must be ascending or descending, with the nulls first or last, in the rows where the previous columns are equal
+        tied = pl.lit(True)
+        checks = []
+        for col in self.columns:
+            for key in (pl.col(col).is_null(), pl.col(col)):
+                prev = key.shift(1)
+                checks.extend([
+                    ((key > prev) & tied).any().alias(f"greater_{len(checks)}"),
+                    ((key < prev) & tied).any().alias(f"less_{len(checks)}"),
+                ])
+                tied = tied & key.eq_missing(prev)
+        flags = df.select(checks).row(0)
+        return not any(greater and less for greater, less in zip(flags[::2], flags[1::2]))
+
+    def _dedupe_sorted(self, df: pl.DataFrame) -> pl.DataFrame:
+        if self.strict and not self._is_sorted(df):
+            self._raise_not_sorted()
+        row_idx = pl.int_range(pl.len())
+        same_as_prev = (row_idx > 0) & pl.all_horizontal(
+            pl.col(col).eq_missing(pl.col(col).shift(1)) for col in self.columns
+        )
+        same_as_next = (row_idx < pl.len() - 1) & pl.all_horizontal(
+            pl.col(col).eq_missing(pl.col(col).shift(-1)) for col in self.columns
+        )
+        if self.keep == DedupeRule.KEEP_FIRST:
+            return df.filter(~same_as_prev)
+        elif self.keep == DedupeRule.KEEP_LAST:
+            return df.filter(~same_as_next)
+        return df.filter(~(same_as_prev | same_as_next))
+
+    def _dedupe(self, df: pl.DataFrame) -> pl.DataFrame:
+        if self.sorted_input:
+            return self._dedupe_sorted(df)
+        # polars hashes the subset of key columns only (verifying the keys on hash collisions)
         return df.unique(subset=self.columns, keep=self.keep, maintain_order=True)
 
+    def _dedupe_spilled(self, df: pl.DataFrame) -> pl.DataFrame:
+        results = []
+        with self._spill_dir("dedupe_spill") as spill_dir:
+            # the input is hashed and spilled one chunk at a time, each chunk adding a file to each partition
+            paths = {}
+            for chunk_idx, start in enumerate(range(0, df.height, self.SPILL_CHUNK_ROWS)):
+                chunk = df.slice(start, self.SPILL_CHUNK_ROWS).with_row_index(self.ROW_INDEX_COLUMN, offset=start).with_columns(
+                    (pl.struct(self.columns).hash() % self.spill_partitions).alias(self.PARTITION_COLUMN)
+                )
+                for (partition, ), partition_df in chunk.partition_by(self.PARTITION_COLUMN, as_dict=True, include_key=False).items():
+                    path = os.path.join(spill_dir, f"partition_{partition}_{chunk_idx}.arrow")
+                    partition_df.write_ipc(path)
+                    paths.setdefault(partition, []).append(path)
+                del chunk
+            for partition_paths in paths.values():
+                partition_df = pl.concat([pl.read_ipc(path, memory_map=False) for path in partition_paths])
+                results.append(self._dedupe(partition_df))
+        return pl.concat(results).sort(self.ROW_INDEX_COLUMN).drop(self.ROW_INDEX_COLUMN)
+
+    def do_dedupe(self, df):
+        if self.spill_partitions and not self.sorted_input and not df.is_empty():
+            return self._dedupe_spilled(df)
+        return self._dedupe(df)
+
 
 class RenameRule(RenameRuleBase):
     def do_rename(self, df, mapper):
@@ -23,13 +88,57 @@ class RenameRule(RenameRuleBase):
 
 
 class SortRule(SortRuleBase):
-    def do_sort(self, df):
+
+    def _sort(self, df: pl.DataFrame) -> pl.DataFrame:
         if isinstance(self.ascending, bool):
             descending = not self.ascending
         else:
             descending = [not asc for asc in self.ascending]
         return df.sort(by=self.sort_by, descending=descending)
 
+    def _merge_runs(self, runs: list, batch_rows: int) -> pl.DataFrame:
+        # merges the sorted runs in batches: the carry holds the rows read from the runs but not yet emitted
+        offsets = [0] * len(runs)
+        carry = None
+        result = []
+        while True:
+            batches = [] if carry is None else [carry]
+            in_carry = set() if carry is None else set(carry[self.RUN_COLUMN].unique())
+            for run, run_df in enumerate(runs):
+                if run not in in_carry and offsets[run] < len(run_df):
+                    batch = run_df.slice(offsets[run], batch_rows)
+                    batches.append(batch.with_columns(pl.lit(run, dtype=pl.UInt32).alias(self.RUN_COLUMN)))
+                    offsets[run] += batch_rows
+            carry = self._sort(pl.concat(batches))
+            active = [run for run, run_df in enumerate(runs) if offsets[run] < len(run_df)]
+            if not active:
+                result.append(carry)
+                break
+            # no row yet to be read from an active run can be smaller than the last row read from that run,
+            # so the rows up to the smallest such last row are in their final order
+            boundary = carry.with_row_index("__etlrules_sort_pos__").filter(
+                pl.col(self.RUN_COLUMN).is_in(active)
+            ).group_by(self.RUN_COLUMN).agg(pl.col("__etlrules_sort_pos__").max())["__etlrules_sort_pos__"].min()
+            result.append(carry[:boundary + 1])
+            carry = carry[boundary + 1:]
+        return pl.concat(result).drop(self.RUN_COLUMN)
+
+    def _external_sort(self, df: pl.DataFrame, run_rows: int) -> pl.DataFrame:
+        with self._spill_dir("sort_spill") as spill_dir:
+            runs = []
+            for start in range(0, len(df), run_rows):
+                path = os.path.join(spill_dir, f"run_{len(runs)}.arrow")
+                self._sort(df.slice(start, run_rows)).write_ipc(path)
+                runs.append(pl.read_ipc(path, memory_map=True))
+            return self._merge_runs(runs, max(1, run_rows // (len(runs) + 1)))
+
+    def do_sort(self, df):
+        if self.max_memory_mb is not None:
+            run_rows = self._get_run_rows(len(df), df.estimated_size())
+            if run_rows is not None:
+                return self._external_sort(df, run_rows)
+        return self._sort(df)
+
 
 class ReplaceRule(ReplaceRuleBase, PolarsMixin):
 
@@ -48,9 +157,22 @@ class ReplaceRule(ReplaceRuleBase, PolarsMixin):
         if col.is_empty():
             return col
         if self.regex:
+            if len(self.values) > 1:
+                try:
+                    combined, templates = combine_replacements(self.values, self.new_values)
+                except re.error:
+                    # e.g. the same group name in several regular expressions, they are applied one after the other
+                    combined = None
+                if combined is not None:
+                    # the polars regular expressions cannot pick the replacement by the alternative which matched,
+                    # so the combined regular expression is applied in a single pass with python's re
+                    return pl.Series(col.name, replace_regexes(col.to_pandas(), combined, templates), dtype=col.dtype)
             for old_val, new_val in zip(self.values, self.new_values):
                 old_val, new_val = self._get_old_new_regex(old_val, new_val)
-                col = col.str.replace(old_val, new_val)
+                col = col.str.replace_all(old_val, new_val)
+        elif self.substring:
+            # aho-corasick matching of all the values in a single pass
+            col = col.str.replace_many(self.values, self.new_values)
         else:
             col = col.replace(dict(zip(self.values, self.new_values)))
         return col
@@ -67,3 +189,24 @@ class ExplodeValuesRule(ExplodeValuesRuleBase):
                 **{self.input_column: pl.col(self.input_column).cast(MAP_TYPES[self.column_type])}
             )
         self._set_output_df(data, result)
+
+
+class TopNRule(TopNRuleBase):
+
+    def _sort(self, df: pl.DataFrame) -> pl.DataFrame:
+        return df.sort(by=self.sort_by, descending=[not asc for asc in self._get_ascending()])
+
+    def do_top_n(self, df):
+        # top_k selects the largest values, reverse selects the smallest ones
+        # the sort puts the nulls first in either direction, so each column is preceded by its (largest first) null flag
+        by, reverse = [], []
+        for col, ascending in zip(self.sort_by, self._get_ascending()):
+            by.extend([pl.col(col).is_null(), pl.col(col)])
+            reverse.extend([False, ascending])
+        if self.group_by is None:
+            return self._sort(df.top_k(self.n, by=by, reverse=reverse))
+        columns = [col for col in df.columns if col not in self.group_by]
+        result = df.group_by(self.group_by, maintain_order=True).agg(
+            pl.col(columns).top_k_by(by, k=self.n, reverse=reverse)
+        ).explode(columns)
+        return self._sort(result.select(df.columns))
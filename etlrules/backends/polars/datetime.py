@@ -139,110 +139,31 @@ DT_TIMEDELTA_UNITS = set(["weeks", "days", "hours", "minutes", "seconds", "milli
 def is_scalar(offset):
     return isinstance(offset, (int, float))
 
-FOLL_MONDAY_ADJ_WEEKEND_OFFSETS = {0: None, 1: None, 2: None, 3: None, 4: None, 5: 2, 6: 1}
-PREV_FRIDAY_ADJ_WEEKEND_OFFSETS = {0: None, 1: None, 2: None, 3: None, 4: None, 5: -1, 6: -2}
-def dt_adjust_weekends(dt_col, offset, strict=True):
-    weekdays = dt_col.dt.weekday().cast(pl.Int64) - 1
-    if not is_scalar(offset):
-        offset = offset.cast(pl.Int64).fill_null(0)
-        # -1 -> 0 | 0, 1 -> 3
-        offset = ((offset // offset.replace({0: 1}).abs() + 1) // 2) * 3
-        dt_col_weekend_offset = weekdays.replace(FOLL_MONDAY_ADJ_WEEKEND_OFFSETS) - offset
-    else:
-        dt_col_weekend_offset = weekdays.replace(FOLL_MONDAY_ADJ_WEEKEND_OFFSETS if offset < 0 else PREV_FRIDAY_ADJ_WEEKEND_OFFSETS)
-    dt_col_weekend_offset = dt_col_weekend_offset.fill_null(0)
-    return dt_col + pl.duration(days=dt_col_weekend_offset)
-
 
 def business_day_offset(dt_col, offset, strict=True):
     if not is_scalar(offset):
         offset = offset.cast(pl.Int64).fill_null(0)
-    else:
-        offset = offset or 0
-    dt_col2 = dt_adjust_weekends(dt_col, offset, strict=strict)
-    col = (dt_col2.dt.weekday().cast(pl.Int64) - 1).fill_null(0)
-    col2 =  col + offset
-    col3 = (
-        (col2 // 5) * 7 + col2.mod(5)
-    ) - col
-    return dt_col2 + pl.duration(days=col3)
+        # the weekend dates roll back to the previous friday when moving forward, or else to the next monday
+        return pl.when(offset > 0).then(
+            dt_col.dt.add_business_days(offset, roll="backward")
+        ).otherwise(
+            dt_col.dt.add_business_days(offset, roll="forward")
+        )
+    offset = int(offset or 0)
+    return dt_col.dt.add_business_days(offset, roll="backward" if offset >= 0 else "forward")
 
 
 def months_offset(dt_col, offset, strict=True):
+    # offset_by caps the day at the last day of the new month and handles the leap years natively
     if not is_scalar(offset):
-        offset = offset.fill_null(0)
-    else:
-        offset = offset or 0
-    offset = offset + dt_col.dt.month() - 1
-    year = dt_col.dt.year() + (offset // 12)
-
-    df = year.to_frame(name="year")
-    df = df.with_columns(
-        month=(
-            offset % 12
-        ) + 1,
-        day=dt_col.dt.day(),
-        hour=dt_col.dt.hour(),
-        minute=dt_col.dt.minute(),
-        second=dt_col.dt.second(),
-        microsecond=dt_col.dt.microsecond(),
-    )
-    df = df.with_columns(
-        max=df["month"].replace({
-            1: 31, 2: 29, 3: 31, 4: 30, 5: 31, 6: 30, 7: 31, 8: 31, 9: 30, 10: 31, 11: 30, 12: 31
-        }),
-    )
-    df = df.with_columns(
-        day=pl.when(df["day"] <= df["max"]).then(df["day"]).otherwise(df["max"])
-    )
-    df = df.with_columns(
-        day=pl.when((df["year"] % 4 != 0) & (df["month"] == 2) & (df["day"] == 29)).then(28).otherwise(df["day"])
-    )
-
-    df = df[["year", "month", "day", "hour", "minute", "second", "microsecond"]]
-    return to_datetime(df)
-
-
-def to_datetime(df):
-    return pl.concat_str(
-        df["year"].cast(pl.Utf8),
-        pl.lit("-"),
-        df["month"].cast(pl.Utf8).str.pad_start(2, '0'),
-        pl.lit("-"),
-        df["day"].cast(pl.Utf8).str.pad_start(2, '0'),
-        pl.lit(" "),
-        df["hour"].cast(pl.Utf8).str.pad_start(2, '0'),
-        pl.lit(":"),
-        df["minute"].cast(pl.Utf8).str.pad_start(2, '0'),
-        pl.lit(":"),
-        df["second"].cast(pl.Utf8).str.pad_start(2, '0'),
-        pl.lit("."),
-        df["microsecond"].cast(pl.Utf8).str.pad_start(6, '0'),
-    ).str.to_datetime(format="%Y-%m-%d %H:%M:%S%.6f", time_unit="us", ambiguous="latest")
+        return dt_col.dt.offset_by(pl.format("{}mo", offset.cast(pl.Int64).fill_null(0)))
+    return dt_col.dt.offset_by(f"{int(offset or 0)}mo")
 
 
 def years_offset(dt_col, offset, strict=True):
     if not is_scalar(offset):
-        offset = offset.fill_null(0)
-    else:
-        offset = offset or 0
-
-    year = dt_col.dt.year() + offset
-
-    df = year.to_frame(name="year")
-    df = df.with_columns(
-        month=dt_col.dt.month(),
-        day=dt_col.dt.day(),
-        hour=dt_col.dt.hour(),
-        minute=dt_col.dt.minute(),
-        second=dt_col.dt.second(),
-        microsecond=dt_col.dt.microsecond(),
-    )
-    df = df.with_columns(
-        day=pl.when((df["year"] % 4 != 0) & (df["month"] == 2) & (df["day"] == 29)).then(28).otherwise(df["day"])
-    )
-    df = df[["year", "month", "day", "hour", "minute", "second", "microsecond"]]
-    return to_datetime(df)
+        return dt_col.dt.offset_by(pl.format("{}y", offset.cast(pl.Int64).fill_null(0)))
+    return dt_col.dt.offset_by(f"{int(offset or 0)}y")
 
 
 def add_sub_col(df, col, unit_value, unit, sign, input_column, strict=True):
@@ -2,35 +2,48 @@ import polars as pl
 
 from etlrules.backends.common.io.db import (
     ReadSQLQueryRule as ReadSQLQueryRuleBase,
+    SQLLookupJoinRule as SQLLookupJoinRuleBase,
     WriteSQLTableRule as WriteSQLTableRuleBase,
 )
+from etlrules.backends.polars.joins import InnerJoinRule, LeftJoinRule
 from etlrules.backends.polars.types import MAP_TYPES
-from etlrules.exceptions import SQLError
 
 
 class ReadSQLQueryRule(ReadSQLQueryRuleBase):
-    def _do_apply(self, connection):
+    def _do_apply(self, connection, sql_query, params):
         if self.column_types is not None:
             column_types = {col: MAP_TYPES[col_type] for col, col_type in self.column_types.items()}
         else:
             column_types = None
         return pl.read_database(
-            self._get_sql_query(),
+            sql_query,
             connection,
             schema_overrides=column_types,
+            execute_options={"parameters": params} if params else None,
         )
 
+    def _get_column_max(self, df, column):
+        return df[column].max()
+
 
 class WriteSQLTableRule(WriteSQLTableRuleBase):
-    def apply(self, data):
-        super().apply(data)
-        df = self._get_input_df(data)
-        import sqlalchemy as sa
-        try:
-            df.write_database(
-                self._get_sql_table(),
-                self._get_sql_engine(),
-                if_table_exists=self.if_exists
-            )
-        except sa.exc.SQLAlchemyError as exc:
-            raise SQLError(str(exc))
+    def _write_table(self, connection, df, sql_table, if_exists, schema=None):
+        df.write_database(
+            f"{schema}.{sql_table}" if schema else sql_table,
+            connection,
+            if_table_exists=if_exists
+        )
+
+
+class SQLLookupJoinRule(SQLLookupJoinRuleBase):
+
+    JOIN_RULES = {"left": LeftJoinRule, "inner": InnerJoinRule}
+
+    def _get_distinct_keys(self, df):
+        return df.select(self.key_columns).drop_nulls().unique().rows()
+
+    def _create_lookup_df(self, df, columns, rows):
+        lookup_df = pl.DataFrame(rows, schema=columns, orient="row")
+        return lookup_df.with_columns([
+            pl.col(lookup_col).cast(df.schema[col]) for col, lookup_col in zip(self.key_columns, self._get_lookup_key_columns())
+        ])
@@ -1,79 +1,167 @@
+import lzma
 import os
 import polars as pl
+import pyarrow as pa
+import shutil
 import zipfile
+from typing import Optional
 
 from etlrules.exceptions import MissingColumnError
 
+from etlrules.backends.common.base import SpillMixin
 from etlrules.backends.common.io.files import (
     ReadCSVFileRule as ReadCSVFileRuleBase,
+    ReadJSONLinesFileRule as ReadJSONLinesFileRuleBase,
     ReadParquetFileRule as ReadParquetFileRuleBase,
     WriteCSVFileRule as WriteCSVFileRuleBase,
+    WriteJSONLinesFileRule as WriteJSONLinesFileRuleBase,
     WriteParquetFileRule as WriteParquetFileRuleBase,
 )
+from etlrules.backends.polars.types import MAP_TYPES
 
 
-COMPRESSION_MAP = {
-    'zip': zipfile.ZIP_DEFLATED,
-    'gzip': zipfile.ZIP_DEFLATED,
-    'bz2': zipfile.ZIP_BZIP2,
-    'xz': zipfile.ZIP_LZMA,
-}
-
 COMPRESSION_EXT = {
     '.zip': 'zip',
     '.gz': 'gzip',
     '.bz2': 'bz2',
     '.xz': 'xz',
+    '.zst': 'zstd',
 }
 
-class ReadCSVFileRule(ReadCSVFileRuleBase):
+# the size of the chunks copied from a decompression stream
+DECOMPRESS_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def open_compressed_stream(file_path: str, compression: str, mode: str):
+    """ Opens a (de)compression stream over a file, using the pyarrow native codecs where available. """
+    if compression == 'xz':
+        return lzma.open(file_path, mode + 'b')
+    if mode == 'r':
+        return pa.input_stream(file_path, compression=compression)
+    return pa.output_stream(file_path, compression=compression)
+
+
+class ReadFileMixin:
+    def do_concat(self, left_df: pl.DataFrame, right_df: pl.DataFrame) -> pl.DataFrame:
+        return left_df.vstack(right_df, in_place=False)
+
+    def do_empty(self, df: pl.DataFrame) -> pl.DataFrame:
+        return df[:0]
+
+
+class ReadCSVFileRule(ReadFileMixin, ReadCSVFileRuleBase, SpillMixin):
+
+    def _read_csv(self, source, n_rows: Optional[int]=None) -> pl.DataFrame:
+        return pl.read_csv(
+            source, separator=self.separator, has_header=self.header,
+            skip_rows=self.skip_header_rows or 0, n_rows=n_rows
+        )
+
+    def _read_csv_stream(self, stream) -> pl.DataFrame:
+        # the stream is decompressed in chunks into a temporary file, which polars then reads (memory mapped)
+        with self._spill_dir("csv_decompress") as spill_dir:
+            path = os.path.join(spill_dir, "data.csv")
+            with open(path, 'wb') as f:
+                shutil.copyfileobj(stream, f, DECOMPRESS_CHUNK_SIZE)
+            return self._read_csv(path)
 
     def do_read(self, file_path: str) -> pl.DataFrame:
         _, ext = os.path.splitext(file_path)
         compression = COMPRESSION_EXT.get(ext)
-        if compression is not None:
-            with zipfile.ZipFile(file_path, 'r', compression=COMPRESSION_MAP[compression]) as zarch:
-                arch_files = zarch.namelist()
-                if len(arch_files) != 1:
-                    raise RuntimeError(f"One a single csv file can be read from an archive. {file_path} has {len(arch_files)} files.")
-                with zarch.open(arch_files[0]) as zf:
-                    return pl.read_csv(
-                        zf, separator=self.separator, has_header=self.header,
-                        skip_rows=self.skip_header_rows or 0
-                    )
-        return pl.read_csv(
-            file_path, separator=self.separator, has_header=self.header,
-            skip_rows=self.skip_header_rows or 0
-        )
+        # the local files include the URIs already downloaded by the http cache
+        if compression is not None and self._is_local_path(file_path):
+            if zipfile.is_zipfile(file_path):
+                with zipfile.ZipFile(file_path, 'r') as zarch:
+                    arch_files = zarch.namelist()
+                    if len(arch_files) != 1:
+                        raise RuntimeError(f"One a single csv file can be read from an archive. {file_path} has {len(arch_files)} files.")
+                    with zarch.open(arch_files[0]) as zf:
+                        return self._read_csv_stream(zf)
+            # polars would decompress the gzip/zstd files whole in memory, all the compressions are streamed instead
+            with open_compressed_stream(file_path, compression, 'r') as f:
+                return self._read_csv_stream(f)
+        return self._read_csv(file_path)
+
+    def do_read_empty(self, file_path: str) -> pl.DataFrame:
+        _, ext = os.path.splitext(file_path)
+        if COMPRESSION_EXT.get(ext) is not None:
+            return super().do_read_empty(file_path)
+        return self.do_empty(self._read_csv(file_path, n_rows=self.EMPTY_RESULT_SAMPLE_ROWS))
+
+    def do_cache_load(self, cache_path: str) -> pl.DataFrame:
+        return pl.read_ipc(cache_path)
+
+    def do_cache_store(self, df: pl.DataFrame, cache_path: str) -> None:
+        df.write_ipc(cache_path)
+
 
+class ReadJSONLinesFileRule(ReadFileMixin, ReadJSONLinesFileRuleBase):
+    def do_read(self, file_path: str) -> pl.DataFrame:
+        schema_overrides = None
+        if self.column_types:
+            schema_overrides = {col: MAP_TYPES[col_type] for col, col_type in self.column_types.items()}
+        if not self._is_local_path(file_path):
+            return pl.read_ndjson(file_path, schema_overrides=schema_overrides)
+        return pl.scan_ndjson(file_path, schema_overrides=schema_overrides).collect()
+
+    def do_read_empty(self, file_path: str) -> pl.DataFrame:
+        schema_overrides = None
+        if self.column_types:
+            schema_overrides = {col: MAP_TYPES[col_type] for col, col_type in self.column_types.items()}
+        return self.do_empty(pl.scan_ndjson(file_path, schema_overrides=schema_overrides, n_rows=self.EMPTY_RESULT_SAMPLE_ROWS).collect())
 
-class ReadParquetFileRule(ReadParquetFileRuleBase):
+
+class ReadParquetFileRule(ReadFileMixin, ReadParquetFileRuleBase):
     def do_read(self, file_path: str) -> pl.DataFrame:
         from pyarrow.lib import ArrowInvalid
         try:
             return pl.read_parquet(
                 file_path, use_pyarrow=True, columns=self.columns,
                 pyarrow_options={
-                    "filters": self.filters
+                    "filters": self._get_read_filters()
                 }
             )
         except ArrowInvalid as exc:
             raise MissingColumnError(str(exc))
 
+    def do_read_empty(self, file_path: str) -> pl.DataFrame:
+        # only the schema is read from the parquet metadata
+        df = pl.DataFrame(schema=pl.read_parquet_schema(file_path))
+        if self.columns:
+            try:
+                df = df.select(self.columns)
+            except pl.exceptions.ColumnNotFoundError as exc:
+                raise MissingColumnError(str(exc))
+        return df
+
 
 class WriteCSVFileRule(WriteCSVFileRuleBase):
 
+    COMPRESSIONS = dict(WriteCSVFileRuleBase.COMPRESSIONS, zstd='.zst')
+
+    CHUNK_SIZE = 100_000
+
+    def _write_chunks(self, f, df: pl.DataFrame) -> None:
+        # stream the csv in chunks through the compressor rather than materializing it all in memory
+        for idx, df_slice in enumerate(df.iter_slices(self.CHUNK_SIZE)):
+            f.write(df_slice.write_csv(
+                separator=self.separator,
+                include_header=self.header and idx == 0,
+            ).encode())
+        if self.header and df.is_empty():
+            f.write(df.write_csv(separator=self.separator, include_header=True).encode())
+
     def do_write(self, file_name: str, file_dir: str, df: pl.DataFrame) -> None:
         file_path = os.path.join(file_dir, file_name)
-        if self.compression is not None:
+        if self.compression == 'zip':
             fname, _ = os.path.splitext(file_name)
             fname_csv = fname + ".csv"
-            with zipfile.ZipFile(file_path, 'w', compression=COMPRESSION_MAP[self.compression]) as zarch:
+            with zipfile.ZipFile(file_path, 'w', compression=zipfile.ZIP_DEFLATED) as zarch:
                 with zarch.open(fname_csv, "w") as zf:
-                    df.write_csv(zf,
-                        separator=self.separator,
-                        include_header=self.header,
-                    )
+                    self._write_chunks(zf, df)
+        elif self.compression is not None:
+            with open_compressed_stream(file_path, self.compression, 'w') as f:
+                self._write_chunks(f, df)
         else:
             df.write_csv(file_path,
                 separator=self.separator,
@@ -89,3 +177,11 @@ class WriteParquetFileRule(WriteParquetFileRuleBase):
             use_pyarrow=True,
             compression=self.compression or "uncompressed",
         )
+
+
+class WriteJSONLinesFileRule(WriteJSONLinesFileRuleBase):
+
+    def do_write(self, file_name: str, file_dir: str, df: pl.DataFrame) -> None:
+        with open(os.path.join(file_dir, file_name), "wb") as f:
+            for df_slice in df.iter_slices(self.chunk_size):
+                df_slice.write_ndjson(f)
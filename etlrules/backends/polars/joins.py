@@ -1,6 +1,10 @@
 import polars as pl
 
 from etlrules.backends.common.joins import (
+    AsOfJoinRule as AsOfJoinRuleBase,
+    SemiJoinRule as SemiJoinRuleBase,
+    AntiJoinRule as AntiJoinRuleBase,
+    BuildJoinIndexRule as BuildJoinIndexRuleBase,
     LeftJoinRule as LeftJoinRuleBase,
     RightJoinRule as RightJoinRuleBase,
     InnerJoinRule as InnerJoinRuleBase,
@@ -8,42 +12,81 @@ from etlrules.backends.common.joins import (
 )
 
 
-class JoinsMixin():
+class BuildJoinIndexRule(BuildJoinIndexRuleBase):
+    def do_build_index(self, df):
+        # polars doesn't expose reusable hash tables, rechunking avoids doing it on every join
+        return df.rechunk()
+
+
+class KeyValuesMixin():
+    def _get_key_values(self, df, column):
+        return df[column].drop_nulls().unique().to_list()
+
+    def _has_null_keys(self, df, column):
+        return df[column].null_count() > 0
+
+
+class JoinsMixin(KeyValuesMixin):
 
     JOIN_TYPE_MAP = {
         "outer": "full",
     }
 
-    def do_apply(self, left_df, right_df):
-        return self.do_join(left_df, right_df, self.suffixes)
+    RIGHT_KEY_SUFFIX = "__etlrules_right_key__"
 
-    def do_join(self, left_df, right_df, suffixes):
+    def do_apply(self, left_df, right_df):
+        if self._get_strategy() == self.STRATEGY_MERGE:
+            left_df, right_df = self._set_sorted(left_df, right_df)
+        left_on, right_on = self._get_key_columns()
+        return self.do_join(left_df, right_df, left_on, right_on, self.suffixes)
+
+    def _get_strategy(self):
+        # polars picks the smaller side as the build side of inner hash joins by itself
+        left_on, _ = self._get_key_columns()
+        strategy = self.strategy
+        if strategy is None and self.sorted_input:
+            strategy = self.STRATEGY_MERGE
+        if strategy != self.STRATEGY_MERGE or len(left_on) > 1:
+            strategy = self.STRATEGY_HASH
+        self._log_strategy(strategy)
+        return strategy
+
+    def _set_sorted(self, left_df, right_df):
+        # polars does a merge join when the keys on both sides are flagged as sorted
         left_on, right_on = self._get_key_columns()
+        left_key, right_key = left_df[left_on[0]], right_df[right_on[0]]
+        if left_key.null_count() == 0 and right_key.null_count() == 0 and left_key.is_sorted() and right_key.is_sorted():
+            return left_df.with_columns(pl.col(left_on[0]).set_sorted()), right_df.with_columns(pl.col(right_on[0]).set_sorted())
+        if self.strict:
+            self._raise_not_sorted()
+        return left_df, right_df
+
+    def do_join(self, left_df, right_df, left_on, right_on, suffixes):
+        # suffix the common columns upfront and keep both sets of keys to replicate the pandas behavior
+        # the keys with the same name on both sides are merged into one column, the rest are kept as they are
+        merged_keys = [left for left, right in zip(left_on, right_on) if left == right]
+        common_cols = [col for col in left_df.columns if col in right_df.columns and col not in merged_keys]
         suffix_left, suffix_right = suffixes
-        common_cols = [col for col in left_df.columns if col in right_df.columns]
+        if suffix_left:
+            left_renames = {col: col + suffix_left for col in common_cols}
+            left_df = left_df.rename(left_renames)
+            left_on = [left_renames.get(col, col) for col in left_on]
+        if suffix_right:
+            right_renames = {col: col + suffix_right for col in common_cols}
+            right_df = right_df.rename(right_renames)
+            right_on = [right_renames.get(col, col) for col in right_on]
         df = left_df.join(
             right_df,
             how=self.JOIN_TYPE_MAP.get(self.JOIN_TYPE, self.JOIN_TYPE),
             left_on=left_on,
             right_on=right_on,
-            suffix=suffix_right or "_right"
+            suffix=self.RIGHT_KEY_SUFFIX,
+            coalesce=False,
         )
-        if suffix_left:
-            df = df.rename(
-                {col: col + suffix_left for col in common_cols if col not in left_on}
-            )
-        if not suffix_right:
-            df = df.rename({
-                col + "_right": col for col in common_cols if col not in right_on
-            })
-        else:
-            # polars doesn't create suffixes for keys in the right_on (when they dont match the left_on keys)
-            # pandas does, so replicating that behavior
-            right_only = {right: left for right, left in zip(right_on, left_on) if right != left}
-            if right_only:
-                df = df.with_columns(
-                    *[df[left].alias(right + suffix_right) for right, left in right_only.items()]
-                )
+        if merged_keys:
+            df = df.with_columns(
+                *[pl.coalesce(col, col + self.RIGHT_KEY_SUFFIX).alias(col) for col in merged_keys]
+            ).drop(*[col + self.RIGHT_KEY_SUFFIX for col in merged_keys])
         return df
 
 
@@ -58,26 +101,46 @@ class InnerJoinRule(JoinsMixin, InnerJoinRuleBase):
 class OuterJoinRule(JoinsMixin, OuterJoinRuleBase):
     JOIN_TYPE = "outer"
 
+
+class RightJoinRule(JoinsMixin, RightJoinRuleBase):
+    JOIN_TYPE = "right"
+
+
+class AsOfJoinRule(AsOfJoinRuleBase):
     def do_apply(self, left_df, right_df):
-        df = super().do_apply(left_df, right_df)
-        # polars creates two set of columns for the keys
-        # they need to be merged to replicate pandas behavior
         left_on, right_on = self._get_key_columns()
-        common_keys = [left for left in left_on if left in right_on]
-        if common_keys:
-            suffix_left, suffix_right = self.suffixes
-            suffix_left = suffix_left or ""
-            suffix_right = suffix_right or "_right"
-            df = df.with_columns(
-                *[pl.col(col).fill_null(pl.col(col + suffix_right)) for col in common_keys]
-            )
-            df = df.drop(*[col + suffix_right for col in common_keys])
-        return df
+        by_left, by_right = self._get_by_columns()
+        if not self.sorted_input:
+            left_df = left_df.sort(left_on, maintain_order=True)
+            right_df = right_df.sort(right_on, maintain_order=True)
+        # suffix the common columns upfront to replicate the pandas behavior
+        merged_cols = {left for left, right in zip([left_on, *(by_left or ())], [right_on, *(by_right or ())]) if left == right}
+        common_cols = [col for col in left_df.columns if col in right_df.columns and col not in merged_cols]
+        suffix_left, suffix_right = self.suffixes
+        if suffix_left:
+            left_df = left_df.rename({col: col + suffix_left for col in common_cols})
+        if suffix_right:
+            right_df = right_df.rename({col: col + suffix_right for col in common_cols})
+        return left_df.join_asof(
+            right_df,
+            left_on=left_on,
+            right_on=right_on,
+            by_left=by_left,
+            by_right=by_right,
+            strategy=self.direction,
+            tolerance=self.tolerance,
+        )
 
 
-class RightJoinRule(JoinsMixin, RightJoinRuleBase):
-    JOIN_TYPE = "left"
-
+class SemiJoinMixin(KeyValuesMixin):
     def do_apply(self, left_df, right_df):
-        suffixes = reversed(self.suffixes)
-        return super().do_join(right_df, left_df, suffixes)
+        left_on, right_on = self._get_key_columns()
+        return left_df.join(right_df.select(right_on), how=self.JOIN_TYPE, left_on=left_on, right_on=right_on)
+
+
+class SemiJoinRule(SemiJoinMixin, SemiJoinRuleBase):
+    JOIN_TYPE = "semi"
+
+
+class AntiJoinRule(SemiJoinMixin, AntiJoinRuleBase):
+    JOIN_TYPE = "anti"
@@ -0,0 +1,52 @@
+import polars as pl
+
+from etlrules.backends.common.window import WindowRule as WindowRuleBase
+
+
+class WindowRule(WindowRuleBase):
+
+    ROW_INDEX = "__etlrules_row_index__"
+    RANK_METHODS_MAP = {"first": "ordinal"}
+
+    def _get_expr(self, window):
+        function = window["function"]
+        col = pl.col(window["column"]) if window.get("column") else None
+        if function == "cumsum":
+            return col.cum_sum()
+        elif function == "cummin":
+            return col.cum_min()
+        elif function == "cummax":
+            return col.cum_max()
+        elif function == "cumcount":
+            return pl.int_range(pl.len(), dtype=pl.Int64)
+        elif function == "rank":
+            method = window.get("method", "average")
+            return col.rank(method=self.RANK_METHODS_MAP.get(method, method), descending=window.get("descending", False)).cast(pl.Float64)
+        elif function in ("lag", "lead"):
+            offset = window.get("offset", 1)
+            return col.shift(offset if function == "lag" else -offset)
+        window_size, min_periods = window["window"], window.get("min_periods", 1)
+        if isinstance(window_size, str):
+            # time based windows, over the order_by column
+            # rolling_*_by doesn't support nulls, so the nulls are summed as 0 and the windows masked by their count of values
+            by = self.order_by[0]
+            total = col.fill_null(0).rolling_sum_by(by, window_size)
+            count = col.is_not_null().cast(pl.Int64).rolling_sum_by(by, window_size)
+            if function == "rolling_sum":
+                return pl.when(count >= min_periods).then(total)
+            return pl.when(count >= max(min_periods, 1)).then(total / count)
+        if function == "rolling_sum":
+            return col.rolling_sum(window_size, min_periods=min_periods)
+        return col.rolling_mean(window_size, min_periods=min_periods)
+
+    def do_apply(self, df):
+        exprs = []
+        for output_column, window in self.windows.items():
+            expr = self._get_expr(window)
+            if self.partition_by:
+                expr = expr.over(self.partition_by)
+            exprs.append(expr.alias(output_column))
+        if not self.order_by:
+            return df.with_columns(exprs)
+        result = df.with_row_index(self.ROW_INDEX).sort(self.order_by, descending=not self.ascending, nulls_last=True, maintain_order=True)
+        return result.with_columns(exprs).sort(self.ROW_INDEX).drop(self.ROW_INDEX)
@@ -1,5 +1,6 @@
 from contextlib import contextmanager
-from typing import Generator, Mapping, Optional, Union
+from contextvars import ContextVar
+from typing import Any, Callable, Generator, Mapping, Optional, Sequence, Union
 
 
 class RuleData:
@@ -77,3 +78,58 @@ class Context:
 
 
 context = Context()
+
+
+class DynamicFilters:
+    """ The filters computed at run time by the engine for the rule which is about to read data.
+
+    The filters are a list of (column, op, value) tuples which must all be true for a row to be read.
+    The rules reading data (e.g. parquet files, sql queries) apply them in addition to their own filters.
+    """
+
+    def __init__(self):
+        self._filters = ContextVar("etlrules_dynamic_filters", default=None)
+
+    @contextmanager
+    def set(self, filters: Sequence[tuple[str, str, Any]]) -> Generator[list[tuple[str, str, Any]], None, None]:
+        token = self._filters.set([tuple(flt) for flt in filters])
+        try:
+            yield self._filters.get()
+        finally:
+            self._filters.reset(token)
+
+    def get(self) -> Optional[list[tuple[str, str, Any]]]:
+        return self._filters.get()
+
+
+dynamic_filters = DynamicFilters()
+
+
+class StateCommits:
+    """ The state saves (e.g. watermarks, manifests) registered by the rules during a run.
+
+    The engine collects the saves while running a plan and commits them only after the whole run succeeded
+    (including the pending writes), so a failed run is retried from the previous state. Outside of a run
+    (e.g. a rule applied on its own), the saves are committed straight away.
+    """
+
+    def __init__(self):
+        self._pending = ContextVar("etlrules_state_commits", default=None)
+
+    @contextmanager
+    def collect(self) -> Generator[list[Callable[[], None]], None, None]:
+        token = self._pending.set([])
+        try:
+            yield self._pending.get()
+        finally:
+            self._pending.reset(token)
+
+    def add(self, commit: Callable[[], None]) -> None:
+        pending = self._pending.get()
+        if pending is None:
+            commit()
+        else:
+            pending.append(commit)
+
+
+state_commits = StateCommits()
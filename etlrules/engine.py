@@ -1,9 +1,70 @@
 import graphlib
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional, Tuple, Union
 
-from .data import RuleData, context
+from .data import RuleData, context, dynamic_filters, state_commits
 from .exceptions import GraphRuntimeError, InvalidPlanError
 from .plan import PlanMode, Plan
+from .rule import BaseRule
+
+
+logger = logging.getLogger(__name__)
+
+
+class SinkWriterPool:
+    """ Applies the rules which write data out of the plan (ie rules with no output) on background threads.
+
+    At most max_workers writes run at the same time. Submitting a write while all the workers are busy
+    blocks until one of the writes completes, which bounds the number of dataframes held by pending writes.
+    """
+
+    def __init__(self, max_workers: int):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="etlrules_sink")
+        self.slots = threading.BoundedSemaphore(max_workers)
+        self.futures = []
+
+    def _raise_if_failed(self) -> None:
+        for future in self.futures:
+            if future.done() and future.exception() is not None:
+                raise future.exception()
+
+    def _shallow_copy(self, df):
+        # polars dataframes cannot be used from two threads at the same time,
+        # so the writer gets its own (cheap, shallow) copy of the dataframe
+        clone = getattr(df, "clone", None)
+        return clone() if callable(clone) else df
+
+    def submit(self, rule: BaseRule, data: RuleData) -> None:
+        """ Schedules the rule to be applied on a snapshot of the data's current dataframes. """
+        self._raise_if_failed()
+        main_output = data.get_main_output()
+        snapshot = RuleData(
+            main_input=self._shallow_copy(main_output) if main_output is not None else None,
+            named_inputs={name: self._shallow_copy(df) for name, df in data.get_named_outputs()},
+            context=data.get_context(), strict=data.strict
+        )
+        self.slots.acquire()
+        try:
+            future = self.executor.submit(rule.apply, snapshot)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(self._release_slot)
+        self.futures.append(future)
+
+    def _release_slot(self, future: Future) -> None:
+        self.slots.release()
+
+    def join(self) -> None:
+        """ Waits for all the pending writes and raises the error of the first failed write, if any. """
+        self.executor.shutdown(wait=True)
+        errors = [future.exception() for future in self.futures if future.exception() is not None]
+        for error in errors[1:]:
+            logger.error("Sink write failed: %r", error)
+        if errors:
+            raise errors[0]
 
 
 class RuleEngine:
@@ -21,8 +82,28 @@ class RuleEngine:
     At the end of a plan run, the RuleData instance passed in will contain the results of the run
     (ie new dataframes/transformed dataframes) which can be inspected/operated on outside of the
     rule engine.
+
+    The rules which write data out of the plan (e.g. files, databases) can be run asynchronously by setting
+    async_sink_workers in the context to the number of background writers. The engine hands the dataframes
+    to be written to the background writers and continues running the rest of the plan, waiting for all
+    the pending writes to complete (and raising their errors, if any) before the run returns.
+    The rules after a write must not modify the written dataframe in place while the write is pending.
+
+    The rules extracting data incrementally (e.g. watermarks, file manifests) register the saving of their state
+    with the engine, which saves it only after the whole run succeeded, so a failed run is retried from the previous state.
+
+    In graph mode, setting dynamic_filters to True in the context enables the pushdown of join keys into the rules
+    reading data (parquet files and sql queries). When the output of such a rule is only used by an inner join or a
+    semi join, the engine holds the read back until the other side of the join is available and passes its distinct
+    key values (or their min/max range when there are too many) to the read as filters, so only the rows which can
+    match are read. The reads are never held back when nothing else in the graph can progress. The incremental reads
+    (ie with a watermark_column or an incremental_state_file) are never filtered, as their state would advance past the
+    rows which were filtered out.
     """
 
+    ASYNC_SINK_WORKERS = "async_sink_workers"
+    DYNAMIC_FILTERS = "dynamic_filters"
+
     def __init__(self, plan: Plan):
         assert isinstance(plan, Plan)
         self.plan = plan
@@ -33,10 +114,44 @@ class RuleEngine:
         context.update(data.get_context())
         return context
 
+    def _get_sink_pool(self, ctx: dict) -> Optional[SinkWriterPool]:
+        workers = int(ctx.get(self.ASYNC_SINK_WORKERS) or 0)
+        return SinkWriterPool(workers) if workers > 0 else None
+
+    def _apply_rule(self, rule: BaseRule, data: RuleData, sink_pool: Optional[SinkWriterPool]) -> None:
+        if sink_pool is not None and not rule.has_output():
+            sink_pool.submit(rule, data)
+        else:
+            rule.apply(data)
+
+    def _join_sink_pool(self, sink_pool: Optional[SinkWriterPool], failed: bool) -> None:
+        if sink_pool is None:
+            return
+        try:
+            sink_pool.join()
+        except Exception:
+            if not failed:
+                raise
+            # the error which stopped the run takes precedence
+            logger.exception("Sink write failed.")
+
+    def _commit_states(self, commits: list) -> None:
+        # the state of the incremental rules (watermarks, manifests, etc.) is saved only once the run succeeded
+        for commit in commits:
+            commit()
+
     def run_pipeline(self, data: RuleData) -> RuleData:
-        with context.set(self._get_context(data)):
-            for rule in self.plan:
-                rule.apply(data)
+        ctx = self._get_context(data)
+        sink_pool = self._get_sink_pool(ctx)
+        failed = True
+        with context.set(ctx), state_commits.collect() as commits:
+            try:
+                for rule in self.plan:
+                    self._apply_rule(rule, data, sink_pool)
+                failed = False
+            finally:
+                self._join_sink_pool(sink_pool, failed)
+            self._commit_states(commits)
         return data
 
     def _get_topological_sorter(self, data: RuleData) -> graphlib.TopologicalSorter:
@@ -76,15 +191,77 @@ class RuleEngine:
                 g.add(idx)
         return g
 
+    def _supports_dynamic_filters(self, rule: BaseRule) -> bool:
+        if not getattr(rule, "SUPPORTS_DYNAMIC_FILTERS", False):
+            return False
+        # the incremental reads would record the rows (or files) filtered out as read and never read them again
+        return not (getattr(rule, "watermark_column", None) or getattr(rule, "incremental_state_file", None))
+
+    def _get_dynamic_filters_joins(self) -> dict[int, BaseRule]:
+        # the rules reading data whose output is only used by a join which can filter it, by rule index
+        consumers = {}
+        for rule in self.plan:
+            if rule.has_input():
+                for named_input in set(rule.get_all_named_inputs()):
+                    consumers.setdefault(named_input, []).append(rule)
+        joins = {}
+        for idx, rule in enumerate(self.plan):
+            if not self._supports_dynamic_filters(rule):
+                continue
+            rule_consumers = consumers.get(rule.named_output, [])
+            if len(rule_consumers) != 1:
+                continue
+            get_source = getattr(rule_consumers[0], "get_dynamic_filters_source", None)
+            if get_source is not None and get_source(rule.named_output) is not None:
+                joins[idx] = rule_consumers[0]
+        return joins
+
+    def _has_named_output(self, data: RuleData, name: str) -> bool:
+        return any(named_output == name for named_output, _ in data.get_named_outputs())
+
+    def _is_waiting_for_filters(self, rule_idx: int, data: RuleData, joins: dict[int, BaseRule]) -> bool:
+        join = joins.get(rule_idx)
+        if join is None:
+            return False
+        source = join.get_dynamic_filters_source(self.plan.get_rule(rule_idx).named_output)
+        return not self._has_named_output(data, source)
+
+    def _apply_graph_rule(self, rule_idx: int, data: RuleData, sink_pool: Optional[SinkWriterPool], joins: dict[int, BaseRule]) -> None:
+        rule = self.plan.get_rule(rule_idx)
+        join = joins.get(rule_idx)
+        if join is None or self._is_waiting_for_filters(rule_idx, data, joins):
+            self._apply_rule(rule, data, sink_pool)
+            return
+        filters = join.get_dynamic_filters(data, rule.named_output)
+        logger.info("Dynamic filters for rule %s/(name=%s): %s", rule.__class__.__name__, rule.get_name(),
+                    [(column, op, f"{len(value)} values" if op == "in" else value) for column, op, value in filters])
+        with dynamic_filters.set(filters):
+            self._apply_rule(rule, data, sink_pool)
+
     def run_graph(self, data: RuleData) -> RuleData:
         g = self._get_topological_sorter(data)
         g.prepare()
-        with context.set(self._get_context(data)):
-            while g.is_active():
-                for rule_idx in g.get_ready():
-                    rule = self.plan.get_rule(rule_idx)
-                    rule.apply(data)
-                    g.done(rule_idx)
+        ctx = self._get_context(data)
+        sink_pool = self._get_sink_pool(ctx)
+        joins = self._get_dynamic_filters_joins() if ctx.get(self.DYNAMIC_FILTERS) else {}
+        failed = True
+        with context.set(ctx), state_commits.collect() as commits:
+            try:
+                pending = []
+                while g.is_active():
+                    pending.extend(g.get_ready())
+                    ready = [rule_idx for rule_idx in pending if not self._is_waiting_for_filters(rule_idx, data, joins)]
+                    if not ready:
+                        # only reads waiting for the other side of their joins are left, run one to make progress
+                        ready = pending[:1]
+                    for rule_idx in ready:
+                        pending.remove(rule_idx)
+                        self._apply_graph_rule(rule_idx, data, sink_pool, joins)
+                        g.done(rule_idx)
+                failed = False
+            finally:
+                self._join_sink_pool(sink_pool, failed)
+            self._commit_states(commits)
         return data
 
     def validate_pipeline(self, data: RuleData) -> Tuple[bool, Optional[str]]:
@@ -5,6 +5,7 @@ import shutil
 import tempfile
 from typing import Any, Optional
 
+from .backends.common.io.db import SQLAlchemyEngines
 from .data import RuleData
 from .engine import RuleEngine
 from .plan import Plan
@@ -119,6 +120,7 @@ def run_plan(plan_file: str, backend: str) -> RuleData:
         engine = RuleEngine(plan)
         engine.run(data)
     finally:
+        SQLAlchemyEngines.dispose()
         if etlrules_tempdir_cleanup:
             shutil.rmtree(etlrules_tempdir)
 
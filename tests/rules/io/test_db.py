@@ -1,4 +1,5 @@
 import datetime
+import json
 import os
 import pytest
 try:
@@ -7,9 +8,11 @@ try:
 except ImportError:
     HAS_SQL_ALCHEMY = False
 
-from etlrules.data import context
-from etlrules.exceptions import SQLError, UnsupportedTypeError
+from etlrules.data import RuleData, context
+from etlrules.engine import RuleEngine
+from etlrules.exceptions import MissingColumnError, SQLError, UnsupportedTypeError
 from etlrules.backends.common.io.db import SQLAlchemyEngines
+from etlrules.plan import Plan
 
 from tests.utils.data import assert_frame_equal, get_test_data
 
@@ -191,3 +194,336 @@ def test_sql_engine_context_substitution(backend):
         assert rule._get_sql_engine() == "sqlite:///user=testUser&pswd=testPassword"
         rule = backend.rules.ReadSQLQueryRule("sqlite:///user={context.DB_USER}", f"SELECT * FROM MyTable", named_output="result")
         assert rule._get_sql_engine() == "sqlite:///user=testUser"
+
+
+@pytest.mark.skipif(not HAS_SQL_ALCHEMY, reason="sqlalchemy not installed.")
+def test_sql_engine_options_from_context(sqlite3_db, backend):
+    sql_engine = f"sqlite:///{sqlite3_db}"
+    engine_options = {
+        "sqlite:///{context.DB_FILE}": {"pool_size": 2, "max_overflow": 1, "pool_pre_ping": True, "pool_recycle": 60},
+    }
+    SQLAlchemyEngines.dispose(sql_engine)
+    try:
+        with context.set({"DB_FILE": sqlite3_db, "sql_engine_options": engine_options}):
+            with get_test_data(None, named_inputs={}, named_output="result") as data:
+                for idx in range(3):
+                    rule = backend.rules.ReadSQLQueryRule(sql_engine, "SELECT * FROM Author", named_output=f"result{idx}")
+                    rule.apply(data)
+        engine = SQLAlchemyEngines.get_engine(sql_engine)
+        assert engine.pool.size() == 2
+        assert engine.pool._max_overflow == 1
+        assert engine.pool._pre_ping
+        assert engine.pool._recycle == 60
+        stats = SQLAlchemyEngines.get_pool_stats(sql_engine)
+        assert stats["pool"] == "QueuePool"
+        assert stats["connections_created"] == 1
+        assert stats["checkouts"] == 3
+        assert stats["checkedout"] == 0
+    finally:
+        SQLAlchemyEngines.dispose(sql_engine)
+    assert SQLAlchemyEngines.get_pool_stats(sql_engine) == {}
+
+
+@pytest.mark.skipif(not HAS_SQL_ALCHEMY, reason="sqlalchemy not installed.")
+def test_sql_engine_options_unsupported(sqlite3_db, backend):
+    sql_engine = f"sqlite:///{sqlite3_db}"
+    with context.set({"sql_engine_options": {sql_engine: {"pool_sizes": 2}}}):
+        with get_test_data(None, named_inputs={}, named_output="result") as data:
+            rule = backend.rules.ReadSQLQueryRule(sql_engine, "SELECT * FROM Author", named_output="result")
+            with pytest.raises(ValueError) as exc:
+                rule.apply(data)
+            assert "Unsupported sql engine option(s): {'pool_sizes'}" in str(exc.value)
+
+
+@pytest.mark.skipif(not HAS_SQL_ALCHEMY, reason="sqlalchemy not installed.")
+def test_sql_engines_thread_safe_creation(sqlite3_db):
+    from concurrent.futures import ThreadPoolExecutor
+    sql_engine = f"sqlite:///{sqlite3_db}"
+    SQLAlchemyEngines.dispose(sql_engine)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            engines = list(executor.map(lambda _: SQLAlchemyEngines.get_engine(sql_engine), range(32)))
+        assert all(engine is engines[0] for engine in engines)
+    finally:
+        SQLAlchemyEngines.dispose(sql_engine)
+
+
+@pytest.mark.skipif(not HAS_SQL_ALCHEMY, reason="sqlalchemy not installed.")
+@pytest.mark.parametrize("input_df, input_astypes, sql_table, key_columns, expected", [
+    # existing table - updates some rows, inserts others
+    [[
+        {"Id": 2, "FirstName": "Johnny", "LastName": "McEwan"},
+        {"Id": 10, "FirstName": "Layla", "LastName": "Goodge"},
+    ], {"Id": "Int64", "FirstName": "string", "LastName": "string"}, "Author", ["Id"], [
+        {"Id": 1, "FirstName": "Mike", "LastName": "Good"},
+        {"Id": 2, "FirstName": "Johnny", "LastName": "McEwan"},
+        {"Id": 10, "FirstName": "Layla", "LastName": "Goodge"},
+    ]],
+
+    # existing table - only key columns
+    [[
+        {"Id": 2},
+        {"Id": 10},
+    ], {"Id": "Int64"}, "Author", ["Id"], [
+        {"Id": 1, "FirstName": "Mike", "LastName": "Good"},
+        {"Id": 2, "FirstName": "John", "LastName": "McEwan"},
+        {"Id": 10, "FirstName": None, "LastName": None},
+    ]],
+
+    # new table
+    [[
+        {"Id": 10, "FirstName": "Layla", "LastName": "Goodge"},
+        {"Id": 11, "FirstName": "Craig", "LastName": "David"},
+    ], {"Id": "Int64", "FirstName": "string", "LastName": "string"}, "Author2", ["Id"], [
+        {"Id": 10, "FirstName": "Layla", "LastName": "Goodge"},
+        {"Id": 11, "FirstName": "Craig", "LastName": "David"},
+    ]],
+])
+def test_write_sql_table_upsert(input_df, input_astypes, sql_table, key_columns, expected, sqlite3_db, backend):
+    input_df = backend.DataFrame(input_df, astype=input_astypes)
+    sql_engine = f"sqlite:///{sqlite3_db}"
+    with get_test_data(named_inputs={"input": input_df}, named_output="result") as data:
+        rule = backend.rules.WriteSQLTableRule(sql_engine, sql_table, if_exists="upsert", key_columns=key_columns, named_input="input")
+        rule.apply(data)
+        engine = SQLAlchemyEngines.get_engine(sql_engine)
+        with engine.connect() as connection:
+            res = connection.execute(sa.text(f"SELECT * FROM {sql_table} ORDER BY Id"))
+            actual = [dict(zip(res.keys(), row)) for row in res]
+            assert actual == expected
+            # the staging tables are dropped
+            assert sa.inspect(connection).get_table_names() == sorted({"Author", sql_table})
+
+        # upserting the same data again is idempotent
+        rule.apply(data)
+        with engine.connect() as connection:
+            res = connection.execute(sa.text(f"SELECT * FROM {sql_table} ORDER BY Id"))
+            actual = [dict(zip(res.keys(), row)) for row in res]
+            assert actual == expected
+
+
+@pytest.mark.skipif(not HAS_SQL_ALCHEMY, reason="sqlalchemy not installed.")
+@pytest.mark.parametrize("new_table", [False, True])
+def test_write_sql_table_upsert_schema(new_table, tmp_path, backend):
+    import sqlite3
+    other_db = str(tmp_path / "other.db")
+    with sqlite3.connect(other_db) as con:
+        if not new_table:
+            con.execute("CREATE TABLE Author (Id INTEGER, FirstName TEXT, PRIMARY KEY(Id))")
+            con.execute("INSERT INTO Author (Id, FirstName) VALUES (1, 'Mike')")
+    sql_engine = f"sqlite:///{tmp_path / 'main.db'}"
+    engine = SQLAlchemyEngines.get_engine(sql_engine)
+    # the other database is attached as the other schema
+    sa.event.listen(engine, "connect", lambda dbapi_con, _: dbapi_con.execute(f"ATTACH DATABASE '{other_db}' AS other"))
+    input_df = backend.DataFrame([{"Id": 1, "FirstName": "Michael"}, {"Id": 2, "FirstName": "John"}], astype={"Id": "Int64", "FirstName": "string"})
+    with get_test_data(named_inputs={"input": input_df}, named_output="result") as data:
+        rule = backend.rules.WriteSQLTableRule(sql_engine, "other.Author", if_exists="upsert", key_columns=["Id"], named_input="input")
+        rule.apply(data)
+        rule.apply(data)
+        with engine.connect() as connection:
+            res = connection.execute(sa.text("SELECT Id, FirstName FROM other.Author ORDER BY Id"))
+            assert [tuple(row) for row in res] == [(1, "Michael"), (2, "John")]
+            assert sa.inspect(connection).get_table_names(schema="other") == ["Author"]
+            assert sa.inspect(connection).get_table_names() == []
+
+
+@pytest.mark.skipif(not HAS_SQL_ALCHEMY, reason="sqlalchemy not installed.")
+def test_write_sql_table_upsert_in_memory(backend):
+    # the upsert writes through the connection of its transaction, so the in memory database is the same
+    sql_engine = "sqlite://"
+    engine = SQLAlchemyEngines.get_engine(sql_engine)
+    # the engine (and its in memory database) is shared by the backends
+    sql_table = f"Author_{backend.name}"
+    with engine.connect() as connection:
+        connection.execute(sa.text(f"CREATE TABLE {sql_table} (Id INTEGER, FirstName TEXT, PRIMARY KEY(Id))"))
+        connection.execute(sa.text(f"INSERT INTO {sql_table} (Id, FirstName) VALUES (1, 'Mike')"))
+        connection.commit()
+    input_df = backend.DataFrame([{"Id": 1, "FirstName": "Michael"}, {"Id": 2, "FirstName": "John"}], astype={"Id": "Int64", "FirstName": "string"})
+    with get_test_data(named_inputs={"input": input_df}, named_output="result") as data:
+        backend.rules.WriteSQLTableRule(sql_engine, sql_table, if_exists="upsert", key_columns=["Id"], named_input="input").apply(data)
+        with engine.connect() as connection:
+            res = connection.execute(sa.text(f"SELECT Id, FirstName FROM {sql_table} ORDER BY Id"))
+            assert [tuple(row) for row in res] == [(1, "Michael"), (2, "John")]
+            assert sql_table in sa.inspect(connection).get_table_names()
+            assert not any("_stg_" in table for table in sa.inspect(connection).get_table_names())
+
+
+@pytest.mark.skipif(not HAS_SQL_ALCHEMY, reason="sqlalchemy not installed.")
+def test_write_sql_table_upsert_errors(sqlite3_db, backend):
+    sql_engine = f"sqlite:///{sqlite3_db}"
+    with pytest.raises(ValueError) as exc:
+        backend.rules.WriteSQLTableRule(sql_engine, "Author", if_exists="upsert", named_input="input")
+    assert "The key_columns parameter must be a non-empty list of columns when if_exists is upsert." == str(exc.value)
+
+    input_df = backend.DataFrame([{"Id": 3, "FirstName": "Mike"}], astype={"Id": "Int64", "FirstName": "string"})
+    with get_test_data(named_inputs={"input": input_df}, named_output="result") as data:
+        rule = backend.rules.WriteSQLTableRule(sql_engine, "Author", if_exists="upsert", key_columns=["Id", "LastName"], named_input="input")
+        with pytest.raises(MissingColumnError) as exc:
+            rule.apply(data)
+        assert "Missing key columns in the input dataframe: {'LastName'}" == str(exc.value)
+
+        # no unique constraint on the key columns
+        rule = backend.rules.WriteSQLTableRule(sql_engine, "Author", if_exists="upsert", key_columns=["FirstName"], named_input="input")
+        with pytest.raises(SQLError):
+            rule.apply(data)
+        engine = SQLAlchemyEngines.get_engine(sql_engine)
+        with engine.connect() as connection:
+            assert sa.inspect(connection).get_table_names() == ["Author"]
+
+
+@pytest.mark.skipif(not HAS_SQL_ALCHEMY, reason="sqlalchemy not installed.")
+@pytest.mark.parametrize("watermark_lookback,expected_ids", [
+    [None, [[1, 2], [3, 4], []]],
+    [1, [[1, 2], [2, 3, 4], [4]]],
+])
+def test_read_sql_query_watermark(watermark_lookback, expected_ids, sqlite3_db, tmp_path, backend):
+    sql_engine = f"sqlite:///{sqlite3_db}"
+    state_file = str(tmp_path / "watermark.json")
+    engine = SQLAlchemyEngines.get_engine(sql_engine)
+    with get_test_data(None, named_inputs={}, named_output="result") as data:
+        for idx, ids in enumerate(expected_ids):
+            rule = backend.rules.ReadSQLQueryRule(
+                sql_engine, "SELECT Id, FirstName FROM Author WHERE Id > 0 ORDER BY Id", column_types={"Id": "int64", "FirstName": "string"},
+                watermark_column="Id", watermark_state_file=state_file, watermark_lookback=watermark_lookback,
+                named_output=f"result{idx}")
+            rule.apply(data)
+            actual = data.get_named_output(f"result{idx}")
+            if backend.name == "dask":
+                actual = actual.compute()
+            assert list(actual["Id"]) == ids
+            if idx == 0:
+                with engine.connect() as connection:
+                    connection.execute(sa.text("INSERT INTO Author (Id, FirstName, LastName) VALUES (3, 'Layla', 'Goodge'), (4, 'Craig', 'David')"))
+                    connection.commit()
+    with open(state_file, "rt") as f:
+        assert json.load(f) == {"watermark_column": "Id", "value": 4, "type": "int"}
+
+
+@pytest.mark.skipif(not HAS_SQL_ALCHEMY, reason="sqlalchemy not installed.")
+def test_read_sql_query_watermark_datetime(sqlite3_db, tmp_path, backend):
+    sql_engine = f"sqlite:///{sqlite3_db}"
+    state_file = str(tmp_path / "watermark.json")
+    with open(state_file, "wt") as f:
+        json.dump({"watermark_column": "Updated", "value": "2023-05-01T10:00:00", "type": "datetime"}, f)
+    sql_query = "SELECT * FROM (SELECT 1 AS Id, '2023-05-01 09:00:00' AS Updated UNION ALL SELECT 2, '2023-05-01 11:00:00')"
+    with get_test_data(None, named_inputs={}, named_output="result") as data:
+        rule = backend.rules.ReadSQLQueryRule(
+            sql_engine, sql_query, column_types={"Id": "int64", "Updated": "string"},
+            watermark_column="Updated", watermark_state_file=state_file, watermark_lookback=3600, named_output="result")
+        rule.apply(data)
+        actual = data.get_named_output("result")
+        if backend.name == "dask":
+            actual = actual.compute()
+        assert list(actual["Id"]) == [2]
+
+
+@pytest.mark.skipif(not HAS_SQL_ALCHEMY, reason="sqlalchemy not installed.")
+def test_read_sql_query_watermark_datetime_plan_runs(sqlite3_db, tmp_path, backend):
+    sql_engine = f"sqlite:///{sqlite3_db}"
+    state_file = str(tmp_path / "watermark.json")
+    with open(state_file, "wt") as f:
+        json.dump({"watermark_column": "Updated", "value": "2023-05-01T10:00:00", "type": "datetime"}, f)
+    sql_query = "SELECT * FROM (SELECT 1 AS Id, '2023-05-01 09:00:00' AS Updated UNION ALL SELECT 2, '2023-05-01 11:00:00')"
+    read_rule = backend.rules.ReadSQLQueryRule(
+        sql_engine, sql_query, column_types={"Id": "int64", "Updated": "string"},
+        watermark_column="Updated", watermark_state_file=state_file, watermark_lookback=3600, named_output="result")
+    run_context = {"etlrules_tempdir": str(tmp_path)}
+    failing_plan = Plan()
+    failing_plan.add_rule(read_rule)
+    failing_plan.add_rule(backend.rules.ProjectRule(["Missing"], named_input="result", named_output="projected"))
+    with pytest.raises(MissingColumnError):
+        RuleEngine(failing_plan).run(RuleData(context=run_context))
+    with open(state_file, "rt") as f:
+        assert json.load(f) == {"watermark_column": "Updated", "value": "2023-05-01T10:00:00", "type": "datetime"}
+    plan = Plan()
+    plan.add_rule(read_rule)
+    for _ in range(2):
+        data = RuleEngine(plan).run(RuleData(context=run_context))
+        actual = data.get_named_output("result")
+        if backend.name == "dask":
+            actual = actual.compute()
+        assert list(actual["Id"]) == [2]
+        with open(state_file, "rt") as f:
+            assert json.load(f) == {"watermark_column": "Updated", "value": "2023-05-01T11:00:00", "type": "datetime"}
+
+
+@pytest.mark.skipif(not HAS_SQL_ALCHEMY, reason="sqlalchemy not installed.")
+def test_read_sql_query_watermark_errors(sqlite3_db, tmp_path, backend):
+    sql_engine = f"sqlite:///{sqlite3_db}"
+    with pytest.raises(ValueError) as exc:
+        backend.rules.ReadSQLQueryRule(sql_engine, "SELECT * FROM Author", watermark_column="Id", named_output="result")
+    assert str(exc.value) == "The watermark_state_file parameter must be set when using a watermark_column."
+    with get_test_data(None, named_inputs={}, named_output="result") as data:
+        rule = backend.rules.ReadSQLQueryRule(
+            sql_engine, "SELECT * FROM Author", watermark_column="Updated", watermark_state_file=str(tmp_path / "wm.json"), named_output="result")
+        with pytest.raises(MissingColumnError) as exc:
+            rule.apply(data)
+        assert str(exc.value) == "The watermark column 'Updated' is missing from the result."
+
+
+def _to_records(df, backend):
+    if backend.name == "polars":
+        return df.to_dicts()
+    if backend.name == "dask":
+        df = df.compute()
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+@pytest.mark.skipif(not HAS_SQL_ALCHEMY, reason="sqlalchemy not installed.")
+@pytest.mark.parametrize("key_columns,lookup_key_columns,lookup_columns,join_type,expected", [
+    [["AuthorId"], ["Id"], ["FirstName"], "left", [
+        {"AuthorId": 1, "Title": "Mike", "Id": 1, "FirstName": "Mike"},
+        {"AuthorId": 3, "Title": "B", "Id": None, "FirstName": None},
+        {"AuthorId": 2, "Title": "John", "Id": 2, "FirstName": "John"},
+        {"AuthorId": 1, "Title": "D", "Id": 1, "FirstName": "Mike"},
+        {"AuthorId": None, "Title": "E", "Id": None, "FirstName": None},
+    ]],
+    [["AuthorId"], ["Id"], None, "inner", [
+        {"AuthorId": 1, "Title": "Mike", "Id": 1, "FirstName": "Mike", "LastName": "Good"},
+        {"AuthorId": 2, "Title": "John", "Id": 2, "FirstName": "John", "LastName": "McEwan"},
+        {"AuthorId": 1, "Title": "D", "Id": 1, "FirstName": "Mike", "LastName": "Good"},
+    ]],
+    [["AuthorId", "Title"], ["Id", "FirstName"], ["LastName"], "inner", [
+        {"AuthorId": 1, "Title": "Mike", "Id": 1, "FirstName": "Mike", "LastName": "Good"},
+        {"AuthorId": 2, "Title": "John", "Id": 2, "FirstName": "John", "LastName": "McEwan"},
+    ]],
+])
+@pytest.mark.parametrize("batch_size,temp_table_threshold", [[1000, None], [1, None], [1000, 0]])
+def test_sql_lookup_join(key_columns, lookup_key_columns, lookup_columns, join_type, expected, batch_size, temp_table_threshold, sqlite3_db, backend):
+    input_df = backend.DataFrame([
+        {"AuthorId": 1, "Title": "Mike"},
+        {"AuthorId": 3, "Title": "B"},
+        {"AuthorId": 2, "Title": "John"},
+        {"AuthorId": 1, "Title": "D"},
+        {"Title": "E"},
+    ], astype={"AuthorId": "Int64", "Title": "string"})
+    with get_test_data(named_inputs={"input": input_df}, named_output="result") as data:
+        rule = backend.rules.SQLLookupJoinRule(
+            f"sqlite:///{sqlite3_db}", "Author", key_columns, lookup_key_columns=lookup_key_columns, lookup_columns=lookup_columns,
+            join_type=join_type, batch_size=batch_size, temp_table_threshold=temp_table_threshold, named_input="input", named_output="result")
+        rule.apply(data)
+        actual = _to_records(data.get_named_output("result"), backend)
+        key = lambda row: (row["Title"], )
+        assert sorted(actual, key=key) == sorted(expected, key=key)
+        with SQLAlchemyEngines.get_engine(f"sqlite:///{sqlite3_db}").connect() as connection:
+            # the temporary tables are dropped
+            assert not sa.inspect(connection).get_temp_table_names()
+
+
+@pytest.mark.skipif(not HAS_SQL_ALCHEMY, reason="sqlalchemy not installed.")
+def test_sql_lookup_join_errors(sqlite3_db, backend):
+    sql_engine = f"sqlite:///{sqlite3_db}"
+    with pytest.raises(ValueError) as exc:
+        backend.rules.SQLLookupJoinRule(sql_engine, "Author", ["A"], join_type="outer")
+    assert "'outer' is not a valid value for the join_type parameter" in str(exc.value)
+    with pytest.raises(ValueError) as exc:
+        backend.rules.SQLLookupJoinRule(sql_engine, "Author", ["A"], lookup_key_columns=["Id", "FirstName"])
+    assert str(exc.value) == "The lookup_key_columns must have the same number of columns as the key_columns."
+    input_df = backend.DataFrame([{"AuthorId": 1}], astype={"AuthorId": "Int64"})
+    with get_test_data(named_inputs={"input": input_df}, named_output="result") as data:
+        rule = backend.rules.SQLLookupJoinRule(sql_engine, "Author", ["Id"], named_input="input")
+        with pytest.raises(MissingColumnError) as exc:
+            rule.apply(data)
+        assert str(exc.value) == "Missing key columns in the input dataframe: {'Id'}"
+        rule = backend.rules.SQLLookupJoinRule(sql_engine, "Author", ["AuthorId"], named_input="input")
+        with pytest.raises(SQLError):
+            rule.apply(data)
@@ -1,8 +1,16 @@
 import datetime
+import hashlib
 import os
 import pytest
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 from etlrules.backends.common.io.files import WriteCSVFileRule
+from etlrules.backends.common.io.http_cache import HTTPDownloadCache
+from etlrules.data import RuleData, context
+from etlrules.engine import RuleEngine
+from etlrules.exceptions import MissingColumnError
+from etlrules.plan import Plan
 from tests.utils.data import assert_frame_equal, get_test_data
 
 
@@ -104,3 +112,322 @@ def test_read_csv_file_via_http_regex(backend):
         with pytest.raises(ValueError) as exc:
             backend.rules.ReadCSVFileRule(file_name=url, regex=True, header=False, named_output="result")
         assert str(exc.value) == "Regex read not supported for URIs."
+
+
+def test_read_csv_files_incremental(tmp_path, backend):
+    state_file = str(tmp_path / "state" / "manifest.json")
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "data_1.csv").write_text("A,B\n1,a\n2,b\n")
+
+    def read(data, named_output, checksum=False, empty_result=False):
+        read_rule = backend.rules.ReadCSVFileRule(
+            file_name=r"data_\d+\.csv", file_dir=str(data_dir), regex=True,
+            incremental_state_file=state_file, incremental_checksum=checksum,
+            incremental_empty_result=empty_result, named_output=named_output)
+        read_rule.apply(data)
+        return data.get_named_output(named_output)
+
+    with get_test_data(None, named_inputs={}, named_output="result") as data:
+        assert_frame_equal(read(data, "result1", checksum=True), backend.DataFrame(data=[{"A": 1, "B": "a"}, {"A": 2, "B": "b"}]))
+
+        # only the new file is read
+        (data_dir / "data_2.csv").write_text("A,B\n3,c\n")
+        assert_frame_equal(read(data, "result2", checksum=True), backend.DataFrame(data=[{"A": 3, "B": "c"}]))
+
+        # no changes
+        assert read(data, "result3", checksum=True) is None
+        result = read(data, "result4", checksum=True, empty_result=True)
+        assert list(result.columns) == ["A", "B"]
+        assert len(result) == 0
+
+        # touched but the contents are the same
+        os.utime(data_dir / "data_1.csv", (1, 1))
+        assert read(data, "result5", checksum=True) is None
+
+        # contents changed
+        (data_dir / "data_1.csv").write_text("A,B\n1,a\n2,b\n4,d\n")
+        assert_frame_equal(
+            read(data, "result6", checksum=True),
+            backend.DataFrame(data=[{"A": 1, "B": "a"}, {"A": 2, "B": "b"}, {"A": 4, "B": "d"}])
+        )
+
+        # a new state file reads all the files
+        state_file = str(tmp_path / "state" / "manifest2.json")
+        assert_frame_equal(
+            read(data, "result7"),
+            backend.DataFrame(data=[{"A": 1, "B": "a"}, {"A": 2, "B": "b"}, {"A": 4, "B": "d"}, {"A": 3, "B": "c"}])
+        )
+
+
+def test_read_csv_files_incremental_failed_run(tmp_path, backend):
+    state_file = tmp_path / "manifest.json"
+    (tmp_path / "data_1.csv").write_text("A,B\n1,a\n2,b\n")
+    read_rule = backend.rules.ReadCSVFileRule(
+        file_name=r"data_\d+\.csv", file_dir=str(tmp_path), regex=True, incremental_state_file=str(state_file), named_output="read")
+    failing_plan = Plan()
+    failing_plan.add_rule(read_rule)
+    failing_plan.add_rule(backend.rules.ProjectRule(["Missing"], named_input="read", named_output="projected"))
+    with pytest.raises(MissingColumnError):
+        RuleEngine(failing_plan).run(RuleData())
+    # the files are read again after a failed run
+    assert not state_file.exists()
+    plan = Plan()
+    plan.add_rule(read_rule)
+    data = RuleEngine(plan).run(RuleData())
+    assert_frame_equal(data.get_named_output("read"), backend.DataFrame(data=[{"A": 1, "B": "a"}, {"A": 2, "B": "b"}]))
+    assert state_file.exists()
+    data = RuleEngine(plan).run(RuleData())
+    assert data.get_named_output("read") is None
+
+
+def test_read_csv_file_incremental_uri(backend):
+    url = "https://raw.githubusercontent.com/ciprianmiclaus2/etlrules/main/examples/csv2db/csv_sample.csv"
+    with pytest.raises(ValueError) as exc:
+        backend.rules.ReadCSVFileRule(file_name=url, incremental_state_file="/tmp/state.json", named_output="result")
+    assert str(exc.value) == "Incremental read not supported for URIs."
+
+
+class CSVHTTPRequestHandler(BaseHTTPRequestHandler):
+    files = {}
+    requests = []
+
+    def do_GET(self):
+        content = self.files[self.path]
+        etag = '"' + hashlib.md5(content).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.requests.append((self.path, 304))
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.requests.append((self.path, 200))
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_HEAD(self):
+        content = self.files[self.path]
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        ...
+
+
+@pytest.fixture
+def http_server():
+    CSVHTTPRequestHandler.files = {}
+    CSVHTTPRequestHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CSVHTTPRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}", CSVHTTPRequestHandler
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_read_csv_file_http_cache(http_server, tmp_path, backend):
+    base_url, handler = http_server
+    handler.files["/data.csv"] = b"A,B\n1,a\n2,b\n"
+    cache_dir = tmp_path / "cache"
+
+    def read(data, named_output):
+        backend.rules.ReadCSVFileRule(file_name=base_url + "/data.csv", named_output=named_output).apply(data)
+        return data.get_named_output(named_output)
+
+    with get_test_data(None, named_inputs={}, named_output="result") as data:
+        with context.set({"http_cache_dir": str(cache_dir)}):
+            expected = backend.DataFrame(data=[{"A": 1, "B": "a"}, {"A": 2, "B": "b"}])
+            assert_frame_equal(read(data, "result1"), expected)
+            assert handler.requests == [("/data.csv", 200)]
+            assert len([f for f in os.listdir(cache_dir) if f.endswith(".csv")]) == 1
+
+            # not modified, served from the cache
+            assert_frame_equal(read(data, "result2"), expected)
+            assert handler.requests == [("/data.csv", 200), ("/data.csv", 304)]
+
+            # modified on the server
+            handler.files["/data.csv"] = b"A,B\n3,c\n"
+            assert_frame_equal(read(data, "result3"), backend.DataFrame(data=[{"A": 3, "B": "c"}]))
+            assert handler.requests == [("/data.csv", 200), ("/data.csv", 304), ("/data.csv", 200)]
+
+
+@pytest.mark.parametrize("compression", ["gzip", "bz2", "xz"])
+def test_read_compressed_csv_file_http_cache(compression, http_server, tmp_path, backend):
+    import pandas as pd
+    base_url, handler = http_server
+    file_name = "data.csv" + WriteCSVFileRule.COMPRESSIONS[compression]
+    pd.DataFrame(data={"A": [1, 2], "B": ["a", "b"]}).to_csv(tmp_path / file_name, index=False, compression=compression)
+    handler.files["/" + file_name] = (tmp_path / file_name).read_bytes()
+    with get_test_data(None, named_inputs={}, named_output="result") as data:
+        with context.set({"http_cache_dir": str(tmp_path / "cache")}):
+            # the file downloaded by the http cache is decompressed as a local file
+            backend.rules.ReadCSVFileRule(file_name=f"{base_url}/{file_name}", named_output="result").apply(data)
+            assert_frame_equal(data.get_named_output("result"), backend.DataFrame(data=[{"A": 1, "B": "a"}, {"A": 2, "B": "b"}]))
+
+
+def test_read_csv_file_http_cache_eviction(http_server, tmp_path, backend):
+    base_url, handler = http_server
+    cache_dir = tmp_path / "cache"
+    for idx in range(3):
+        handler.files[f"/data{idx}.csv"] = b"A,B\n" + b"".join(f"{i},b{i}\n".encode() for i in range(idx, idx + 30000))
+
+    with get_test_data(None, named_inputs={}, named_output="result") as data:
+        with context.set({"http_cache_dir": str(cache_dir), "http_cache_max_size_mb": 1}):
+            for idx in range(3):
+                backend.rules.ReadCSVFileRule(file_name=f"{base_url}/data{idx}.csv", named_output=f"result{idx}").apply(data)
+                assert len(data.get_named_output(f"result{idx}")) == 30000
+            cached = sorted(f for f in os.listdir(cache_dir) if f.endswith(".csv"))
+            assert len(cached) == 2
+            assert sum(os.path.getsize(cache_dir / f) for f in cached) <= 1024 * 1024
+            assert len([f for f in os.listdir(cache_dir) if f.endswith(".meta.json")]) == 2
+
+
+def test_http_cache_json_url(http_server, tmp_path):
+    base_url, handler = http_server
+    cache_dir = tmp_path / "cache"
+    handler.files["/data.json"] = b'{"A": 1}\n' * 40000
+    handler.files["/other.json"] = b'{"B": 2}\n' * 40000
+    cache = HTTPDownloadCache(str(cache_dir), max_size=500 * 1024)
+    data_path = cache.get(base_url + "/data.json")
+    _, metadata_path = cache.get_paths(base_url + "/data.json")
+    assert data_path != metadata_path
+    with open(data_path, "rb") as f:
+        assert f.read() == handler.files["/data.json"]
+    # not modified, the cached body is still the data
+    with open(cache.get(base_url + "/data.json"), "rb") as f:
+        assert f.read() == handler.files["/data.json"]
+    assert handler.requests == [("/data.json", 200), ("/data.json", 304)]
+
+    # the .json data files are evicted, together with their metadata
+    other_path = cache.get(base_url + "/other.json")
+    assert sorted(os.listdir(cache_dir)) == sorted([os.path.basename(other_path), os.path.basename(cache.get_paths(base_url + "/other.json")[1])])
+
+
+@pytest.mark.parametrize("compression", list(WriteCSVFileRule.COMPRESSIONS))
+def test_compressed_csv_files_interoperable(compression, tmp_path):
+    from etlrules.backends import pandas as pd_rules
+    from etlrules.backends import polars as pl_rules
+    import pandas as pd
+    import polars as pl
+    file_name = "tst.csv" + WriteCSVFileRule.COMPRESSIONS[compression]
+    pd_df = pd.DataFrame(data=[{"A": 1, "B": "b1"}, {"A": 2, "B": "b2"}])
+    pl_df = pl.DataFrame(data=[{"A": 1, "B": "b1"}, {"A": 2, "B": "b2"}])
+    for write_rules, read_rules, test_df, df_result in [
+        (pd_rules, pl_rules, pd_df, pl_df),
+        (pl_rules, pd_rules, pl_df, pd_df),
+    ]:
+        with get_test_data(test_df, named_inputs={"input": test_df}, named_output="result") as data:
+            write_rules.WriteCSVFileRule(file_name=file_name, file_dir=str(tmp_path), compression=compression, named_input="input").apply(data)
+            read_rules.ReadCSVFileRule(file_name=file_name, file_dir=str(tmp_path), named_output="result").apply(data)
+            assert_frame_equal(data.get_named_output("result"), df_result)
+
+
+@pytest.mark.parametrize("header,data_rows", [
+    [True, 0],
+    [True, 5],
+    [False, 5],
+])
+def test_write_read_zstd_csv_file_polars(header, data_rows, tmp_path):
+    from etlrules.backends import polars as pl_rules
+    import polars as pl
+    test_df = pl.DataFrame(data={"A": list(range(data_rows)), "B": [f"b{i}" for i in range(data_rows)]}, schema={"A": pl.Int64, "B": pl.Utf8})
+    with get_test_data(test_df, named_inputs={"input": test_df}, named_output="result") as data:
+        write_rule = pl_rules.WriteCSVFileRule(file_name="tst.csv.zst", file_dir=str(tmp_path), header=header, compression="zstd", named_input="input")
+        write_rule.CHUNK_SIZE = 2
+        write_rule.apply(data)
+        read_rule = pl_rules.ReadCSVFileRule(file_name="tst.csv.zst", file_dir=str(tmp_path), header=header, named_output="result")
+        read_rule.apply(data)
+        result = data.get_named_output("result")
+        if not header:
+            result = result.rename({"column_1": "A", "column_2": "B"})
+        if data_rows:
+            assert_frame_equal(result, test_df)
+        else:
+            # the types cannot be inferred without data
+            assert result.columns == ["A", "B"] and result.is_empty()
+
+
+@pytest.mark.parametrize("compression", ["gzip", "bz2", "xz", "zstd"])
+def test_read_compressed_csv_file_streamed_polars(compression, tmp_path, monkeypatch):
+    from etlrules.backends import polars as pl_rules
+    from etlrules.backends.polars.io import files as pl_files
+    import polars as pl
+    # the decompressed data is copied in chunks smaller than a line
+    monkeypatch.setattr(pl_files, "DECOMPRESS_CHUNK_SIZE", 7)
+    file_name = "tst.csv" + pl_rules.WriteCSVFileRule.COMPRESSIONS[compression]
+    test_df = pl.DataFrame(data={"A": list(range(100)), "B": [f"b{i}" for i in range(100)]}, schema={"A": pl.Int64, "B": pl.Utf8})
+    with get_test_data(test_df, named_inputs={"input": test_df}, named_output="result") as data:
+        pl_rules.WriteCSVFileRule(file_name=file_name, file_dir=str(tmp_path), compression=compression, named_input="input").apply(data)
+        pl_rules.ReadCSVFileRule(file_name=file_name, file_dir=str(tmp_path), named_output="result").apply(data)
+        assert_frame_equal(data.get_named_output("result"), test_df)
+
+
+@pytest.mark.parametrize("header", [True, False])
+def test_read_csv_file_parsed_cache(header, tmp_path, backend):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    cache_dir = tmp_path / "cache"
+    (data_dir / "data.csv").write_text("A,B\n1,a\n2,b\n")
+    (tmp_path / "expected.csv").write_text("A,B\n1,a\n2,b\n")
+
+    def read(data, named_output, separator=",", file_dir=data_dir, file_name="data.csv"):
+        read_rule = backend.rules.ReadCSVFileRule(
+            file_name=file_name, file_dir=str(file_dir), separator=separator, header=header, named_output=named_output)
+        read_rule.apply(data)
+        return data.get_named_output(named_output)
+
+    with get_test_data(None, named_inputs={}, named_output="result") as data:
+        expected = read(data, "expected", file_dir=tmp_path, file_name="expected.csv")
+        with context.set({"csv_cache_dir": str(cache_dir)}):
+            assert_frame_equal(read(data, "result1"), expected)
+            entries = os.listdir(cache_dir)
+            assert len(entries) == 1
+
+            # same size and modified time, the cached copy is used
+            stat = os.stat(data_dir / "data.csv")
+            (data_dir / "data.csv").write_text("A,B\n3,c\n4,d\n")
+            os.utime(data_dir / "data.csv", ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            assert_frame_equal(read(data, "result2"), expected)
+            assert os.listdir(cache_dir) == entries
+
+            # the file changed
+            os.utime(data_dir / "data.csv", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            (tmp_path / "expected.csv").write_text("A,B\n3,c\n4,d\n")
+            result = read(data, "result3")
+            with context.set({"csv_cache_dir": ""}):
+                assert_frame_equal(result, read(data, "expected2", file_dir=tmp_path, file_name="expected.csv"))
+            assert len(os.listdir(cache_dir)) == 2
+
+            # different options
+            read(data, "result4", separator=";")
+            assert len(os.listdir(cache_dir)) == 3
+
+
+def test_read_csv_file_parsed_cache_eviction(tmp_path, backend):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    cache_dir = tmp_path / "cache"
+    for idx in range(3):
+        (data_dir / f"data{idx}.csv").write_text("A,B\n" + "".join(f"{i},b{i}\n" for i in range(idx, idx + 1000)))
+
+    with get_test_data(None, named_inputs={}, named_output="result") as data:
+        with context.set({"csv_cache_dir": str(cache_dir), "csv_cache_max_size_mb": 0}):
+            for idx in range(3):
+                backend.rules.ReadCSVFileRule(file_name=f"data{idx}.csv", file_dir=str(data_dir), named_output=f"result{idx}").apply(data)
+                assert len(data.get_named_output(f"result{idx}")) == 1000
+                # only the most recent entry is kept
+                assert len(os.listdir(cache_dir)) == 1
+
+        with context.set({"csv_cache_dir": str(cache_dir), "csv_cache_max_age_hours": 1}):
+            entry = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+            os.utime(entry, (0, 0))
+            backend.rules.ReadCSVFileRule(file_name="data0.csv", file_dir=str(data_dir), named_output="result3").apply(data)
+            # the expired entry is evicted
+            assert len(os.listdir(cache_dir)) == 1
+            assert os.path.join(cache_dir, os.listdir(cache_dir)[0]) != entry
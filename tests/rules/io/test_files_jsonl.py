@@ -0,0 +1,89 @@
+import os
+import pytest
+
+from etlrules.exceptions import UnsupportedTypeError
+from tests.rules.io.test_files_csv import http_server  # noqa: F401
+from tests.utils.data import assert_frame_equal, get_test_data
+
+
+TEST_DF = [
+    {"A": 1, "B": "b1", "C": 1.5},
+    {"A": 2, "B": "b2", "C": 2.5},
+    {"A": 3, "B": "b3", "C": 3.5},
+    {"A": 4, "B": "b4", "C": 4.5},
+    {"A": 5, "B": "b5", "C": 5.5},
+]
+
+
+@pytest.mark.parametrize("chunk_size", [100_000, 2])
+def test_write_read_jsonl_file(chunk_size, tmp_path, backend):
+    test_df = backend.DataFrame(data=TEST_DF)
+    with get_test_data(test_df, named_inputs={"input": test_df}, named_output="result") as data:
+        write_rule = backend.rules.WriteJSONLinesFileRule(file_name="tst.jsonl", file_dir=str(tmp_path), chunk_size=chunk_size, named_input="input")
+        write_rule.apply(data)
+        with open(tmp_path / "tst.jsonl") as f:
+            lines = f.read().splitlines()
+        assert len(lines) == len(TEST_DF)
+        read_rule = backend.rules.ReadJSONLinesFileRule(file_name="tst.jsonl", file_dir=str(tmp_path), named_output="result")
+        read_rule.apply(data)
+        assert_frame_equal(data.get_named_output("result"), test_df)
+
+
+def test_read_jsonl_file_column_types(tmp_path, backend):
+    (tmp_path / "tst.jsonl").write_text('{"A": 1, "B": "b1", "C": true}\n{"A": null, "B": null, "C": false}\n{"A": 3, "B": "b3"}\n')
+    with get_test_data(None, named_inputs={}, named_output="result") as data:
+        read_rule = backend.rules.ReadJSONLinesFileRule(
+            file_name="tst.jsonl", file_dir=str(tmp_path), column_types={"A": "int32", "B": "string", "C": "boolean"}, named_output="result")
+        read_rule.apply(data)
+        expected = backend.DataFrame(
+            data=[{"A": 1, "B": "b1", "C": True}, {"A": None, "B": None, "C": False}, {"A": 3, "B": "b3", "C": None}],
+            astype={"A": "Int32", "B": "string", "C": "boolean"}
+        )
+        assert_frame_equal(data.get_named_output("result"), expected)
+
+
+def test_read_jsonl_files_regex(tmp_path, backend):
+    (tmp_path / "data_1.jsonl").write_text('{"A": 1, "B": "b1"}\n{"A": 2, "B": "b2"}\n')
+    (tmp_path / "data_2.jsonl").write_text('{"A": 3, "B": "b3"}\n')
+    (tmp_path / "other.jsonl").write_text('{"A": 4, "B": "b4"}\n')
+    with get_test_data(None, named_inputs={}, named_output="result") as data:
+        read_rule = backend.rules.ReadJSONLinesFileRule(
+            file_name=r"data_\d+\.jsonl", file_dir=str(tmp_path), regex=True, block_size=16, named_output="result")
+        read_rule.apply(data)
+        expected = backend.DataFrame(data=[{"A": 1, "B": "b1"}, {"A": 2, "B": "b2"}, {"A": 3, "B": "b3"}])
+        assert_frame_equal(data.get_named_output("result"), expected)
+
+
+def test_read_jsonl_file_unsupported_type(backend):
+    with pytest.raises(UnsupportedTypeError) as exc:
+        backend.rules.ReadJSONLinesFileRule(file_name="tst.jsonl", column_types={"A": "int65"}, named_output="result")
+    assert str(exc.value) == "Type 'int65' for column 'A' is not supported."
+
+
+def test_read_jsonl_file_uri(http_server, backend):
+    base_url, handler = http_server
+    handler.files["/data.jsonl"] = b'{"A": 1, "B": "b1"}\n{"A": 2, "B": "b2"}\n'
+    with get_test_data(None, named_inputs={}, named_output="result") as data:
+        # dask reads the blocks with range requests, which the test server doesn't support
+        block_size = None if backend.name == "dask" else 16
+        read_rule = backend.rules.ReadJSONLinesFileRule(file_name=base_url + "/data.jsonl", block_size=block_size, named_output="result")
+        read_rule.apply(data)
+        expected = backend.DataFrame(data=[{"A": 1, "B": "b1"}, {"A": 2, "B": "b2"}])
+        assert_frame_equal(data.get_named_output("result"), expected)
+
+
+def test_read_jsonl_files_incremental_empty_result(tmp_path, backend):
+    (tmp_path / "data_1.jsonl").write_text('{"A": 1, "B": "b1"}\n{"A": 2, "B": "b2"}\n')
+    state_file = str(tmp_path / "manifest.json")
+    with get_test_data(None, named_inputs={}, named_output="result") as data:
+        for named_output in ("result1", "result2"):
+            read_rule = backend.rules.ReadJSONLinesFileRule(
+                file_name=r"data_\d+\.jsonl", file_dir=str(tmp_path), regex=True, column_types={"A": "int32"},
+                incremental_state_file=state_file, incremental_empty_result=True, named_output=named_output)
+            read_rule.apply(data)
+        expected = backend.DataFrame(data=[{"A": 1, "B": "b1"}, {"A": 2, "B": "b2"}], astype={"A": "Int32"})
+        assert_frame_equal(data.get_named_output("result1"), expected)
+        empty = data.get_named_output("result2")
+        if backend.name == "dask":
+            empty, expected = empty.compute(), expected.compute()
+        assert_frame_equal(empty, expected[:0])
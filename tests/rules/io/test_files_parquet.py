@@ -4,6 +4,7 @@ import os
 from pandas import DataFrame
 import pytest
 
+from etlrules.data import RuleData
 from etlrules.exceptions import MissingColumnError
 from etlrules.backends.pandas import ReadParquetFileRule, WriteParquetFileRule
 from tests.utils.data import assert_frame_equal, get_test_data
@@ -108,3 +109,27 @@ def test_write_read_parquet_file_invalid_column_in_filters(backend):
     finally:
         for f in glob.glob(os.path.join("/tmp", "tst*.parquet")):
             os.remove(f)
+
+
+@pytest.mark.parametrize("columns", [None, ["C", "A"]])
+def test_read_parquet_files_incremental_empty_result(columns, tmp_path, backend):
+    if backend.name == "dask":
+        pytest.skip("The dask parquet files are written as multiple part files.")
+    test_df = backend.DataFrame(data=TEST_DF, astype={"A": "Int64", "B": "boolean", "C": "string", "D": "datetime"})
+    backend.rules.WriteParquetFileRule("data_1.parquet", str(tmp_path), named_input="input").apply(RuleData(named_inputs={"input": test_df}))
+    state_file = str(tmp_path / "manifest.json")
+    with get_test_data(None, named_inputs={}, named_output="result") as data:
+        rule = backend.rules.ReadParquetFileRule(r"data_\d+\.parquet", str(tmp_path), regex=True, columns=columns,
+                                                 incremental_state_file=state_file, incremental_empty_result=True, named_output="result1")
+        rule.apply(data)
+        full_df = data.get_named_output("result1")
+        assert len(full_df) == len(TEST_DF)
+
+        def _fail_read(file_path):
+            assert False, "Only the schema should be read."
+
+        rule = backend.rules.ReadParquetFileRule(r"data_\d+\.parquet", str(tmp_path), regex=True, columns=columns,
+                                                 incremental_state_file=state_file, incremental_empty_result=True, named_output="result2")
+        rule.do_read = _fail_read
+        rule.apply(data)
+        assert_frame_equal(data.get_named_output("result2"), full_df[:0])
@@ -1,11 +1,14 @@
 import pytest
 
+from etlrules.data import RuleData
+from etlrules.engine import RuleEngine
 from etlrules.exceptions import (
     ColumnAlreadyExistsError,
     MissingColumnError,
     ExpressionSyntaxError,
     UnsupportedTypeError,
 )
+from etlrules.plan import Plan
 
 from tests.utils.data import assert_frame_equal, get_test_data
 
@@ -166,3 +169,148 @@ def test_aggregate_exc_scenarios(group_by, aggregations, aggregation_expressions
             rule.apply(data)
         if expected_exc_str:
             assert expected_exc_str in str(exc.value)
+
+
+PARTIAL_SCENARIOS = [
+    scenario for scenario in SCENARIOS if scenario[2] is None
+] + [
+    [["A", "B"], {"C": "mean", "E": "mean", "D": "last", "F": "first"}, None, None, [
+        {"A": 1, "B": "b", "C": 2.0, "E": 1.0, "D": "c", "F": "a"},
+        {"A": 2, "B": "b", "C": 4.0, "E": 2.0, "D": "f", "F": "b"},
+        {"A": 3, "B": "b", "C": 5.0, "D": "e"},
+    ], {
+        "A": "Int64", "B": "string", "C": "Float64", "E": "Float64", "D": "string", "F": "string"
+    }],
+]
+
+
+def _complete_rows(rows):
+    return [{col: row.get(col) for col in INPUT_DF_TYPES} for row in rows]
+
+
+@pytest.mark.parametrize("batch_sizes", [[6], [2, 1, 3], [1, 1, 1, 1, 1, 1]])
+@pytest.mark.parametrize(
+    "group_by,aggregations,aggregation_expressions,aggregation_types,expected,expected_astype", PARTIAL_SCENARIOS
+)
+def test_aggregate_batches(
+    group_by, aggregations, aggregation_expressions, aggregation_types, expected, expected_astype, batch_sizes, backend
+):
+    batches = []
+    start = 0
+    for batch_size in batch_sizes:
+        batches.append(backend.DataFrame(_complete_rows(INPUT_DF[start:start + batch_size]), astype=INPUT_DF_TYPES))
+        start += batch_size
+    expected = backend.DataFrame(expected, astype=expected_astype)
+    rule = backend.rules.AggregateRule(group_by, aggregations=aggregations, aggregation_types=aggregation_types)
+    actual = rule.aggregate_batches(batches)
+    assert_frame_equal(actual, expected)
+
+
+@pytest.mark.parametrize(
+    "group_by,aggregations,aggregation_expressions,aggregation_types,expected,expected_astype", PARTIAL_SCENARIOS
+)
+def test_aggregate_state_file(
+    group_by, aggregations, aggregation_expressions, aggregation_types, expected, expected_astype, tmp_path, backend
+):
+    state_file = str(tmp_path / "state" / "agg.parquet")
+    rule = backend.rules.AggregateRule(
+        group_by, aggregations=aggregations, aggregation_types=aggregation_types, state_file=state_file,
+        named_input="input", named_output="result"
+    )
+    for start, end in [(0, 3), (3, 3), (3, 6)]:
+        input_df = backend.DataFrame(_complete_rows(INPUT_DF[start:end]) or INPUT_EMPTY_DF, astype=INPUT_DF_TYPES)
+        with get_test_data(input_df, named_inputs={"input": input_df}, named_output="result") as data:
+            rule.apply(data)
+            actual = data.get_named_output("result")
+    expected = backend.DataFrame(expected, astype=expected_astype)
+    assert_frame_equal(actual, expected)
+
+
+def test_aggregate_state_file_failed_run(tmp_path, backend):
+    # the state file name is not a glob pattern
+    state_file = tmp_path / "state" / "agg[1].parquet"
+    input_df = backend.DataFrame([{"A": 1, "C": 1}, {"A": 1, "C": 2}, {"A": 2, "C": 3}])
+    rule = backend.rules.AggregateRule(["A"], aggregations={"C": "sum"}, state_file=str(state_file), named_input="input", named_output="result")
+    failing_plan = Plan()
+    failing_plan.add_rule(rule)
+    failing_plan.add_rule(backend.rules.ProjectRule(["Missing"], named_input="result", named_output="projected"))
+    with pytest.raises(MissingColumnError):
+        RuleEngine(failing_plan).run(RuleData(named_inputs={"input": input_df}))
+    assert not state_file.exists()
+    plan = Plan()
+    plan.add_rule(rule)
+    for expected in ([{"A": 1, "C": 3}, {"A": 2, "C": 3}], [{"A": 1, "C": 6}, {"A": 2, "C": 6}]):
+        data = RuleEngine(plan).run(RuleData(named_inputs={"input": input_df}))
+        assert_frame_equal(data.get_named_output("result"), backend.DataFrame(expected), ignore_row_ordering=True)
+    assert state_file.exists()
+
+
+def test_aggregate_state_file_errors(tmp_path, backend):
+    state_file = str(tmp_path / "agg.parquet")
+    if backend.name != "dask":
+        # dask doesn't support aggregation expressions
+        with pytest.raises(ValueError) as exc:
+            backend.rules.AggregateRule(["A"], aggregations={"C": "sum"}, aggregation_expressions={"D": "len(values)"}, state_file=state_file)
+        assert str(exc.value) == "The aggregation_expressions cannot be aggregated incrementally, only the aggregations are supported with a state_file."
+    input_df = backend.DataFrame(INPUT_DF, astype=INPUT_DF_TYPES)
+    with get_test_data(input_df, named_inputs={"input": input_df}, named_output="result") as data:
+        backend.rules.AggregateRule(["A"], aggregations={"C": "sum"}, state_file=state_file, named_input="input", named_output="result").apply(data)
+        rule = backend.rules.AggregateRule(["A"], aggregations={"C": "mean"}, state_file=state_file, named_input="input", named_output="result")
+        with pytest.raises(ValueError) as exc:
+            rule.apply(data)
+        assert str(exc.value) == f"The aggregation state in {state_file} doesn't match the group_by/aggregations of the rule."
+
+
+@pytest.mark.parametrize("aggregations,aggregation_expressions", [
+    [{"C": "sum", "D": "max", "E": "min", "F": "countNoNA"}, None],
+    [{"C": "mean", "E": "count"}, None],
+    [{"C": "first", "D": "list", "F": "csv"}, None],
+    [{"C": "sum"}, {"D": "';'.join(values)"}],
+])
+def test_aggregate_grouping_sets(aggregations, aggregation_expressions, backend):
+    if backend.name == "dask" and aggregation_expressions is not None:
+        # dask doesn't support aggregation expressions
+        pytest.skip()
+    input_df = backend.DataFrame(INPUT_DF, astype=INPUT_DF_TYPES)
+    grouping_sets = {"by_a": ["A"], "by_b": ["B"]}
+    with get_test_data(input_df, named_inputs={"input": input_df}, named_output="result") as data:
+        rule = backend.rules.AggregateRule(
+            ["A", "B"], aggregations=aggregations, aggregation_expressions=aggregation_expressions,
+            grouping_sets=grouping_sets, named_input="input", named_output="result")
+        assert list(rule.get_all_named_outputs()) == ["result", "by_a", "by_b"]
+        rule.apply(data)
+        for named_output, group_by in [("result", ["A", "B"])] + list(grouping_sets.items()):
+            expected_rule = backend.rules.AggregateRule(
+                group_by, aggregations=aggregations, aggregation_expressions=aggregation_expressions,
+                named_input="input", named_output=f"expected_{named_output}")
+            expected_rule.apply(data)
+            assert_frame_equal(data.get_named_output(named_output), data.get_named_output(f"expected_{named_output}"))
+
+
+def test_aggregate_grouping_sets_state_file(tmp_path, backend):
+    state_file = str(tmp_path / "agg.parquet")
+    rule = backend.rules.AggregateRule(
+        ["A", "B"], aggregations={"C": "sum", "E": "mean"}, grouping_sets={"by_b": ["B"]}, state_file=state_file,
+        named_input="input", named_output="result")
+    for start, end in [(0, 2), (2, 6)]:
+        input_df = backend.DataFrame(_complete_rows(INPUT_DF[start:end]), astype=INPUT_DF_TYPES)
+        with get_test_data(input_df, named_inputs={"input": input_df}, named_output="result") as data:
+            rule.apply(data)
+            actual = data.get_named_output("by_b")
+    expected = backend.DataFrame([{"B": "b", "C": 21, "E": 1.5}], astype={"B": "string", "C": "Int64", "E": "Float64"})
+    assert_frame_equal(actual, expected)
+
+
+@pytest.mark.parametrize("grouping_sets,state_file,expected_exc_str", [
+    [{"": ["A"]}, None, "Invalid named output '' in grouping_sets. It must be a non-empty string different from the named_output."],
+    [{"result": ["A"]}, None, "Invalid named output 'result' in grouping_sets. It must be a non-empty string different from the named_output."],
+    [{"by_c": ["C"]}, None, "The grouping set 'by_c' must be a non-empty subset of the group_by columns: ['C']."],
+    [{"by_none": []}, None, "The grouping set 'by_none' must be a non-empty subset of the group_by columns: []."],
+    [{"by_a": ["A"]}, "agg.parquet", "The grouping_sets can only be used with a state_file when all the aggregations are decomposable"],
+])
+def test_aggregate_grouping_sets_errors(grouping_sets, state_file, expected_exc_str, backend):
+    with pytest.raises(ValueError) as exc:
+        backend.rules.AggregateRule(
+            ["A", "B"], aggregations={"C": "sum", "D": "first"}, grouping_sets=grouping_sets, state_file=state_file,
+            named_input="input", named_output="result")
+    assert expected_exc_str in str(exc.value)
@@ -185,6 +185,119 @@ def test_dedupe_rule_raises_missing_column(backend):
             rule.apply(data)
 
 
+DEDUPE_NULLS_INPUT_DF = [
+    {"A": 3, "B": "x", "C": 1},
+    {"A": 1, "B": "y", "C": 2},
+    {"A": 3, "B": "x", "C": 3},
+    {"A": None, "B": None, "C": 4},
+    {"A": 2, "B": "y", "C": 5},
+    {"A": None, "B": None, "C": 6},
+    {"A": 1, "B": "y", "C": 7},
+    {"A": 1, "B": None, "C": 8},
+]
+
+
+def _dedupe_rows(rows, columns, keep):
+    keys = [tuple(row.get(col) for col in columns) for row in rows]
+    if keep == "first":
+        return [row for idx, row in enumerate(rows) if keys[idx] not in keys[:idx]]
+    elif keep == "last":
+        return [row for idx, row in enumerate(rows) if keys[idx] not in keys[idx + 1:]]
+    return [row for idx, row in enumerate(rows) if keys.count(keys[idx]) == 1]
+
+
+@pytest.mark.parametrize("keep", ["first", "last", "none"])
+@pytest.mark.parametrize("sorted_input,spill_partitions,spill_chunk_rows", [
+    [False, None, None], [False, 3, None], [False, 3, 3], [True, None, None],
+])
+def test_dedupe_rule_hashed_sorted_spilled(keep, sorted_input, spill_partitions, spill_chunk_rows, backend):
+    rows = DEDUPE_NULLS_INPUT_DF
+    if sorted_input:
+        rows = sorted(rows, key=lambda row: (row["A"] is None, row["A"] or 0, row["B"] is None, row["B"] or ""))
+    astype = {"A": "Int64", "B": "string", "C": "Int64"}
+    input_df = backend.DataFrame(data=rows, astype=astype)
+    with get_test_data(main_input=input_df, named_output="result") as data:
+        rule = backend.rules.DedupeRule(["A", "B"], keep=keep, sorted_input=sorted_input, spill_partitions=spill_partitions, named_output="result")
+        if spill_chunk_rows:
+            rule.SPILL_CHUNK_ROWS = spill_chunk_rows
+        rule.apply(data)
+        expected = backend.DataFrame(data=_dedupe_rows(rows, ["A", "B"], keep), astype=astype)
+        assert_frame_equal(data.get_named_output("result"), expected)
+
+
+@pytest.mark.parametrize("keep", ["first", "last", "none"])
+def test_dedupe_rule_hash_collisions_pandas(keep, monkeypatch):
+    import pandas as pd
+    from etlrules.backends.pandas import DedupeRule
+    # all the keys collide, the rule falls back to comparing the keys
+    monkeypatch.setattr(DedupeRule, "_get_hashes", lambda self, df: pd.Series([1] * len(df), dtype="uint64"))
+    input_df = pd.DataFrame(data=DEDUPE_NULLS_INPUT_DF).astype({"A": "Int64", "B": "string", "C": "Int64"})
+    with get_test_data(main_input=input_df, named_output="result") as data:
+        DedupeRule(["A", "B"], keep=keep, named_output="result").apply(data)
+        expected = pd.DataFrame(data=_dedupe_rows(DEDUPE_NULLS_INPUT_DF, ["A", "B"], keep)).astype({"A": "Int64", "B": "string", "C": "Int64"})
+        assert_frame_equal(data.get_named_output("result"), expected)
+
+
+@pytest.mark.parametrize("values,dtype,expected_rows", [
+    [[0.0, -0.0, 1.0, 0.0], "float64", [0, 2]],
+    [[0.0, -0.0, 1.0, None], "Float64", [0, 2, 3]],
+    [[None, float("nan"), "a", None], "object", [0, 1, 2]],
+])
+@pytest.mark.parametrize("spill_partitions", [None, 3])
+def test_dedupe_rule_float_object_keys_pandas(values, dtype, expected_rows, spill_partitions):
+    import pandas as pd
+    from etlrules.backends.pandas import DedupeRule
+    input_df = pd.DataFrame({"A": pd.Series(values, dtype=dtype), "B": list(range(len(values)))})
+    with get_test_data(main_input=input_df, named_output="result") as data:
+        DedupeRule(["A"], spill_partitions=spill_partitions, named_output="result").apply(data)
+        expected = input_df.drop_duplicates(subset=["A"], ignore_index=True)
+        assert list(expected["B"]) == expected_rows
+        assert_frame_equal(data.get_named_output("result"), expected)
+
+
+def test_dedupe_rule_sorted_input_not_sorted(backend):
+    df = backend.DataFrame(data=[
+        {"A": 1, "B": 1, "C": 1},
+        {"A": 2, "B": 3, "C": 4},
+        {"A": 1, "B": 1, "C": 3},
+    ])
+    with get_test_data(df) as data:
+        rule = backend.rules.DedupeRule(["A", "B"], keep='first', sorted_input=True)
+        if backend.name == "dask":
+            rule.apply(data)
+        else:
+            with pytest.raises(ValueError) as exc:
+                rule.apply(data)
+            assert str(exc.value) == "The input dataframe is not sorted by the columns to dedupe on: ['A', 'B']."
+
+
+@pytest.mark.parametrize("strict", [True, False])
+def test_dedupe_rule_sorted_input_descending_nulls_first(strict, backend):
+    rows = sorted(DEDUPE_NULLS_INPUT_DF, key=lambda row: (row["A"] is not None, row["A"] or 0, row["B"] is not None, row["B"] or ""), reverse=True)
+    rows = [row for row in rows if row["A"] is None] + [row for row in rows if row["A"] is not None]
+    astype = {"A": "Int64", "B": "string", "C": "Int64"}
+    with get_test_data(main_input=backend.DataFrame(data=rows, astype=astype), named_output="result") as data:
+        backend.rules.DedupeRule(["A", "B"], keep="first", sorted_input=True, strict=strict, named_output="result").apply(data)
+        expected = backend.DataFrame(data=_dedupe_rows(rows, ["A", "B"], "first"), astype=astype)
+        assert_frame_equal(data.get_named_output("result"), expected)
+
+
+@pytest.mark.parametrize("strict", [True, False])
+def test_dedupe_rule_sorted_input_grouped(strict, backend):
+    if backend.name == "dask":
+        pytest.skip("The dask backend trusts the sorted_input declaration")
+    rows = [{"A": 2, "C": 1}, {"A": 2, "C": 2}, {"A": 1, "C": 3}, {"A": 3, "C": 4}]
+    with get_test_data(main_input=backend.DataFrame(data=rows), named_output="result") as data:
+        rule = backend.rules.DedupeRule(["A"], keep="first", sorted_input=True, strict=strict, named_output="result")
+        if strict:
+            with pytest.raises(ValueError) as exc:
+                rule.apply(data)
+            assert str(exc.value) == "The input dataframe is not sorted by the columns to dedupe on: ['A']."
+        else:
+            rule.apply(data)
+            assert_frame_equal(data.get_named_output("result"), backend.DataFrame(data=[rows[0], rows[2], rows[3]]))
+
+
 @pytest.mark.parametrize("input_column,values,new_values,regex,output_column,input_df,expected", [
     ["A", ["a", "b"], ["new_a", "bb"], False, None, 
         [{"A": "a", "B": 3}, {"A": "aa", "B": 1}],
@@ -256,6 +369,55 @@ def test_replace_scenarios(input_column, values, new_values, regex, output_colum
             assert False
 
 
+@pytest.mark.parametrize("values,new_values,regex,substring,input_df,expected", [
+    [["a(\\d)", "b(?P<n>\\d)", "c"], ["A$1", "B${n}", "C"], True, False,
+        [{"A": "a1b2c3"}, {"A": "xa9c"}, {"A": None}, {"A": "nonce"}],
+        [{"A": "A1B2C3"}, {"A": "xA9C"}, {"A": None}, {"A": "nonCe"}],
+    ],
+    [["a+", "aa"], ["x", "y"], True, False,
+        [{"A": "aaab"}, {"A": "b"}],
+        [{"A": "xb"}, {"A": "b"}],
+    ],
+    [["ab", "b", "a"], ["b", "X", "b"], True, False,
+        [{"A": "aab"}, {"A": "ba"}, {"A": None}],
+        [{"A": "bb"}, {"A": "Xb"}, {"A": None}],
+    ],
+    [["St.", "Rd.", "Ave"], ["Street", "Road", "Avenue"], False, True,
+        [{"A": "1 Main St."}, {"A": "2 Park Rd. and St."}, {"A": None}, {"A": "Stone"}],
+        [{"A": "1 Main Street"}, {"A": "2 Park Road and Street"}, {"A": None}, {"A": "Stone"}],
+    ],
+    [["a", "ab"], ["1", "2"], False, True,
+        [{"A": "abc"}, {"A": "bab"}],
+        [{"A": "1bc"}, {"A": "b1b"}],
+    ],
+    [["a", "b", "c", "d"], ["A", "B", "C", "D"], False, False,
+        [{"A": "a"}, {"A": "b"}, {"A": None}, {"A": "ab"}, {"A": "d"}, {"A": "a"}],
+        [{"A": "A"}, {"A": "B"}, {"A": None}, {"A": "ab"}, {"A": "D"}, {"A": "A"}],
+    ],
+])
+def test_replace_multiple_values(values, new_values, regex, substring, input_df, expected, backend):
+    input_df = backend.DataFrame(data=input_df, astype={"A": "string"})
+    expected = backend.DataFrame(data=expected, astype={"A": "string"})
+    with get_test_data(input_df, named_inputs={"input": input_df}, named_output="result") as data:
+        rule = backend.rules.ReplaceRule("A", values=values, new_values=new_values, regex=regex, substring=substring,
+                                         named_input="input", named_output="result")
+        rule.apply(data)
+        assert_frame_equal(data.get_named_output("result"), expected)
+
+
+@pytest.mark.parametrize("values,new_values,input_df,expected", [
+    [["x", r"(\w)\1"], ["y", r"<\1>"], [{"A": "aabb"}, {"A": "xaax"}, {"A": "abc"}], [{"A": "<a><b>"}, {"A": "y<a>y"}, {"A": "abc"}]],
+    [[r"(\d)\1", r"(?P<c>[a-z])(?P=c)", r"[\1]"], ["D", "C", "?"], [{"A": "11aa\x01"}, {"A": "12ab"}], [{"A": "DC?"}, {"A": "12ab"}]],
+])
+def test_replace_multiple_regexes_backreferences(values, new_values, input_df, expected, backend):
+    input_df = backend.DataFrame(data=input_df, astype={"A": "string"})
+    expected = backend.DataFrame(data=expected, astype={"A": "string"})
+    with get_test_data(input_df, named_inputs={"input": input_df}, named_output="result") as data:
+        rule = backend.rules.ReplaceRule("A", values=values, new_values=new_values, regex=True, named_input="input", named_output="result")
+        rule.apply(data)
+        assert_frame_equal(data.get_named_output("result"), expected)
+
+
 @pytest.mark.parametrize("input_column, column_type, input_df, input_types, expected, expected_types", [
     ["A", "int64", [
         {"A": [1, 2, 3]}, 
@@ -635,11 +635,29 @@ INPUT_ADD_SUB_DF4 = [
         {"A": datetime.datetime(2025, 6, 10, 11, 21, 31, 101), "B": 2},
         {},
     ], None],
+    ["DateTimeAddRule", "A", "B", "years", None, [
+        {"A": datetime.datetime(2016, 2, 29, 10, 20, 30, 100), "B": 5},
+        {"A": datetime.datetime(2020, 2, 29, 11, 21, 31, 101), "B": -4},
+        {"A": datetime.datetime(2020, 2, 29, 11, 21, 31, 101), "B": 1},
+    ], None, [
+        {"A": datetime.datetime(2021, 2, 28, 10, 20, 30, 100), "B": 5},
+        {"A": datetime.datetime(2016, 2, 29, 11, 21, 31, 101), "B": -4},
+        {"A": datetime.datetime(2021, 2, 28, 11, 21, 31, 101), "B": 1},
+    ], None],
     ["DateTimeAddRule", "A", "B", "months", None, INPUT_ADD_SUB_DF4, None, [
         {"A": datetime.datetime(2023, 6, 11, 10, 20, 30, 100), "B": 1},
         {"A": datetime.datetime(2023, 8, 10, 11, 21, 31, 101), "B": 2},
         {},
     ], None],
+    ["DateTimeAddRule", "A", "B", "months", None, [
+        {"A": datetime.datetime(2024, 1, 31, 10, 20, 30, 100), "B": 1},
+        {"A": datetime.datetime(2023, 12, 31, 11, 21, 31, 101), "B": -10},
+        {"A": datetime.datetime(2023, 3, 31, 11, 21, 31, 101), "B": 13},
+    ], None, [
+        {"A": datetime.datetime(2024, 2, 29, 10, 20, 30, 100), "B": 1},
+        {"A": datetime.datetime(2023, 2, 28, 11, 21, 31, 101), "B": -10},
+        {"A": datetime.datetime(2024, 4, 30, 11, 21, 31, 101), "B": 13},
+    ], None],
     ["DateTimeAddRule", "A", "B", "weeks", None, INPUT_ADD_SUB_DF4, None, [
         {"A": datetime.datetime(2023, 5, 18, 10, 20, 30, 100), "B": 1},
         {"A": datetime.datetime(2023, 6, 24, 11, 21, 31, 101), "B": 2},
@@ -161,3 +161,57 @@ def test_missing_group_by_column(rule_cls_str, backend):
         with pytest.raises(MissingColumnError) as exc:
             rule.apply(data)
         assert str(exc.value) == "Missing group_by column(s) in fill operation: {'E'}"
+
+
+@pytest.mark.parametrize("rule_cls_str,expected", [
+    ["ForwardFillRule", [
+        {"A": 1, "G": 1, "D": 1},
+        {"A": 2, "G": None, "D": 2},
+        {"A": 3, "G": 1, "D": 1},
+        {"A": 4, "G": None, "D": 2},
+    ]],
+    ["BackFillRule", [
+        {"A": 1, "G": 1, "D": 1},
+        {"A": 2, "G": None, "D": 2},
+        {"A": 3, "G": 1},
+        {"A": 4, "G": None},
+    ]],
+])
+def test_fill_rule_na_group_by_values(rule_cls_str, expected, backend):
+    sample_df = backend.DataFrame([
+        {"A": 1, "G": 1, "D": 1},
+        {"A": 2, "G": None, "D": 2},
+        {"A": 3, "G": 1},
+        {"A": 4, "G": None},
+    ], astype={"A": "int64", "G": "Int64", "D": "Int64"})
+    expected = backend.DataFrame(expected, astype={"A": "int64", "G": "Int64", "D": "Int64"})
+    with get_test_data(sample_df, named_inputs={"payload": sample_df}, named_output="result") as data:
+        rule = getattr(backend.rules, rule_cls_str)(["D"], sort_by=["A"], group_by=["G"], named_input="payload", named_output="result")
+        rule.apply(data)
+        assert_frame_equal(data.get_named_output("result"), expected, ignore_row_ordering=True)
+
+
+@pytest.mark.parametrize("rule_cls_str,sort_by,sort_ascending,group_by", [
+    ["ForwardFillRule", None, True, None],
+    ["ForwardFillRule", ["A"], False, None],
+    ["ForwardFillRule", ["A"], True, ["G"]],
+    ["BackFillRule", None, True, ["G"]],
+    ["BackFillRule", ["A"], True, None],
+    ["BackFillRule", ["A"], False, ["G"]],
+])
+def test_fill_rule_multiple_partitions_dask(rule_cls_str, sort_by, sort_ascending, group_by):
+    import dask.dataframe as dd
+    import pandas as pd
+    from etlrules.backends import dask as dask_rules
+    from etlrules.backends import pandas as pandas_rules
+    df = pd.DataFrame({
+        "A": [(i * 37) % 100 for i in range(100)],
+        "G": [i % 3 for i in range(100)],
+        "D": [float(i) if i % 11 == 0 else None for i in range(100)],
+    })
+    with get_test_data(df) as data:
+        getattr(pandas_rules, rule_cls_str)(["D"], sort_by, sort_ascending, group_by).apply(data)
+        expected = dd.from_pandas(data.get_main_output(), npartitions=1)
+    with get_test_data(dd.from_pandas(df, npartitions=7, sort=False)) as data:
+        getattr(dask_rules, rule_cls_str)(["D"], sort_by, sort_ascending, group_by).apply(data)
+        assert_frame_equal(data.get_main_output(), expected, ignore_row_ordering=True)
@@ -1,3 +1,5 @@
+import datetime
+import logging
 import pytest
 
 from etlrules.exceptions import MissingColumnError
@@ -70,6 +72,12 @@ RIGHT_DF_TYPES = {"A": "Int64", "B": "string", "E": "Int64", "G": "string"}
         {"A": 3, "B": "b", "C": 10, "D": "test", "E": 5, "A_y": 1, "E_y": 3, "G": "one"},
         {"A": 4, "B": "b", "C": 10, "D": "test", "E": 6, "A_y": 2, "E_y": 4, "G": "two"},
     ]],
+    ["RightJoinRule", ["A", "B"], ["E", "B"], (None, "_y"), [
+        {"A": 3, "B": "b", "C": 10, "D": "test", "E": 5, "A_y": 1, "E_y": 3, "G": "one"},
+        {"A": 4, "B": "b", "C": 10, "D": "test", "E": 6, "A_y": 2, "E_y": 4, "G": "two"},
+        {"B": "b", "A_y": 5, "E_y": 7, "G": "three"},
+        {"B": "b", "A_y": 6, "E_y": 8, "G": "four"},
+    ]],
     ["RightJoinRule", ["A", "B"], None, (None, "_y"), [
         {"A": 1, "B": "b", "C": 10, "D": "test", "E": 3, "E_y": 3, "G": "one"},
         {"A": 2, "B": "b", "C": 10, "D": "test", "E": 4, "E_y": 4, "G": "two"},
@@ -207,3 +215,383 @@ def test_raises_missing_column_right(backend):
         with pytest.raises(MissingColumnError) as exc:
             rule.apply(data)
         assert str(exc.value) == "Missing columns in join in the right dataframe: {'Z'}"
+
+
+@pytest.mark.parametrize("rule_cls_str,key_columns_left,key_columns_right,suffixes", [
+    ["LeftJoinRule", ["A", "B"], None, (None, "_y")],
+    ["LeftJoinRule", ["A"], None, ("_x", "_y")],
+    ["LeftJoinRule", ["A", "B"], None, ("_x", None)],
+    ["InnerJoinRule", ["A", "B"], None, (None, "_y")],
+    ["InnerJoinRule", ["A"], ["A"], ("_x", None)],
+    ["InnerJoinRule", ["E", "B"], ["A", "B"], (None, "_y")],
+    ["RightJoinRule", ["A", "B"], None, ("_x", "_y")],
+    ["OuterJoinRule", ["A", "B"], None, ("_x", "_y")],
+])
+def test_join_with_index(rule_cls_str, key_columns_left, key_columns_right, suffixes, backend):
+    left_df = backend.DataFrame(data=LEFT_DF, astype=LEFT_DF_TYPES)
+    right_df = backend.DataFrame(data=RIGHT_DF, astype=RIGHT_DF_TYPES)
+    rule_cls = getattr(backend.rules, rule_cls_str)
+    with get_test_data(left_df, named_inputs={"right": right_df}) as data:
+        rule_cls(named_input_left=None, named_input_right="right", key_columns_left=key_columns_left,
+                 key_columns_right=key_columns_right, suffixes=suffixes, named_output="expected").apply(data)
+        backend.rules.BuildJoinIndexRule(key_columns_right or key_columns_left, named_input="right", named_output="right_indexed").apply(data)
+        for named_output in ("result1", "result2"):
+            rule_cls(named_input_left=None, named_input_right="right_indexed", key_columns_left=key_columns_left,
+                     key_columns_right=key_columns_right, suffixes=suffixes, named_output=named_output).apply(data)
+            assert_frame_equal(data.get_named_output(named_output), data.get_named_output("expected"), ignore_row_ordering=True)
+
+
+def test_join_with_index_non_unique_keys(backend):
+    left_df = backend.DataFrame(data=LEFT_DF, astype=LEFT_DF_TYPES)
+    right_df = backend.DataFrame(data=RIGHT_DF, astype=RIGHT_DF_TYPES)
+    with get_test_data(left_df, named_inputs={"right": right_df}) as data:
+        backend.rules.BuildJoinIndexRule(["B"], named_input="right", named_output="right_indexed").apply(data)
+        backend.rules.InnerJoinRule(named_input_left=None, named_input_right="right", key_columns_left=["B"],
+                                    named_output="expected").apply(data)
+        backend.rules.InnerJoinRule(named_input_left=None, named_input_right="right_indexed", key_columns_left=["B"],
+                                    named_output="result").apply(data)
+        assert_frame_equal(data.get_named_output("result"), data.get_named_output("expected"), ignore_row_ordering=True)
+
+
+def test_build_join_index_pandas():
+    from etlrules.backends.common.joins import JoinIndexes
+    from etlrules.backends.pandas import BuildJoinIndexRule
+    import pandas as pd
+    right_df = pd.DataFrame(data=RIGHT_DF).astype(RIGHT_DF_TYPES)
+    with get_test_data(named_inputs={"right": right_df}) as data:
+        BuildJoinIndexRule(["A", "B"], named_input="right", named_output="right_indexed").apply(data)
+        assert data.get_named_output("right_indexed") is right_df
+        assert JoinIndexes.get(right_df, ["A", "B"]) is not None
+        assert JoinIndexes.get(right_df, ["A"]) is None
+
+
+def test_build_join_index_missing_column(backend):
+    right_df = backend.DataFrame(data=RIGHT_DF)
+    with get_test_data(named_inputs={"right": right_df}) as data:
+        rule = backend.rules.BuildJoinIndexRule(["A", "Z"], named_input="right")
+        with pytest.raises(MissingColumnError) as exc:
+            rule.apply(data)
+        assert str(exc.value) == "Missing columns in join index: {'Z'}"
+
+
+@pytest.mark.parametrize("rule_cls_str", ["LeftJoinRule", "InnerJoinRule", "OuterJoinRule", "RightJoinRule"])
+@pytest.mark.parametrize("suffixes", [(None, "_y"), ("_x", "_y"), ("_x", None)])
+@pytest.mark.parametrize("key_column", ["A", "E"])
+def test_join_sorted_input(rule_cls_str, suffixes, key_column, backend):
+    left_df = backend.DataFrame(data=LEFT_DF, astype=LEFT_DF_TYPES)
+    right_df = backend.DataFrame(data=RIGHT_DF, astype=RIGHT_DF_TYPES)
+    rule_cls = getattr(backend.rules, rule_cls_str)
+    with get_test_data(left_df, named_inputs={"right": right_df}) as data:
+        rule_cls(named_input_left=None, named_input_right="right", key_columns_left=[key_column],
+                 suffixes=suffixes, named_output="expected").apply(data)
+        rule_cls(named_input_left=None, named_input_right="right", key_columns_left=[key_column],
+                 suffixes=suffixes, sorted_input=True, named_output="result").apply(data)
+        assert list(data.get_named_output("result").columns) == list(data.get_named_output("expected").columns)
+        assert_frame_equal(data.get_named_output("result"), data.get_named_output("expected"), ignore_row_ordering=True)
+
+
+@pytest.mark.parametrize("strict", [True, False])
+def test_join_sorted_input_not_sorted(strict, backend):
+    if backend.name == "dask":
+        pytest.skip("The dask backend trusts the sorted_input declaration")
+    left_df = backend.DataFrame(data=list(reversed(LEFT_DF)), astype=LEFT_DF_TYPES)
+    right_df = backend.DataFrame(data=RIGHT_DF, astype=RIGHT_DF_TYPES)
+    with get_test_data(left_df, named_inputs={"right": right_df}) as data:
+        backend.rules.LeftJoinRule(named_input_left=None, named_input_right="right", key_columns_left=["A"],
+                                   named_output="expected").apply(data)
+        rule = backend.rules.LeftJoinRule(named_input_left=None, named_input_right="right", key_columns_left=["A"],
+                                          sorted_input=True, named_output="result", strict=strict)
+        if strict:
+            with pytest.raises(ValueError) as exc:
+                rule.apply(data)
+            assert str(exc.value) == "The input dataframes are not sorted by the join keys (or the keys contain nulls): ['A'] and ['A']."
+        else:
+            rule.apply(data)
+            assert_frame_equal(data.get_named_output("result"), data.get_named_output("expected"), ignore_row_ordering=True)
+
+
+ASOF_LEFT_DF = [
+    {"T": 1, "S": "x", "V": 1},
+    {"T": 5, "S": "y", "V": 2},
+    {"T": 10, "S": "x", "V": 3},
+    {"T": 11, "S": "y", "V": 4},
+    {"T": 20, "S": "x", "V": 5},
+]
+ASOF_RIGHT_DF = [
+    {"T": 0, "S": "x", "V": 10},
+    {"T": 4, "S": "x", "V": 20},
+    {"T": 9, "S": "y", "V": 30},
+    {"T": 10, "S": "x", "V": 40},
+    {"T": 15, "S": "y", "V": 50},
+]
+
+
+@pytest.mark.parametrize("key_column_right,by_columns_left,direction,tolerance,suffixes,expected", [
+    [None, None, "backward", None, (None, "_r"), [
+        {"T": 1, "S": "x", "V": 1, "S_r": "x", "V_r": 10},
+        {"T": 5, "S": "y", "V": 2, "S_r": "x", "V_r": 20},
+        {"T": 10, "S": "x", "V": 3, "S_r": "x", "V_r": 40},
+        {"T": 11, "S": "y", "V": 4, "S_r": "x", "V_r": 40},
+        {"T": 20, "S": "x", "V": 5, "S_r": "y", "V_r": 50},
+    ]],
+    [None, ["S"], "backward", None, ("_l", "_r"), [
+        {"T": 1, "S": "x", "V_l": 1, "V_r": 10},
+        {"T": 5, "S": "y", "V_l": 2},
+        {"T": 10, "S": "x", "V_l": 3, "V_r": 40},
+        {"T": 11, "S": "y", "V_l": 4, "V_r": 30},
+        {"T": 20, "S": "x", "V_l": 5, "V_r": 40},
+    ]],
+    [None, ["S"], "forward", None, (None, "_r"), [
+        {"T": 1, "S": "x", "V": 1, "V_r": 20},
+        {"T": 5, "S": "y", "V": 2, "V_r": 30},
+        {"T": 10, "S": "x", "V": 3, "V_r": 40},
+        {"T": 11, "S": "y", "V": 4, "V_r": 50},
+        {"T": 20, "S": "x", "V": 5},
+    ]],
+    [None, ["S"], "nearest", 3, (None, "_r"), [
+        {"T": 1, "S": "x", "V": 1, "V_r": 10},
+        {"T": 5, "S": "y", "V": 2},
+        {"T": 10, "S": "x", "V": 3, "V_r": 40},
+        {"T": 11, "S": "y", "V": 4, "V_r": 30},
+        {"T": 20, "S": "x", "V": 5},
+    ]],
+    ["T2", ["S"], "backward", 5, (None, "_r"), [
+        {"T": 1, "S": "x", "V": 1, "T2": 0, "V_r": 10},
+        {"T": 5, "S": "y", "V": 2},
+        {"T": 10, "S": "x", "V": 3, "T2": 10, "V_r": 40},
+        {"T": 11, "S": "y", "V": 4, "T2": 9, "V_r": 30},
+        {"T": 20, "S": "x", "V": 5},
+    ]],
+])
+def test_asof_join_scenarios(key_column_right, by_columns_left, direction, tolerance, suffixes, expected, backend):
+    left_df = backend.DataFrame(data=list(reversed(ASOF_LEFT_DF)))
+    right_df = backend.DataFrame(data=ASOF_RIGHT_DF)
+    if key_column_right:
+        right_df = backend.rename(right_df, {"T": key_column_right})
+    expected = backend.DataFrame(data=expected)
+    with get_test_data(left_df, named_inputs={"right": right_df}, named_output="result") as data:
+        rule = backend.rules.AsOfJoinRule(named_input_left=None, named_input_right="right", key_column_left="T",
+                                          key_column_right=key_column_right, by_columns_left=by_columns_left,
+                                          direction=direction, tolerance=tolerance, suffixes=suffixes, named_output="result")
+        rule.apply(data)
+        assert_frame_equal(data.get_named_output("result"), expected, ignore_column_ordering=True)
+
+
+def test_asof_join_datetime_tolerance(backend):
+    left_df = backend.DataFrame(data=[
+        {"T": datetime.datetime(2024, 1, 1, 10, 0, 5), "V": 1},
+        {"T": datetime.datetime(2024, 1, 1, 10, 1, 0), "V": 2},
+    ])
+    right_df = backend.DataFrame(data=[
+        {"T": datetime.datetime(2024, 1, 1, 10, 0, 0), "Q": 10},
+        {"T": datetime.datetime(2024, 1, 1, 10, 0, 50), "Q": 20},
+    ])
+    expected = backend.DataFrame(data=[
+        {"T": datetime.datetime(2024, 1, 1, 10, 0, 5), "V": 1, "Q": 10},
+        {"T": datetime.datetime(2024, 1, 1, 10, 1, 0), "V": 2},
+    ])
+    with get_test_data(left_df, named_inputs={"right": right_df}) as data:
+        rule = backend.rules.AsOfJoinRule(named_input_left=None, named_input_right="right", key_column_left="T",
+                                          tolerance="5s", sorted_input=True)
+        rule.apply(data)
+        assert_frame_equal(data.get_main_output(), expected)
+
+
+def test_asof_join_missing_column(backend):
+    left_df = backend.DataFrame(data=ASOF_LEFT_DF)
+    right_df = backend.DataFrame(data=ASOF_RIGHT_DF)
+    with get_test_data(left_df, named_inputs={"right": right_df}) as data:
+        rule = backend.rules.AsOfJoinRule(named_input_left=None, named_input_right="right", key_column_left="T",
+                                          by_columns_left=["S"], by_columns_right=["Z"])
+        with pytest.raises(MissingColumnError) as exc:
+            rule.apply(data)
+        assert str(exc.value) == "Missing columns in join in the right dataframe: {'Z'}"
+
+
+@pytest.mark.parametrize("rule_cls_str", ["LeftJoinRule", "InnerJoinRule", "OuterJoinRule", "RightJoinRule"])
+@pytest.mark.parametrize("strategy", [None, "hash", "merge", "index", "broadcast"])
+def test_join_strategy(rule_cls_str, strategy, backend, caplog):
+    left_df = backend.DataFrame(data=LEFT_DF, astype=LEFT_DF_TYPES)
+    right_df = backend.DataFrame(data=RIGHT_DF, astype=RIGHT_DF_TYPES)
+    rule_cls = getattr(backend.rules, rule_cls_str)
+    with get_test_data(left_df, named_inputs={"right": right_df}) as data:
+        rule_cls(named_input_left=None, named_input_right="right", key_columns_left=["A"], named_output="expected").apply(data)
+        backend.rules.BuildJoinIndexRule(["A"], named_input="right", named_output="right_indexed").apply(data)
+        with caplog.at_level(logging.INFO, logger="etlrules.perf"):
+            rule_cls(named_input_left=None, named_input_right="right_indexed", key_columns_left=["A"],
+                     strategy=strategy, name="join", named_output="result").apply(data)
+        assert_frame_equal(data.get_named_output("result"), data.get_named_output("expected"),
+                           ignore_column_ordering=True, ignore_row_ordering=True)
+        assert len(caplog.records) == 1
+        assert caplog.records[0].getMessage().startswith(f"join: {rule_cls.JOIN_TYPE} join on ['A'] using the ")
+
+
+def _get_broadcast_test_dfs():
+    import pandas as pd
+    left_df = pd.DataFrame({"A": list(range(100)), "B": [i % 7 for i in range(100)]})
+    right_df = pd.DataFrame({"A": list(range(0, 200, 3)), "C": [i % 5 for i in range(0, 200, 3)]})
+    return left_df, right_df
+
+
+def _assert_join_strategy_dask(rule_cls_str, left_df, right_df, expected, expected_strategy, caplog, **attrs):
+    from etlrules.backends import dask as dask_rules
+    with get_test_data(left_df, named_inputs={"right": right_df}) as data:
+        rule = getattr(dask_rules, rule_cls_str)(named_input_left=None, named_input_right="right", key_columns_left=["A"])
+        for attr, value in attrs.items():
+            setattr(rule, attr, value)
+        with caplog.at_level(logging.INFO, logger="etlrules.perf"):
+            rule.apply(data)
+        assert caplog.records[0].getMessage().endswith(f"using the {expected_strategy} strategy.")
+        assert_frame_equal(data.get_main_output(), expected, ignore_row_ordering=True)
+
+
+@pytest.mark.parametrize("rule_cls_str,npartitions_left,npartitions_right,expected_strategy", [
+    ["LeftJoinRule", 8, 1, "broadcast"],
+    ["LeftJoinRule", 1, 8, "hash"],
+    ["RightJoinRule", 1, 8, "broadcast"],
+    ["InnerJoinRule", 1, 8, "broadcast"],
+    ["InnerJoinRule", 8, 1, "broadcast"],
+    ["InnerJoinRule", 4, 4, "hash"],
+    ["OuterJoinRule", 8, 1, "hash"],
+])
+def test_join_strategy_broadcast_partitions_dask(rule_cls_str, npartitions_left, npartitions_right, expected_strategy, caplog):
+    import dask.dataframe as dd
+    from etlrules.backends import dask as dask_rules
+    left_df, right_df = _get_broadcast_test_dfs()
+    expected = dd.from_pandas(left_df.merge(right_df, how=getattr(dask_rules, rule_cls_str).JOIN_TYPE, on="A"), npartitions=1)
+    # the memory size of the derived dataframes is not known, the partitions decide the strategy
+    left_df = dd.from_pandas(left_df, npartitions=npartitions_left, sort=False).map_partitions(lambda df: df)
+    right_df = dd.from_pandas(right_df, npartitions=npartitions_right, sort=False).map_partitions(lambda df: df)
+    _assert_join_strategy_dask(rule_cls_str, left_df, right_df, expected, expected_strategy, caplog)
+
+
+@pytest.mark.parametrize("rule_cls_str,max_bytes,expected_strategy", [
+    ["LeftJoinRule", 1024 * 1024, "broadcast"],
+    ["LeftJoinRule", 100, "hash"],
+    ["RightJoinRule", 1024 * 1024, "broadcast"],
+    ["InnerJoinRule", 1024 * 1024, "broadcast"],
+    ["InnerJoinRule", 100, "hash"],
+    ["OuterJoinRule", 1024 * 1024, "hash"],
+])
+@pytest.mark.parametrize("source", ["pandas", "parquet"])
+def test_join_strategy_broadcast_memory_size_dask(rule_cls_str, max_bytes, expected_strategy, source, tmp_path, caplog):
+    import dask.dataframe as dd
+    from etlrules.backends import dask as dask_rules
+    left_df, right_df = _get_broadcast_test_dfs()
+    expected = dd.from_pandas(left_df.merge(right_df, how=getattr(dask_rules, rule_cls_str).JOIN_TYPE, on="A"), npartitions=1)
+    # the sides have the same number of partitions, their memory size decides the strategy
+    left_df = dd.from_pandas(left_df, npartitions=4, sort=False)
+    right_df = dd.from_pandas(right_df, npartitions=4, sort=False)
+    if source == "parquet":
+        left_df.to_parquet(str(tmp_path / "left"), write_index=False)
+        right_df.to_parquet(str(tmp_path / "right"), write_index=False)
+        left_df, right_df = dd.read_parquet(str(tmp_path / "left")), dd.read_parquet(str(tmp_path / "right"))
+    _assert_join_strategy_dask(rule_cls_str, left_df, right_df, expected, expected_strategy, caplog, BROADCAST_MAX_BYTES=max_bytes)
+
+
+def test_join_strategy_broadcast_inner_build_side_dask(caplog):
+    import dask.dataframe as dd
+    left_df, right_df = _get_broadcast_test_dfs()
+    expected = dd.from_pandas(left_df.merge(right_df, how="inner", on="A"), npartitions=1)
+    # the right side is smaller in memory but has more partitions, it is still the side broadcast
+    left_df = dd.from_pandas(left_df, npartitions=2, sort=False)
+    right_df = dd.from_pandas(right_df, npartitions=8, sort=False)
+    with get_test_data(left_df, named_inputs={"right": right_df}) as data:
+        from etlrules.backends import dask as dask_rules
+        rule = dask_rules.InnerJoinRule(named_input_left=None, named_input_right="right", key_columns_left=["A"])
+        with caplog.at_level(logging.INFO, logger="etlrules.perf"):
+            rule.apply(data)
+        assert caplog.records[0].getMessage().endswith("using the broadcast strategy.")
+        result = data.get_main_output()
+        assert result.npartitions == left_df.npartitions
+        assert list(result.columns) == ["A", "B", "C"]
+        assert_frame_equal(result, expected, ignore_row_ordering=True)
+
+
+SEMI_LEFT_DF = [
+    {"A": 1, "B": "b", "C": 10},
+    {"A": 2, "B": "b", "C": 11},
+    {"A": 3, "B": "c", "C": 12},
+    {"A": None, "B": "c", "C": 13},
+    {"A": 1, "B": "b", "C": 14},
+]
+SEMI_RIGHT_DF = [
+    {"A": 1, "B": "b", "D": "one"},
+    {"A": 1, "B": "b", "D": "one again"},
+    {"A": 3, "B": "b", "D": "three"},
+    {"A": None, "B": "c", "D": "null"},
+]
+SEMI_LEFT_DF_TYPES = {"A": "Int64", "B": "string", "C": "Int64"}
+SEMI_RIGHT_DF_TYPES = {"A": "Int64", "B": "string", "D": "string"}
+
+
+@pytest.mark.parametrize("rule_cls_str,key_columns_left,key_columns_right,bloom_filter,expected", [
+    ["SemiJoinRule", ["A"], None, False, [
+        {"A": 1, "B": "b", "C": 10},
+        {"A": 3, "B": "c", "C": 12},
+        {"A": 1, "B": "b", "C": 14},
+    ]],
+    ["SemiJoinRule", ["A", "B"], None, False, [
+        {"A": 1, "B": "b", "C": 10},
+        {"A": 1, "B": "b", "C": 14},
+    ]],
+    ["SemiJoinRule", ["C"], ["A"], False, []],
+    ["SemiJoinRule", ["A", "B"], None, True, [
+        {"A": 1, "B": "b", "C": 10},
+        {"A": 1, "B": "b", "C": 14},
+    ]],
+    ["AntiJoinRule", ["A"], None, False, [
+        {"A": 2, "B": "b", "C": 11},
+        {"A": None, "B": "c", "C": 13},
+    ]],
+    ["AntiJoinRule", ["A", "B"], None, False, [
+        {"A": 2, "B": "b", "C": 11},
+        {"A": 3, "B": "c", "C": 12},
+        {"A": None, "B": "c", "C": 13},
+    ]],
+    ["AntiJoinRule", ["A"], ["A"], True, [
+        {"A": 2, "B": "b", "C": 11},
+        {"A": None, "B": "c", "C": 13},
+    ]],
+])
+def test_semi_anti_join_scenarios(rule_cls_str, key_columns_left, key_columns_right, bloom_filter, expected, backend):
+    left_df = backend.DataFrame(data=SEMI_LEFT_DF, astype=SEMI_LEFT_DF_TYPES)
+    right_df = backend.DataFrame(data=SEMI_RIGHT_DF, astype=SEMI_RIGHT_DF_TYPES)
+    expected = backend.DataFrame(data=expected or {"A": [], "B": [], "C": []}, astype=SEMI_LEFT_DF_TYPES)
+    rule_cls = getattr(backend.rules, rule_cls_str)
+    with get_test_data(left_df, named_inputs={"right": right_df}) as data:
+        rule = rule_cls(named_input_left=None, named_input_right="right", key_columns_left=key_columns_left,
+                        key_columns_right=key_columns_right, bloom_filter=bloom_filter)
+        rule.apply(data)
+        assert_frame_equal(data.get_main_output(), expected, ignore_row_ordering=True)
+
+
+@pytest.mark.parametrize("rule_cls_str", ["SemiJoinRule", "AntiJoinRule"])
+@pytest.mark.parametrize("npartitions_left,npartitions_right", [(8, 2), (2, 8)])
+@pytest.mark.parametrize("float_side", ["left", "right"])
+def test_semi_anti_join_bloom_filter_dask(rule_cls_str, npartitions_left, npartitions_right, float_side):
+    import dask.dataframe as dd
+    import pandas as pd
+    from etlrules.backends import dask as dask_rules
+    if float_side == "right":
+        left_df = pd.DataFrame({"A": list(range(1000)), "B": [i % 7 for i in range(1000)]})
+        right_df = pd.DataFrame({"K": [float(i) for i in range(0, 2000, 3)] + [None]})
+    else:
+        # the float keys with nulls against int keys
+        left_df = pd.DataFrame({"A": [float(i) if i % 10 else None for i in range(1000)], "B": [i % 7 for i in range(1000)]})
+        right_df = pd.DataFrame({"K": list(range(0, 2000, 3))})
+    matched = left_df["A"].isin(right_df["K"].dropna())
+    expected = left_df[matched if rule_cls_str == "SemiJoinRule" else ~matched].reset_index(drop=True)
+    with get_test_data(dd.from_pandas(left_df, npartitions=npartitions_left), named_inputs={"right": dd.from_pandas(right_df, npartitions=npartitions_right)}) as data:
+        getattr(dask_rules, rule_cls_str)(named_input_left=None, named_input_right="right", key_columns_left=["A"],
+                                          key_columns_right=["K"], bloom_filter=True).apply(data)
+        assert_frame_equal(data.get_main_output(), dd.from_pandas(expected, npartitions=1), ignore_row_ordering=True)
+
+
+def test_bloom_filter():
+    import numpy as np
+    from etlrules.backends.dask.joins import BloomFilter
+    hashes = np.random.default_rng(1).integers(0, 2 ** 63, 10000, dtype=np.uint64)
+    bloom_filter = BloomFilter(hashes[:5000], false_positive_rate=0.01)
+    assert bloom_filter.might_contain(hashes[:5000]).all()
+    assert bloom_filter.might_contain(hashes[5000:]).mean() < 0.02
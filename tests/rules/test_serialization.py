@@ -14,9 +14,12 @@ class SomeTestRule(BaseRule):
 
 ALL_RULES = [
     ["DedupeRule", dict(columns=["A", "B"], named_input="Dedupe1", named_output="Dedupe2", name="Deduplicate", description="Some text", strict=True)],
+    ["DedupeRule", dict(columns=["A", "B"], keep="last", sorted_input=True, spill_partitions=8, named_input="Dedupe1", named_output="Dedupe2", name="Deduplicate", description="Some text", strict=True)],
     ["ProjectRule", dict(columns=["A", "B"], named_input="PR1", named_output="PR2", name="Project", description="Remove some cols", strict=False)],
     ["RenameRule", dict(mapper={"A": "B"}, named_input="RN1", named_output="RN2", name="Rename", description="Some desc", strict=True)],
     ["SortRule", dict(sort_by=["A", "B"], named_input="SR1", named_output="SR2", name="Sort", description="Some desc2", strict=True)],
+    ["SortRule", dict(sort_by=["A", "B"], ascending=[True, False], max_memory_mb=512, named_input="SR1", named_output="SR2", name="Sort", description="Some desc2", strict=True)],
+    ["TopNRule", dict(n=5, sort_by=["A", "B"], ascending=[True, False], group_by=["C"], named_input="TN1", named_output="TN2", name="TopN", description="Some desc2", strict=True)],
     ["TypeConversionRule", dict(mapper={"A": "int64"}, named_input="TC1", named_output="TC2", name="Convert", description=None, strict=False)],
     ["RulesBlock", dict(
         rules=[
@@ -35,11 +38,20 @@ ALL_RULES = [
                 key_columns_left=["A", "D"], key_columns_right=["A", "B"], suffixes=["_x", None],
                 named_output="IJ2", name="InnerJoinRule", description="Some desc2", strict=True)],
     ["OuterJoinRule", dict(named_input_left="left3", named_input_right="right3",
-                key_columns_left=["A", "E"], key_columns_right=["A", "B"], suffixes=[None, "_y"],
+                key_columns_left=["A", "E"], key_columns_right=["A", "B"], suffixes=[None, "_y"], strategy="broadcast",
                 named_output="OJ2", name="OuterJoinRule", description="Some desc3", strict=True)],
     ["RightJoinRule", dict(named_input_left="left4", named_input_right="right4",
-                key_columns_left=["A", "F"], suffixes=["_x", "_y"],
+                key_columns_left=["A", "F"], suffixes=["_x", "_y"], sorted_input=True,
                 named_output="RJ2", name="RightJoinRule", description="Some desc4", strict=True)],
+    ["AsOfJoinRule", dict(named_input_left="left5", named_input_right="right5", key_column_left="T", key_column_right="T2",
+                by_columns_left=["A"], by_columns_right=["B"], direction="nearest", tolerance="5s", sorted_input=True,
+                suffixes=["_x", "_y"], named_output="AJ2", name="AsOfJoinRule", description="Some desc5", strict=True)],
+    ["SemiJoinRule", dict(named_input_left="left6", named_input_right="right6", key_columns_left=["A", "B"],
+                key_columns_right=["C", "D"], bloom_filter=True, named_output="SJ2", name="SemiJoinRule", description="Some desc6", strict=True)],
+    ["AntiJoinRule", dict(named_input_left="left7", named_input_right="right7", key_columns_left=["A"],
+                named_output="AJ3", name="AntiJoinRule", description="Some desc7", strict=False)],
+    ["BuildJoinIndexRule", dict(key_columns=["A", "B"], named_input="dim1", named_output="dim2",
+                name="BuildJoinIndexRule", description="Some desc5", strict=True)],
     ["ForwardFillRule", dict(columns=["A", "B"], sort_by=["C", "D"], sort_ascending=False, group_by=["Z", "X"],
                     named_input="FF1", named_output="FF2", name="FF", description="Some desc2 FF", strict=True)],
     ["BackFillRule", dict(columns=["A", "C"], sort_by=["E", "F"], sort_ascending=True, group_by=["Y", "X"], 
@@ -56,6 +68,17 @@ ALL_RULES = [
         aggregation_expressions=None,
         aggregation_types={"E": "string", "D": "int64"},
         named_input="BF1", named_output="BF2", name="BF", description="Some desc2 BF", strict=True)],
+    ["AggregateRule", dict(
+        group_by=["A", "Col B"],
+        aggregations={"D": "mean", "E": "first", "F": "list"},
+        aggregation_types={"D": "float64"},
+        state_file="/home/myuser/agg_state.parquet",
+        named_input="BF1", named_output="BF2", name="BF", description="Some desc2 BF", strict=True)],
+    ["AggregateRule", dict(
+        group_by=["A", "Col B"],
+        aggregations={"D": "sum", "E": "max"},
+        grouping_sets={"by_a": ["A"], "by_col_b": ["Col B"]},
+        named_input="BF1", named_output="BF2", name="BF", description="Some desc2 BF", strict=True)],
     ["RoundRule", dict(input_column="A", scale=2, output_column="E", named_input="input", 
                 named_output="result", name="BF", description="Some desc2 BF", strict=True)],
     ["AbsRule", dict(input_column="B", output_column="F", named_input="input", 
@@ -82,6 +105,8 @@ ALL_RULES = [
                 named_output="result", name="BF", description="Some desc2 BF", strict=True)],
     ["ReplaceRule", dict(input_column="B", values=["a.*d", "a.c"], new_values=[r"\1", r"a_\1_b"], regex=True, output_column="F", named_input="input", 
                 named_output="result", name="BF", description="Some desc2 BF", strict=True)],
+    ["ReplaceRule", dict(input_column="B", values=["St.", "Rd."], new_values=["Street", "Road"], regex=False, output_column="F", substring=True, named_input="input",
+                named_output="result", name="BF", description="Some desc2 BF", strict=True)],
     ["StrExtractRule", dict(input_column="B", regular_expression="a(.*)d", keep_original_value=True, output_columns=["F"], named_input="input", 
                 named_output="result", name="BF", description="Some desc2 BF", strict=True)],
     ["IfThenElseRule", dict(condition_expression="df['A'] > df['B']", output_column="O", then_value="A is greater", else_value="B is greater", named_input="input", 
@@ -116,16 +141,30 @@ ALL_RULES = [
                 named_output="result", name="BF", description="Some desc2 BF", strict=True)],
     ["ReadCSVFileRule", dict(file_name="test.csv", file_dir="/home/myuser", regex=False, separator=",", header=True, 
                 named_output="result", name="BF", description="Some desc2 BF", strict=True)],
+    ["ReadCSVFileRule", dict(file_name="test.*\\.csv", file_dir="/home/myuser", regex=True, separator=",", header=True,
+                incremental_state_file="/home/myuser/state.json", incremental_checksum=True, incremental_empty_result=True,
+                named_output="result", name="BF", description="Some desc2 BF", strict=True)],
     ["ReadParquetFileRule", dict(file_name="test.csv", file_dir="/home/myuser", regex=False, columns=["A", "B", "C"], filters=[["A", ">=", 10], ["B", "==", True]], 
                 named_output="result", name="BF", description="Some desc2 BF", strict=True)],
+    ["ReadJSONLinesFileRule", dict(file_name="test.*\\.jsonl", file_dir="/home/myuser", regex=True, column_types={"A": "int64", "B": "string"}, block_size=1 << 20,
+                named_output="result", name="BF", description="Some desc2 BF", strict=True)],
+    ["WriteJSONLinesFileRule", dict(file_name="test.jsonl", file_dir="/home/myuser", chunk_size=1000,
+                named_input="result", name="BF", description="Some desc2 BF", strict=True)],
     ["WriteCSVFileRule", dict(file_name="test.csv.gz", file_dir="/home/myuser", separator=",", header=True, compression="gzip",
                 named_input="result", name="BF", description="Some desc2 BF", strict=True)],
     ["WriteParquetFileRule", dict(file_name="test.csv", file_dir="/home/myuser", compression="gzip", 
                 named_input="result", name="BF", description="Some desc2 BF", strict=True)],
     ["ReadSQLQueryRule", dict(sql_engine="sqlite:///mydb.db", sql_query="SELECT * FROM MyTable", named_output="MyData", name="BF", description="Some desc2 BF", strict=True)],
+    ["ReadSQLQueryRule", dict(sql_engine="sqlite:///mydb.db", sql_query="SELECT * FROM MyTable", watermark_column="Id", watermark_state_file="/home/myuser/wm.json",
+                watermark_lookback=10, named_output="MyData", name="BF", description="Some desc2 BF", strict=True)],
+    ["SQLLookupJoinRule", dict(sql_engine="sqlite:///mydb.db", sql_table="MyTable", key_columns=["A", "B"], lookup_key_columns=["Id", "Name"], lookup_columns=["C"],
+                               join_type="inner", batch_size=500, temp_table_threshold=10000, suffixes=["_x", "_y"], named_input="input", named_output="result", name="BF", description="Some desc2 BF", strict=True)],
     ["WriteSQLTableRule", dict(sql_engine="sqlite:///mydb.db", sql_table="MyTable", if_exists="append", named_input="input_data", name="BF", description="Some desc2 BF", strict=True)],
+    ["WriteSQLTableRule", dict(sql_engine="sqlite:///mydb.db", sql_table="MyTable", if_exists="upsert", key_columns=["A", "B"], named_input="input_data", name="BF", description="Some desc2 BF", strict=True)],
     ["ExplodeValuesRule", dict(input_column="to_explode", column_type="int64", named_input="input", named_output="result", name="name", description="description", strict=True)],
     ["AddRowNumbersRule", dict(output_column="row_number", start=10, step=1, named_input="input", named_output="result", name="name", description="description", strict=True)],
+    ["WindowRule", dict(windows={"Total": {"function": "cumsum", "column": "A"}, "Sum": {"function": "rolling_sum", "column": "A", "window": "7d", "min_periods": 2}},
+                        partition_by=["B"], order_by=["C"], ascending=True, named_input="input", named_output="result", name="name", description="description", strict=True)],
 
     ["SomeTestRule", dict(named_output="result", name="name", description="description", strict=True)],
 ]
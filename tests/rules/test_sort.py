@@ -60,3 +60,95 @@ def test_name_description(backend):
     rule = backend.rules.SortRule(["A", "B", "C"], name="Rule 1", description="This is the documentation for the rule")
     assert rule.get_name() == "Rule 1"
     assert rule.get_description() == "This is the documentation for the rule"
+
+
+@pytest.mark.parametrize("sort_by,ascending", [
+    ["A", True],
+    [["A", "B"], False],
+    [["B", "A", "C"], [True, False, True]],
+])
+def test_sort_rule_external(sort_by, ascending, backend):
+    rows = [{"A": (idx * 7919) % 13, "B": f"b{(idx * 104729) % 5}", "C": idx} for idx in range(500)]
+    df = backend.DataFrame(data=rows)
+    with get_test_data(df, named_inputs={"input": df}, named_output="result") as data:
+        rule = backend.rules.SortRule(sort_by, ascending=ascending, max_memory_mb=0.002, named_input="input", named_output="result")
+        rule.apply(data)
+        expected_rule = backend.rules.SortRule(sort_by, ascending=ascending, named_input="input", named_output="expected")
+        expected_rule.apply(data)
+        columns = sort_by if isinstance(sort_by, list) else [sort_by]
+        result = data.get_named_output("result")
+        expected = data.get_named_output("expected")
+        assert_frame_equal(result[columns], expected[columns])
+        # rows with the same sort keys can be in a different order
+        full_sort = backend.rules.SortRule(["A", "B", "C"])
+        assert_frame_equal(full_sort.do_sort(result), full_sort.do_sort(expected))
+
+
+TOP_N_INPUT = [
+    {"Id": 1, "A": 5, "B": "b", "C": 1},
+    {"Id": 2, "A": 9, "B": "a", "C": 2},
+    {"Id": 1, "A": 3, "B": "c", "C": 3},
+    {"Id": 2, "A": 7, "B": "d", "C": 4},
+    {"Id": 1, "A": 8, "B": "e", "C": 5},
+    {"Id": 3, "A": 1, "B": "f", "C": 6},
+    {"Id": 2, "A": 2, "B": "g", "C": 7},
+]
+
+
+@pytest.mark.parametrize("n,sort_by,ascending,group_by,expected", [
+    [2, "A", False, None, [{"Id": 2, "A": 9, "B": "a", "C": 2}, {"Id": 1, "A": 8, "B": "e", "C": 5}]],
+    [3, ["A"], True, None, [{"Id": 3, "A": 1, "B": "f", "C": 6}, {"Id": 2, "A": 2, "B": "g", "C": 7}, {"Id": 1, "A": 3, "B": "c", "C": 3}]],
+    [2, "B", False, None, [{"Id": 2, "A": 2, "B": "g", "C": 7}, {"Id": 3, "A": 1, "B": "f", "C": 6}]],
+    [2, ["Id", "A"], [True, False], None, [{"Id": 1, "A": 8, "B": "e", "C": 5}, {"Id": 1, "A": 5, "B": "b", "C": 1}]],
+    [10, "C", True, None, TOP_N_INPUT],
+    [1, "A", False, ["Id"], [{"Id": 2, "A": 9, "B": "a", "C": 2}, {"Id": 1, "A": 8, "B": "e", "C": 5}, {"Id": 3, "A": 1, "B": "f", "C": 6}]],
+    [2, "C", True, ["Id"], [
+        {"Id": 1, "A": 5, "B": "b", "C": 1}, {"Id": 2, "A": 9, "B": "a", "C": 2}, {"Id": 1, "A": 3, "B": "c", "C": 3},
+        {"Id": 2, "A": 7, "B": "d", "C": 4}, {"Id": 3, "A": 1, "B": "f", "C": 6},
+    ]],
+    [1, ["B", "A"], [False, True], ["Id"], [{"Id": 2, "A": 2, "B": "g", "C": 7}, {"Id": 3, "A": 1, "B": "f", "C": 6}, {"Id": 1, "A": 8, "B": "e", "C": 5}]],
+])
+def test_top_n_rule(n, sort_by, ascending, group_by, expected, backend):
+    df = backend.DataFrame(data=TOP_N_INPUT)
+    with get_test_data(df, named_inputs={"input": df}, named_output="result") as data:
+        rule = backend.rules.TopNRule(n, sort_by, ascending=ascending, group_by=group_by, named_input="input", named_output="result")
+        rule.apply(data)
+        assert_frame_equal(data.get_named_output("result"), backend.DataFrame(data=expected))
+
+
+@pytest.mark.parametrize("ascending", [False, True])
+@pytest.mark.parametrize("group_by", [None, ["Id"]])
+def test_top_n_rule_nulls(ascending, group_by, backend):
+    df = backend.DataFrame(data=[{"Id": 1, "A": 1}, {"Id": 1, "A": None}, {"Id": 1, "A": 3}, {"Id": 1, "A": None}], astype={"A": "Int64"})
+    with get_test_data(df, named_inputs={"input": df}, named_output="result") as data:
+        backend.rules.TopNRule(3, "A", ascending=ascending, group_by=group_by, named_input="input", named_output="result").apply(data)
+        result = data.get_named_output("result")
+        # same as the first rows of the sorted dataframe
+        backend.rules.SortRule("A", ascending=ascending, named_input="input", named_output="sorted").apply(data)
+        expected = data.get_named_output("sorted")
+        if backend.name == "dask":
+            result, expected = result.compute(), expected.compute()
+        assert list(result["A"]) == list(expected["A"][:3])
+        if backend.name == "polars":
+            assert list(result["A"]) == ([None, None, 1] if ascending else [None, None, 3])
+
+
+def test_top_n_rule_missing_column(backend):
+    df = backend.DataFrame(data=TOP_N_INPUT)
+    with get_test_data(df) as data:
+        rule = backend.rules.TopNRule(1, "A", group_by=["D"])
+        with pytest.raises(MissingColumnError) as exc:
+            rule.apply(data)
+        assert str(exc.value) == "Column(s) {'D'} are missing from the input dataframe."
+
+
+def test_top_n_rule_dask_partitions():
+    import dask.dataframe as dd
+    import pandas as pd
+    from etlrules.backends.dask import TopNRule
+    pdf = pd.DataFrame(data=[{"Id": idx % 4, "A": (idx * 37) % 211, "C": idx} for idx in range(200)])
+    df = dd.from_pandas(pdf, npartitions=5)
+    with get_test_data(df, named_output="result") as data:
+        TopNRule(3, "A", group_by=["Id"], named_output="result").apply(data)
+        expected = pdf.sort_values("A", ascending=False).groupby("Id").head(3).sort_values("A", ascending=False, ignore_index=True)
+        pd.testing.assert_frame_equal(data.get_named_output("result").compute(), expected)
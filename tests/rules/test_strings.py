@@ -1,4 +1,4 @@
-from pandas import DataFrame
+from pandas import DataFrame, concat
 import pytest
 
 from etlrules.exceptions import ColumnAlreadyExistsError, MissingColumnError
@@ -304,6 +304,18 @@ def test_split_scenarios(input_column, separator, limit, output_column, input_df
         {"A": "1;2;3;4", "C": " cCcc", "D": -499, "E": "1;2;3;4"},
         {"C": " cCcc ", "D": 1},
     ], None, {"E": "string"}],
+    ["A", ",", None, "|", "ascending", None, [{"A": "c,a,b"}, {"A": None}, {"A": "b,,a"}, {"A": ""}], None, [
+        {"A": "a|b|c"},
+        {"A": None},
+        {"A": "|a|b"},
+        {"A": ""},
+    ], None, {"A": "string"}],
+    ["A", ",", 1, "|", "descending", None, [{"A": "a,c,b"}, {"A": None}, {"A": "b,,a"}, {"A": "x"}], None, [
+        {"A": "c,b|a"},
+        {"A": None},
+        {"A": "b|,a"},
+        {"A": "x"},
+    ], None, {"A": "string"}],
     ["A", ".", None, "|", None, None, {"A": []}, "string", {"A": []}, "string", None],
     ["Z", ",", None, "|", None, None, INPUT_DF4, None, MissingColumnError, None, None],
     ["A", ",", None, "|", None, "C", INPUT_DF4, None, ColumnAlreadyExistsError, None, None],
@@ -325,6 +337,33 @@ def test_split_rejoin_scenarios(input_column, separator, limit, new_separator, s
             assert False
 
 
+@pytest.mark.parametrize("sort", [None, "ascending"])
+def test_split_rejoin_multiple_chunks(sort):
+    # the pyarrow backed columns of concatenated dataframes are made of multiple chunks
+    input_df = concat([
+        DataFrame(data={"A": ["c,a,b", None]}, dtype="string[pyarrow]"),
+        DataFrame(data={"A": ["z,,y", "x"]}, dtype="string[pyarrow]"),
+    ], ignore_index=True)
+    expected = DataFrame(data={"A": ["a|b|c" if sort else "c|a|b", None, "|y|z" if sort else "z||y", "x"]}, dtype="string")
+    with get_test_data(input_df, named_inputs={"input": input_df}, named_output="result") as data:
+        rule = StrSplitRejoinRule("A", separator=",", new_separator="|", sort=sort, named_input="input", named_output="result")
+        rule.apply(data)
+        assert_frame_equal(data.get_named_output("result"), expected)
+
+
+@pytest.mark.parametrize("sort", [None, "ascending"])
+def test_split_rejoin_all_nulls(sort, backend):
+    # e.g. a dask partition with only nulls
+    input_df = backend.DataFrame(data={"A": [None, None]}, astype={"A": "object"} if backend.name != "polars" else {"A": "string"})
+    with get_test_data(input_df, named_inputs={"input": input_df}, named_output="result") as data:
+        rule = backend.rules.StrSplitRejoinRule("A", separator=",", new_separator="|", sort=sort, named_input="input", named_output="result")
+        rule.apply(data)
+        result = data.get_named_output("result")
+        if backend.name == "dask":
+            result = result.compute()
+        assert list(result["A"].is_null() if backend.name == "polars" else result["A"].isna()) == [True, True]
+
+
 @pytest.mark.parametrize("input_column,regular_expression,keep_original_value,output_columns,input_df,input_dtype,expected,expected_dtype", [
     ["A", r"a([\d]*)_end", True, None, 
         [{"A": "a123_end", "B": "a321_end"}, {"A": "a123f_end", "B": "a321f_end"}], None,
@@ -0,0 +1,169 @@
+import datetime
+import pytest
+
+from etlrules.exceptions import ColumnAlreadyExistsError, MissingColumnError
+from tests.utils.data import get_test_data
+
+
+INPUT_DF = [
+    {"Id": 1, "Region": "EU", "Day": 1, "Sales": 10},
+    {"Id": 2, "Region": "US", "Day": 1, "Sales": 5},
+    {"Id": 3, "Region": "EU", "Day": 3, "Sales": 30},
+    {"Id": 4, "Region": "US", "Day": 2, "Sales": 7},
+    {"Id": 5, "Region": "EU", "Day": 2, "Sales": 20},
+    {"Id": 6, "Region": "EU", "Day": 4, "Sales": 20},
+]
+
+
+def _to_records(df, backend):
+    if backend.name == "polars":
+        return df.to_dicts()
+    if backend.name == "dask":
+        df = df.compute()
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def _get_windows_result(backend, input_df, windows, partition_by=None, order_by=None, ascending=True):
+    df = backend.DataFrame(data=input_df)
+    with get_test_data(df, named_inputs={"input": df}, named_output="result") as data:
+        rule = backend.rules.WindowRule(windows, partition_by=partition_by, order_by=order_by, ascending=ascending,
+                                        named_input="input", named_output="result")
+        rule.apply(data)
+        result = data.get_named_output("result")
+        assert list(result.columns) == list(input_df[0].keys()) + list(windows.keys())
+        return _to_records(result, backend)
+
+
+@pytest.mark.parametrize("windows,partition_by,order_by,ascending,expected", [
+    [{"Total": {"function": "cumsum", "column": "Sales"}}, None, None, True, [10, 15, 45, 52, 72, 92]],
+    [{"Total": {"function": "cumsum", "column": "Sales"}}, None, ["Day", "Id"], True, [10, 15, 72, 22, 42, 92]],
+    [{"Total": {"function": "cumsum", "column": "Sales"}}, ["Region"], ["Day"], True, [10, 5, 60, 12, 30, 80]],
+    [{"Total": {"function": "cumsum", "column": "Sales"}}, ["Region"], ["Day"], False, [80, 12, 50, 7, 70, 20]],
+    [{"Min": {"function": "cummin", "column": "Sales"}}, ["Region"], ["Day"], False, [10, 5, 20, 7, 20, 20]],
+    [{"Max": {"function": "cummax", "column": "Sales"}}, ["Region"], ["Day"], True, [10, 5, 30, 7, 20, 30]],
+    [{"Pos": {"function": "cumcount"}}, ["Region"], ["Day"], True, [0, 0, 2, 1, 1, 3]],
+    [{"Pos": {"function": "cumcount"}}, None, None, True, [0, 1, 2, 3, 4, 5]],
+    [{"Rank": {"function": "rank", "column": "Sales"}}, ["Region"], None, True, [1.0, 1.0, 4.0, 2.0, 2.5, 2.5]],
+    [{"Rank": {"function": "rank", "column": "Sales", "method": "min"}}, ["Region"], None, True, [1.0, 1.0, 4.0, 2.0, 2.0, 2.0]],
+    [{"Rank": {"function": "rank", "column": "Sales", "method": "max"}}, ["Region"], None, True, [1.0, 1.0, 4.0, 2.0, 3.0, 3.0]],
+    [{"Rank": {"function": "rank", "column": "Sales", "method": "dense", "descending": True}}, ["Region"], None, True, [3.0, 2.0, 1.0, 1.0, 2.0, 2.0]],
+    [{"Rank": {"function": "rank", "column": "Sales", "method": "first"}}, None, None, True, [3.0, 1.0, 6.0, 2.0, 4.0, 5.0]],
+    [{"Prev": {"function": "lag", "column": "Sales"}}, ["Region"], ["Day"], True, [None, None, 20, 5, 10, 30]],
+    [{"Prev": {"function": "lag", "column": "Sales", "offset": 2}}, ["Region"], ["Day"], True, [None, None, 10, None, None, 20]],
+    [{"Prev": {"function": "lag", "column": "Sales"}}, None, None, True, [None, 10, 5, 30, 7, 20]],
+    [{"Next": {"function": "lead", "column": "Sales"}}, ["Region"], ["Day"], True, [20, 7, 20, None, 30, None]],
+    [{"Next": {"function": "lead", "column": "Sales"}}, None, None, True, [5, 30, 7, 20, 20, None]],
+    [{"Sum": {"function": "rolling_sum", "column": "Sales", "window": 2}}, ["Region"], ["Day"], True, [10, 5, 50, 12, 30, 50]],
+    [{"Sum": {"function": "rolling_sum", "column": "Sales", "window": 2, "min_periods": 2}}, ["Region"], ["Day"], True, [None, None, 50, 12, 30, 50]],
+    [{"Sum": {"function": "rolling_sum", "column": "Sales", "window": 2}}, None, None, True, [10, 15, 35, 37, 27, 40]],
+    [{"Mean": {"function": "rolling_mean", "column": "Sales", "window": 3}}, ["Region"], ["Day"], True, [10.0, 5.0, 20.0, 6.0, 15.0, 70 / 3]],
+    [{"Mean": {"function": "rolling_mean", "column": "Sales", "window": 2}}, None, None, True, [10.0, 7.5, 17.5, 18.5, 13.5, 20.0]],
+    [{"Total": {"function": "cumsum", "column": "Sales"}, "Prev": {"function": "lag", "column": "Sales"}, "Pos": {"function": "cumcount"}},
+        ["Region"], ["Day"], True, [(10, None, 0), (5, None, 0), (60, 20, 2), (12, 5, 1), (30, 10, 1), (80, 30, 3)]],
+])
+def test_window_rule(windows, partition_by, order_by, ascending, expected, backend):
+    actual = _get_windows_result(backend, INPUT_DF, windows, partition_by, order_by, ascending)
+    # the dask backend doesn't preserve the order of the rows
+    actual = sorted(actual, key=lambda row: row["Id"])
+    output_columns = list(windows.keys())
+    if len(output_columns) == 1:
+        assert [row[output_columns[0]] for row in actual] == pytest.approx(expected)
+    else:
+        assert [tuple(row[col] for col in output_columns) for row in actual] == expected
+
+
+def test_window_rule_time_window(backend):
+    input_df = [
+        {"Id": 1, "Region": "EU", "Time": datetime.datetime(2023, 5, 1), "Sales": 10},
+        {"Id": 2, "Region": "US", "Time": datetime.datetime(2023, 5, 2), "Sales": 5},
+        {"Id": 3, "Region": "EU", "Time": datetime.datetime(2023, 5, 4), "Sales": 30},
+        {"Id": 4, "Region": "EU", "Time": datetime.datetime(2023, 5, 2), "Sales": 20},
+        {"Id": 5, "Region": "US", "Time": datetime.datetime(2023, 5, 10), "Sales": 7},
+    ]
+    windows = {
+        "Sum": {"function": "rolling_sum", "column": "Sales", "window": "3d"},
+        "Mean": {"function": "rolling_mean", "column": "Sales", "window": "3d"},
+    }
+    actual = _get_windows_result(backend, input_df, windows, partition_by=["Region"], order_by=["Time"])
+    actual = sorted(actual, key=lambda row: row["Id"])
+    assert [row["Sum"] for row in actual] == pytest.approx([10, 5, 50, 30, 7])
+    assert [row["Mean"] for row in actual] == pytest.approx([10.0, 5.0, 25.0, 15.0, 7.0])
+
+    # the NA values are skipped, the windows with less than min_periods values are NA
+    input_df[3]["Sales"] = None
+    input_df[0]["Sales"] = None
+    windows["Sum2"] = {"function": "rolling_sum", "column": "Sales", "window": "3d", "min_periods": 2}
+    actual = _get_windows_result(backend, input_df, windows, partition_by=["Region"], order_by=["Time"])
+    actual = sorted(actual, key=lambda row: row["Id"])
+    assert [row["Sum"] for row in actual] == [None, 5, 30, None, 7]
+    assert [row["Mean"] for row in actual] == [None, 5.0, 30.0, None, 7.0]
+    assert [row["Sum2"] for row in actual] == [None, None, None, None, None]
+
+    with pytest.raises(ValueError) as exc:
+        backend.rules.WindowRule(windows, partition_by=["Region"], order_by=["Time"], ascending=False)
+    assert str(exc.value) == "The time window of column 'Sum' requires an ascending order_by."
+
+
+@pytest.mark.parametrize("partition_by", [None, ["Region"]])
+def test_window_rule_time_window_peers(partition_by, backend):
+    # the rows with the same time are all in the window of each other
+    time = datetime.datetime(2023, 5, 1)
+    input_df = [
+        {"Id": 1, "Region": "EU", "Time": time, "Sales": 1},
+        {"Id": 2, "Region": "EU", "Time": time, "Sales": 2},
+        {"Id": 3, "Region": "EU", "Time": time + datetime.timedelta(hours=1), "Sales": 4},
+        {"Id": 4, "Region": "EU", "Time": time + datetime.timedelta(hours=3), "Sales": 8},
+        {"Id": 5, "Region": "EU", "Time": time + datetime.timedelta(hours=3), "Sales": None},
+    ]
+    windows = {
+        "Sum": {"function": "rolling_sum", "column": "Sales", "window": "2h"},
+        "Mean": {"function": "rolling_mean", "column": "Sales", "window": "2h"},
+        "Sum2": {"function": "rolling_sum", "column": "Sales", "window": "2h", "min_periods": 2},
+    }
+    actual = _get_windows_result(backend, input_df, windows, partition_by=partition_by, order_by=["Time"])
+    actual = sorted(actual, key=lambda row: row["Id"])
+    assert [row["Sum"] for row in actual] == pytest.approx([3, 3, 7, 8, 8])
+    assert [row["Mean"] for row in actual] == pytest.approx([1.5, 1.5, 7 / 3, 8.0, 8.0])
+    assert [row["Sum2"] for row in actual] == [3, 3, 7, None, None]
+
+
+@pytest.mark.parametrize("windows,partition_by,order_by,expected_exc,expected_message", [
+    [{}, None, None, ValueError, "The windows parameter must be a non-empty mapping of output columns to window functions."],
+    [{"A": {"function": "median", "column": "Sales"}}, None, None, ValueError, "Unsupported window function 'median' for column 'A'"],
+    [{"A": {"function": "cumsum"}}, None, None, ValueError, "The cumsum window function of column 'A' requires a column."],
+    [{"A": {"function": "cumsum", "column": "Sales", "window": 2}}, None, None, ValueError, "Unsupported parameters for the cumsum window function of column 'A': {'window'}"],
+    [{"A": {"function": "rank", "column": "Sales", "method": "ordinal"}}, None, None, ValueError, "Unsupported rank method 'ordinal' for column 'A'"],
+    [{"A": {"function": "lag", "column": "Sales", "offset": -1}}, None, None, ValueError, "The offset of the lag window function of column 'A' must be a non-negative integer."],
+    [{"A": {"function": "rolling_sum", "column": "Sales", "window": 0}}, None, None, ValueError, "The window of the rolling_sum window function of column 'A' must be a positive number of rows or a duration string."],
+    [{"A": {"function": "rolling_sum", "column": "Sales", "window": "2d"}}, None, ["Day", "Id"], ValueError, "The time window of column 'A' requires a single (datetime) order_by column."],
+    [{"A": {"function": "rolling_mean", "column": "Sales", "window": 2, "min_periods": -1}}, None, None, ValueError, "The min_periods of the rolling_mean window function of column 'A' must be a non-negative integer."],
+])
+def test_window_rule_invalid_windows(windows, partition_by, order_by, expected_exc, expected_message, backend):
+    with pytest.raises(expected_exc) as exc:
+        backend.rules.WindowRule(windows, partition_by=partition_by, order_by=order_by)
+    assert str(exc.value).startswith(expected_message)
+
+
+@pytest.mark.parametrize("windows,partition_by,order_by,strict,expected_exc,expected_message", [
+    [{"A": {"function": "cumsum", "column": "Missing"}}, None, None, True, MissingColumnError, "Missing columns in the input dataframe: {'Missing'}"],
+    [{"A": {"function": "cumsum", "column": "Sales"}}, ["Missing"], None, True, MissingColumnError, "Missing columns in the input dataframe: {'Missing'}"],
+    [{"A": {"function": "cumsum", "column": "Sales"}}, None, ["Missing"], True, MissingColumnError, "Missing columns in the input dataframe: {'Missing'}"],
+    [{"Day": {"function": "cumsum", "column": "Sales"}}, None, None, True, ColumnAlreadyExistsError, "Columns {'Day'} already exist in the input dataframe."],
+])
+def test_window_rule_errors(windows, partition_by, order_by, strict, expected_exc, expected_message, backend):
+    df = backend.DataFrame(data=INPUT_DF)
+    with get_test_data(df, named_inputs={"input": df}, named_output="result") as data:
+        rule = backend.rules.WindowRule(windows, partition_by=partition_by, order_by=order_by, named_input="input",
+                                        named_output="result", strict=strict)
+        with pytest.raises(expected_exc) as exc:
+            rule.apply(data)
+        assert str(exc.value) == expected_message
+
+
+def test_window_rule_non_strict_overwrites_column(backend):
+    windows = {"Sales": {"function": "cumsum", "column": "Sales"}}
+    df = backend.DataFrame(data=INPUT_DF)
+    with get_test_data(df, named_inputs={"input": df}, named_output="result") as data:
+        backend.rules.WindowRule(windows, named_input="input", named_output="result", strict=False).apply(data)
+        actual = sorted(_to_records(data.get_named_output("result"), backend), key=lambda row: row["Id"])
+        assert [row["Sales"] for row in actual] == [10, 15, 45, 52, 72, 92]
@@ -1,9 +1,11 @@
 import pytest
+import threading
 
 from etlrules.data import RuleData
 from etlrules.engine import RuleEngine
 from etlrules.exceptions import GraphRuntimeError, InvalidPlanError
 from etlrules.plan import Plan
+from etlrules.rule import UnaryOpBaseRule
 
 from tests.utils.data import assert_frame_equal
 
@@ -192,3 +194,179 @@ def test_run_produces_output_already_exists_in_input_data(backend):
     assert err is not None
     assert "Named output clashes. The following named outputs are produced by rules in the plan but they also exist in the input data, leading to ambiguity: {'input'}" in err
     assert valid is False
+
+
+class WaitForEventSinkRule(UnaryOpBaseRule):
+    def __init__(self, event, named_input=None):
+        super().__init__(named_input=named_input, named_output=None)
+        self.event = event
+        self.written = None
+
+    def has_output(self):
+        return False
+
+    def apply(self, data):
+        super().apply(data)
+        if not self.event.wait(timeout=10):
+            raise RuntimeError("The sink write was not overlapped with the rest of the plan.")
+        self.written = self._get_input_df(data)
+
+
+class SetEventRule(UnaryOpBaseRule):
+    def __init__(self, event, named_input=None, named_output=None):
+        super().__init__(named_input=named_input, named_output=named_output)
+        self.event = event
+
+    def apply(self, data):
+        super().apply(data)
+        self.event.set()
+        self._set_output_df(data, self._get_input_df(data))
+
+
+def test_run_async_sinks_pipeline(tmp_path, backend):
+    input_df = backend.DataFrame(data=[
+        {'A': 2, 'B': 'n'},
+        {'A': 1, 'B': 'm'},
+    ])
+    event = threading.Event()
+    sink_rule = WaitForEventSinkRule(event)
+    data = RuleData(input_df, context={"async_sink_workers": 2})
+    plan = Plan()
+    plan.add_rule(sink_rule)
+    plan.add_rule(backend.rules.WriteCSVFileRule("unsorted.csv", str(tmp_path)))
+    plan.add_rule(backend.rules.SortRule(['A']))
+    plan.add_rule(SetEventRule(event))
+    plan.add_rule(backend.rules.WriteCSVFileRule("sorted.csv", str(tmp_path)))
+    RuleEngine(plan).run(data)
+    assert_frame_equal(sink_rule.written, input_df)
+    assert (tmp_path / "unsorted.csv").read_text() == "A,B\n2,n\n1,m\n"
+    assert (tmp_path / "sorted.csv").read_text() == "A,B\n1,m\n2,n\n"
+
+
+def test_run_async_sinks_graph(tmp_path, backend):
+    input_df = backend.DataFrame(data=[
+        {'A': 2, 'B': 'n'},
+        {'A': 1, 'B': 'm'},
+    ])
+    event = threading.Event()
+    sink_rule = WaitForEventSinkRule(event, named_input="input")
+    data = RuleData(named_inputs={"input": input_df}, context={"async_sink_workers": 1})
+    plan = Plan()
+    plan.add_rule(sink_rule)
+    plan.add_rule(backend.rules.SortRule(['A'], named_input="input", named_output="sorted"))
+    plan.add_rule(SetEventRule(event, named_input="sorted", named_output="result"))
+    RuleEngine(plan).run(data)
+    assert_frame_equal(sink_rule.written, input_df)
+
+
+def test_run_async_sinks_error(tmp_path, backend):
+    input_df = backend.DataFrame(data=[{'A': 1}])
+    (tmp_path / "not_a_dir").write_text("")
+    data = RuleData(input_df, context={"async_sink_workers": 2})
+    plan = Plan()
+    plan.add_rule(backend.rules.WriteCSVFileRule("data.csv", str(tmp_path / "not_a_dir")))
+    plan.add_rule(backend.rules.ProjectRule(['A']))
+    with pytest.raises(OSError):
+        RuleEngine(plan).run(data)
+
+
+@pytest.mark.parametrize("enabled,max_values,expected_read", [
+    [False, 1000, 100],
+    [True, 1000, 2],
+    [True, 2, 95],
+])
+def test_run_graph_dynamic_filters_parquet(enabled, max_values, expected_read, tmp_path, backend, monkeypatch):
+    from etlrules.backends.common.joins import DynamicFiltersMixin
+    monkeypatch.setattr(DynamicFiltersMixin, "DYNAMIC_FILTERS_MAX_VALUES", max_values)
+    big_df = backend.DataFrame(data={"K": list(range(100)), "V": [i * 10 for i in range(100)]})
+    backend.rules.WriteParquetFileRule("big.parquet", str(tmp_path), named_input="big").apply(RuleData(named_inputs={"big": big_df}))
+    small_df = backend.DataFrame(data=[{"K": 200, "S": "c"}, {"K": 7, "S": "b"}, {"K": 5, "S": "a"}])
+    data = RuleData(named_inputs={"small_raw": small_df}, context={"dynamic_filters": enabled})
+    plan = Plan()
+    plan.add_rule(backend.rules.ReadParquetFileRule("big.parquet", str(tmp_path), named_output="big"))
+    plan.add_rule(backend.rules.SortRule(["K"], named_input="small_raw", named_output="small"))
+    plan.add_rule(backend.rules.InnerJoinRule(named_input_left="small", named_input_right="big", key_columns_left=["K"], named_output="result"))
+    RuleEngine(plan).run(data)
+    expected = backend.DataFrame(data=[{"K": 5, "S": "a", "V": 50}, {"K": 7, "S": "b", "V": 70}])
+    assert_frame_equal(data.get_named_output("result"), expected, ignore_row_ordering=True)
+    assert len(data.get_named_output("big")) == expected_read
+
+
+def test_run_graph_dynamic_filters_null_keys(tmp_path, backend):
+    big_df = backend.DataFrame(data={"K": [float(idx) if idx % 10 else None for idx in range(100)], "V": list(range(100))})
+    backend.rules.WriteParquetFileRule("big.parquet", str(tmp_path), named_input="big").apply(RuleData(named_inputs={"big": big_df}))
+    small_df = backend.DataFrame(data=[{"K": 5.0, "S": "a"}, {"K": None, "S": "b"}])
+    results = []
+    for enabled in (False, True):
+        data = RuleData(named_inputs={"small": small_df}, context={"dynamic_filters": enabled})
+        plan = Plan()
+        plan.add_rule(backend.rules.ReadParquetFileRule("big.parquet", str(tmp_path), named_output="big"))
+        plan.add_rule(backend.rules.InnerJoinRule(named_input_left="small", named_input_right="big", key_columns_left=["K"], named_output="result"))
+        RuleEngine(plan).run(data)
+        results.append(data.get_named_output("result"))
+    # the null keys match in the pandas and dask joins, the filters must keep the null keys of the big dataframe
+    assert len(results[0]) == (1 if backend.name == "polars" else 11)
+    assert_frame_equal(results[1], results[0], ignore_row_ordering=True)
+
+
+def test_run_graph_dynamic_filters_not_only_consumer(tmp_path, backend):
+    big_df = backend.DataFrame(data={"K": list(range(100)), "V": [i * 10 for i in range(100)]})
+    backend.rules.WriteParquetFileRule("big.parquet", str(tmp_path), named_input="big").apply(RuleData(named_inputs={"big": big_df}))
+    small_df = backend.DataFrame(data=[{"K": 7, "S": "b"}, {"K": 5, "S": "a"}])
+    data = RuleData(named_inputs={"small": small_df}, context={"dynamic_filters": True})
+    plan = Plan()
+    plan.add_rule(backend.rules.ReadParquetFileRule("big.parquet", str(tmp_path), named_output="big"))
+    plan.add_rule(backend.rules.InnerJoinRule(named_input_left="small", named_input_right="big", key_columns_left=["K"], named_output="result"))
+    plan.add_rule(backend.rules.ProjectRule(["K"], named_input="big", named_output="all_keys"))
+    RuleEngine(plan).run(data)
+    assert len(data.get_named_output("all_keys")) == 100
+
+
+@pytest.mark.parametrize("rule_cls_str,sql_input_side,expected_read", [
+    ["SemiJoinRule", "left", 2],
+    ["SemiJoinRule", "right", 2],
+    ["AntiJoinRule", "left", 5],
+    ["AntiJoinRule", "right", 2],
+])
+def test_run_graph_dynamic_filters_sql(rule_cls_str, sql_input_side, expected_read, tmp_path, backend):
+    import sqlite3
+    db_path = str(tmp_path / "db.sqlite")
+    with sqlite3.connect(db_path) as con:
+        con.execute("CREATE TABLE big (K INTEGER, V TEXT)")
+        con.executemany("INSERT INTO big VALUES (?, ?)", [(idx, f"v{idx}") for idx in range(5)])
+    small_df = backend.DataFrame(data=[{"K": 1}, {"K": 3}, {"K": 10}])
+    context = {"dynamic_filters": True, "etlrules_tempdir": str(tmp_path), "etlrules_tempdir_cleanup": False}
+    data = RuleData(named_inputs={"small": small_df}, context=context)
+    plan = Plan()
+    plan.add_rule(backend.rules.ReadSQLQueryRule(f"sqlite:///{db_path}", "SELECT * FROM big", named_output="big"))
+    left, right = ("big", "small") if sql_input_side == "left" else ("small", "big")
+    plan.add_rule(getattr(backend.rules, rule_cls_str)(named_input_left=left, named_input_right=right, key_columns_left=["K"], named_output="result"))
+    RuleEngine(plan).run(data)
+    assert len(data.get_named_output("big")) == expected_read
+
+
+@pytest.mark.parametrize("incremental", ["watermark", "manifest"])
+def test_run_graph_dynamic_filters_incremental_reads(incremental, tmp_path, backend):
+    import sqlite3
+    small_df = backend.DataFrame(data=[{"K": 1}, {"K": 3}])
+    context = {"dynamic_filters": True, "etlrules_tempdir": str(tmp_path), "etlrules_tempdir_cleanup": False}
+    data = RuleData(named_inputs={"small": small_df}, context=context)
+    plan = Plan()
+    if incremental == "watermark":
+        db_path = str(tmp_path / "db.sqlite")
+        with sqlite3.connect(db_path) as con:
+            con.execute("CREATE TABLE big (K INTEGER, V TEXT)")
+            con.executemany("INSERT INTO big VALUES (?, ?)", [(idx, f"v{idx}") for idx in range(5)])
+        plan.add_rule(backend.rules.ReadSQLQueryRule(f"sqlite:///{db_path}", "SELECT * FROM big", watermark_column="K",
+                                                     watermark_state_file=str(tmp_path / "wm.json"), named_output="big"))
+    else:
+        if backend.name == "dask":
+            pytest.skip("The dask parquet files are written as multiple part files.")
+        big_df = backend.DataFrame(data={"K": list(range(5)), "V": [f"v{idx}" for idx in range(5)]})
+        backend.rules.WriteParquetFileRule("big.parquet", str(tmp_path), named_input="big").apply(RuleData(named_inputs={"big": big_df}))
+        plan.add_rule(backend.rules.ReadParquetFileRule("big.parquet", str(tmp_path), incremental_state_file=str(tmp_path / "manifest.json"),
+                                                        named_output="big"))
+    plan.add_rule(backend.rules.SemiJoinRule(named_input_left="big", named_input_right="small", key_columns_left=["K"], named_output="result"))
+    RuleEngine(plan).run(data)
+    assert len(data.get_named_output("big")) == 5
+    assert len(data.get_named_output("result")) == 2
@@ -32,6 +32,7 @@ def test_runner(backend_str):
             rows = connection.execute(sa.text("SELECT * FROM MyTable")).fetchall()
             assert rows == EXPECTED
     finally:
+        SQLAlchemyEngines.dispose("sqlite:///tests/mydb.db")
         os.remove(Path("tests") / "mydb.db")
 
 
@@ -57,4 +58,5 @@ def test_runner_with_cli_overrides(backend_str):
             rows = connection.execute(sa.text("SELECT * FROM SomeOtherTable")).fetchall()
             assert rows == EXPECTED
     finally:
+        SQLAlchemyEngines.dispose(f"sqlite:///tests/{db_name}")
         os.remove(Path("tests") / db_name)